@@ -0,0 +1,75 @@
+import math
+from bisect import bisect_left
+
+import numpy as np
+
+# Unit quarter-circle tables keyed by resolution, shared by every plot.
+_UNIT_ARCS = {}
+
+# Fixed resolution used when no adaptive sampling is requested.
+DEFAULT_ARC_POINTS = 200
+
+# Resolutions chosen by arc_points_for(): 2^k + 1 samples, so adaptive
+# sampling only ever creates a handful of distinct tables.
+ARC_RESOLUTIONS = tuple(2 ** k + 1 for k in range(2, 11))
+MAX_ARC_POINTS = ARC_RESOLUTIONS[-1]
+
+def unit_arc(points=DEFAULT_ARC_POINTS):
+    """
+    Return the (2, points) array [cos(theta); sin(theta)] for theta from
+    0 to pi/2, computed once per resolution and cached. The array is
+    read-only so callers cannot corrupt the shared table.
+    """
+    table = _UNIT_ARCS.get(points)
+    if table is None:
+        theta = np.linspace(0, np.pi/2, points)
+        table = np.vstack((np.cos(theta), np.sin(theta)))
+        table.setflags(write=False)
+        _UNIT_ARCS[points] = table
+    return table
+
+def arc_points_for(radius, tolerance, max_points=MAX_ARC_POINTS):
+    """
+    Fewest samples on a quarter circle of 'radius' for which the chords
+    stay within 'tolerance' of the true arc (same units as the radius),
+    rounded up to one of ARC_RESOLUTIONS and capped at 'max_points'.
+    A chord spanning angle a deviates from the arc by r·(1 - cos(a/2)).
+    """
+    radius = abs(radius)
+    if tolerance <= 0 or radius == 0:
+        return max_points if tolerance <= 0 else ARC_RESOLUTIONS[0]
+    if tolerance >= radius:
+        return ARC_RESOLUTIONS[0]
+    step = 2.0 * math.acos(1.0 - tolerance / radius)
+    needed = math.ceil((math.pi / 2) / step) + 1
+    i = bisect_left(ARC_RESOLUTIONS, needed)
+    points = ARC_RESOLUTIONS[i] if i < len(ARC_RESOLUTIONS) else MAX_ARC_POINTS
+    return min(points, max_points)
+
+def clear_cache():
+    _UNIT_ARCS.clear()
+
+class ArcBuffer:
+    """
+    Preallocated x/y storage for one quarter-circle arc.
+
+    scale(radius) writes radius * [cos; sin] into the buffer with a single
+    multiply and returns (x, y) views, so repeated slider updates reuse the
+    same memory instead of recomputing cos/sin and allocating new arrays.
+    """
+    __slots__ = ("unit", "xy")
+
+    def __init__(self, points=DEFAULT_ARC_POINTS):
+        self.unit = unit_arc(points)
+        self.xy = np.empty_like(self.unit)
+
+    def scale(self, radius, points=None):
+        """
+        With 'points' the buffer switches to that resolution first; it is
+        only reallocated when the resolution actually changes.
+        """
+        if points is not None and points != self.unit.shape[1]:
+            self.unit = unit_arc(points)
+            self.xy = np.empty_like(self.unit)
+        np.multiply(self.unit, radius, out=self.xy)
+        return self.xy[0], self.xy[1]
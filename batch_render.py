@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+FORMATS = ("png", "svg", "pdf")
+
+# Per-process figure, built once by _init_renderer and reused for every
+# configuration that process renders.
+_renderer = None
+
+def _init_renderer(arc_points=None, dpi=100):
+    global _renderer
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+    from serpentine_routing import build_trace_figure
+
+    fig, sliders, _ = build_trace_figure(arc_points, frame_budget=0, interactive=False)
+    # Adaptive arc sampling works in pixels of the exported image.
+    fig.set_dpi(dpi)
+    _renderer = (fig, sliders)
+
+def _render_chunk(task):
+    """
+    Pool task: render each (name, L, W) configuration of one chunk into
+    'out_dir' with the process's figure and return the written paths.
+    """
+    configs, out_dir, fmt, dpi = task
+    fig, (length, width) = _renderer
+    paths = []
+    for name, L, W in configs:
+        # Only the second slider change needs to trigger the update.
+        length.eventson = False
+        length.set_val(L)
+        length.eventson = True
+        width.set_val(W)
+        path = os.path.join(out_dir, f"{name}.{fmt}")
+        fig.savefig(path, format=fmt, dpi=dpi)
+        paths.append(path)
+    return paths
+
+def config_name(L, W):
+    return f"L{L:g}_W{W:g}"
+
+def render_batch(configs, out_dir, fmt="png", workers=None, dpi=100, arc_points=None,
+                 tasks_per_worker=4):
+    """
+    Render the three-panel figure for every configuration offscreen.
+
+    'configs' is a sequence of (L, W) pairs in mils, or (name, L, W)
+    triples; files are written to 'out_dir' as '<name>.<fmt>' with names
+    defaulting to config_name(L, W). Each worker process builds the figure
+    once and only updates its data per configuration. workers=1 renders in
+    this process. Arcs are sampled adaptively for the output resolution
+    unless 'arc_points' fixes the count. Returns the written paths in
+    input order.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown image format: {fmt}")
+    configs = [c if len(c) == 3 else (config_name(*c), *c) for c in configs]
+    os.makedirs(out_dir, exist_ok=True)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(configs)))
+    if workers == 1:
+        _init_renderer(arc_points, dpi)
+        return _render_chunk((configs, out_dir, fmt, dpi))
+
+    size = -(-len(configs) // (workers * tasks_per_worker))
+    tasks = [(configs[i:i + size], out_dir, fmt, dpi) for i in range(0, len(configs), size)]
+    paths = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_renderer,
+                             initargs=(arc_points, dpi)) as pool:
+        for chunk in pool.map(_render_chunk, tasks):
+            paths.extend(chunk)
+    return paths
+
+def main(argv=None):
+    import argparse
+
+    from propagation import read_records
+
+    parser = argparse.ArgumentParser(
+        description="Export the bend figure for many (L, W) configurations without a display.")
+    parser.add_argument("input", nargs="?", default=None,
+                        help="CSV/JSON Lines file with L, W (mils) and optional net columns")
+    parser.add_argument("--L", nargs=3, type=float, metavar=("START", "STOP", "NUM"),
+                        help="length axis as linspace (instead of an input file)")
+    parser.add_argument("--W", nargs=3, type=float, metavar=("START", "STOP", "NUM"),
+                        help="width axis as linspace (instead of an input file)")
+    parser.add_argument("--format", choices=FORMATS, default="png")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--arc-points", type=int, default=None,
+                        help="fixed samples per arc (default: adaptive to the dpi)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("-o", "--out-dir", required=True, help="directory for the images")
+    args = parser.parse_args(argv)
+
+    if args.input is not None:
+        try:
+            with open(args.input, newline="") as f:
+                configs = [(rec.get("net") or config_name(float(rec["L"]), float(rec["W"])),
+                            float(rec["L"]), float(rec["W"])) for rec in read_records(f)]
+        except KeyError as exc:
+            print(f"error: record is missing field {exc}", file=sys.stderr)
+            return 1
+    elif args.L and args.W:
+        configs = [(float(L), float(W)) for L in np.linspace(args.L[0], args.L[1], int(args.L[2]))
+                   for W in np.linspace(args.W[0], args.W[1], int(args.W[2]))]
+    else:
+        parser.error("give an input file or both --L and --W")
+    if not configs:
+        print("error: no configurations to render", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    try:
+        paths = render_batch(configs, args.out_dir, args.format, args.workers, args.dpi,
+                             args.arc_points)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    print(f"wrote {len(paths)} images to {args.out_dir} in {elapsed:.1f} s "
+          f"({len(paths) / elapsed:.1f} images/s)", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
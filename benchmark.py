@@ -0,0 +1,422 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+def _grid_for(points, n_er=20):
+    """
+    Square L x W grid with 'n_er' dielectric values and about 'points'
+    grid points in total (slider ranges, in mils).
+    """
+    side = max(1, int(round((points / n_er) ** 0.5)))
+    return (np.linspace(1, 100, side), np.linspace(1, 50, side), np.linspace(3.0, 4.5, n_er))
+
+def bench_sweep(points=10**7, workers=None, fields=("t_circular_ps", "t_rightangle_ps"),
+                dtype=np.float32, repeat=3):
+    """
+    Time sweep.run_sweep over ~'points' grid points for each worker count
+    in 'workers' (default: 1, 2, 4, ... up to os.cpu_count()). Returns a
+    list of dicts with the best wall time, points/s and speedup vs 1 worker.
+    """
+    from sweep import run_sweep
+
+    if workers is None:
+        cpus = os.cpu_count() or 1
+        workers = sorted({1 << i for i in range(cpus.bit_length()) if 1 << i <= cpus} | {cpus})
+    L, W, Er = _grid_for(points)
+    n = L.size * W.size * Er.size
+    rows = []
+    for w in workers:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run_sweep(L, W, Er, units="mils", fields=fields, workers=w, dtype=dtype).close()
+            best = min(best, time.perf_counter() - start)
+        rows.append({"workers": w, "points": n, "seconds": best, "points_per_s": n / best})
+    for row in rows:
+        row["speedup"] = rows[0]["seconds"] / row["seconds"]
+    return rows
+
+def bench_meander(calls=100000, batch=10**6):
+    """
+    Per-call cost of the scalar Meander model (construct + effective length
+    + delay, as in a length-matching loop) and per-element cost of the
+    vectorized meander_lengths / meander_delay_ps over 'batch' meanders.
+    """
+    from meander import Meander, meander_delay_ps, meander_lengths
+
+    rows = []
+    for corner in ("right_angle", "mitred", "arc"):
+        start = time.perf_counter()
+        for i in range(calls):
+            Meander(8 + (i & 7), 40.0, 10.0, 4.0, corner, lead=5.0).delay_ps(3.8, "mils")
+        scalar = (time.perf_counter() - start) / calls
+        n_legs = np.arange(batch) % 20 + 1
+        start = time.perf_counter()
+        meander_delay_ps(meander_lengths(n_legs, 40.0, 10.0, 4.0, corner, lead=5.0), 3.8, "mils")
+        vector = (time.perf_counter() - start) / batch
+        rows.append({"corner": corner, "scalar_us_per_call": scalar * 1e6,
+                     "batch_ns_per_meander": vector * 1e9})
+    return rows
+
+def bench_propagation(calls=20000, batch=10**6):
+    """
+    compute_propagation_times (one net per call, report text included)
+    against compute_propagation_times_batch over 'batch' nets.
+    """
+    from propagation import compute_propagation_times, compute_propagation_times_batch
+
+    rng = np.random.default_rng(0)
+    L = rng.uniform(0.001, 0.1, batch)
+    W = rng.uniform(0.001, 0.05, batch)
+    Er = rng.uniform(3.0, 4.5, batch)
+    start = time.perf_counter()
+    for l, w, er in zip(L[:calls].tolist(), W[:calls].tolist(), Er[:calls].tolist()):
+        compute_propagation_times(l, w, er)
+    scalar = time.perf_counter() - start
+    start = time.perf_counter()
+    compute_propagation_times_batch(L, W, Er)
+    vector = time.perf_counter() - start
+    return [
+        {"mode": "scalar", "nets": calls, "seconds": scalar, "nets_per_s": calls / scalar},
+        {"mode": "batch", "nets": batch, "seconds": vector, "nets_per_s": batch / vector},
+    ]
+
+def _agg():
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+    import matplotlib.pyplot as plt
+    return plt
+
+def bench_update(events=40, modes=("full", "blit")):
+    """
+    Per-event latency of the interactive figure's update() under the
+    offscreen Agg backend, for each render mode. Each slider is dragged
+    one step at a time, as a user would, and back again; the latency
+    includes the (synchronous) Agg redraw.
+    """
+    plt = _agg()
+    from serpentine_routing import build_trace_figure
+
+    rows = []
+    for mode in modes:
+        fig, (length, width), timer = build_trace_figure(render_mode=mode, frame_budget=0)
+        fig.canvas.draw()
+        timer.count, timer.total, timer.worst = 0, 0.0, 0.0
+        for slider, start in ((length, 50), (width, 10)):
+            for i in range(events):
+                slider.set_val(start + min(i, events - i))
+        rows.append({"mode": mode, "updates": timer.count, "mean_ms": timer.mean * 1e3,
+                     "worst_ms": timer.worst * 1e3})
+        plt.close(fig)
+    return rows
+
+def bench_startup(repeat=3):
+    """
+    Figure startup: building the interactive figure plus its first Agg
+    draw (best of 'repeat'), and a cold 'import serpentine_routing' in a
+    fresh interpreter.
+    """
+    plt = _agg()
+    from serpentine_routing import build_trace_figure
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fig, _, _ = build_trace_figure()
+        fig.canvas.draw()
+        best = min(best, time.perf_counter() - start)
+        plt.close(fig)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import serpentine_routing"], check=True,
+                   cwd=os.path.dirname(os.path.abspath(__file__)),
+                   env=dict(os.environ, MPLBACKEND="Agg"))
+    cold = time.perf_counter() - start
+    return [
+        {"stage": "build_and_first_draw", "seconds": best},
+        {"stage": "cold_import", "seconds": cold},
+    ]
+
+def bench_dispersion(nets=1000, freqs=10000, repeat=3):
+    """
+    dispersive_delays over a 'nets' x 'freqs' grid: all six delay fields
+    into fresh arrays, and into reused output arrays.
+    """
+    from dispersion import dispersive_delays
+
+    rng = np.random.default_rng(0)
+    L = rng.uniform(0.5, 3.0, nets)
+    Er = rng.uniform(3.5, 4.5, nets)
+    freq = np.geomspace(1e7, 1e11, freqs)
+    rows = []
+    out = None
+    for mode in ("fresh", "reused"):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = dispersive_delays(L, 0.005, Er, 0.02, freq, out=out)
+            best = min(best, time.perf_counter() - start)
+        out = result
+        n = nets * freqs
+        rows.append({"outputs": mode, "points": n, "seconds": best, "points_per_s": n / best})
+    return rows
+
+def bench_stackup(points=1_000_000, repeat=3):
+    """
+    compute_line_times_batch over 'points' random microstrip and stripline
+    geometries (Er_eff, Z0 and all delay fields).
+    """
+    from transmission_line import LINE_KINDS, compute_line_times_batch
+
+    rng = np.random.default_rng(0)
+    L = rng.uniform(0.5, 3.0, points)
+    W = rng.uniform(0.002, 0.020, points)
+    H = rng.uniform(0.003, 0.010, points)
+    Er = rng.uniform(3.0, 4.5, points)
+    rows = []
+    for kind in LINE_KINDS:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            compute_line_times_batch(L, W, H, Er, 0.0007, kind)
+            best = min(best, time.perf_counter() - start)
+        rows.append({"kind": kind, "points": points, "seconds": best,
+                     "points_per_s": points / best})
+    return rows
+
+def bench_monte_carlo(samples=10_000_000, workers=(1, 2, 4), repeat=1):
+    """
+    run_monte_carlo throughput (samples/s) with W, Er and L tolerances for
+    increasing worker counts.
+    """
+    from monte_carlo import Distribution, run_monte_carlo
+
+    L = Distribution("uniform", 1000.0, 5.0)
+    W = Distribution("normal", 5.0, 0.5)
+    Er = Distribution("normal", 4.2, 0.05)
+    rows = []
+    for n in workers:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run_monte_carlo(L, W, Er, samples, "mils", skew_budget_ps=1.0, workers=n)
+            best = min(best, time.perf_counter() - start)
+        rows.append({"workers": n, "samples": samples, "seconds": best,
+                     "samples_per_s": samples / best})
+    return rows
+
+def bench_bus_skew(nets=(20_000, 160_000)):
+    """
+    Cost per net of loading a BusSkew one add() at a time, and of update()
+    on the loaded bus, for each bus size in 'nets'. The per-net cost should
+    stay nearly flat as the bus grows (O(log n) per edit).
+    """
+    from bus_skew import BusSkew
+
+    rows = []
+    for n in nets:
+        lengths = np.random.default_rng(2).uniform(1.0, 2.0, n).tolist()
+        bus = BusSkew([], [], 0.005, 3.8)
+        start = time.perf_counter()
+        for i, length in enumerate(lengths):
+            bus.add(f"n{i}", length, 0.005, 3.8)
+        add = (time.perf_counter() - start) / n
+        start = time.perf_counter()
+        for i, length in enumerate(lengths[::-1]):
+            bus.update(f"n{i}", L=length)
+        update = (time.perf_counter() - start) / n
+        rows.append({"nets": n, "add_us_per_net": add * 1e6, "update_us_per_net": update * 1e6})
+    return rows
+
+def bench_service(queries=2000, batch=1000, batches=100):
+    """
+    delay_service round trips from this process over one keep-alive
+    connection to a server subprocess: single-record queries/s and rows/s
+    in 'batch'-row column requests.
+    """
+    import socket
+
+    from delay_service import ServiceClient
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = subprocess.Popen([sys.executable, "delay_service.py", "--port", str(port),
+                               "--workers", "1"], stderr=subprocess.DEVNULL,
+                              cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        client = None
+        deadline = time.perf_counter() + 30.0
+        while client is None:
+            try:
+                client = ServiceClient(port=port)
+                client.request("GET", "/health")
+            except OSError:
+                client = None
+                if time.perf_counter() > deadline:
+                    raise
+                time.sleep(0.05)
+        start = time.perf_counter()
+        for i in range(queries):
+            client.delays({"L": 1.0 + i * 1e-3, "W": 0.005, "Er": 4.0}, fields=["dt_rightangle_ps"])
+        single = time.perf_counter() - start
+        p50 = client.metrics()["endpoints"]["/delays"]["latency_ms"]["p50"]
+        payload = {"L": np.linspace(1.0, 2.0, batch).tolist(), "W": [0.005], "Er": 4.0,
+                   "fields": ["t_circular_ps", "t_rightangle_ps"]}
+        start = time.perf_counter()
+        for _ in range(batches):
+            client.request("POST", "/delays", payload)
+        batched = time.perf_counter() - start
+        client.close()
+    finally:
+        server.terminate()
+        server.wait()
+    return [
+        {"mode": "single", "requests": queries, "seconds": single,
+         "requests_per_s": queries / single, "rows_per_s": queries / single,
+         "server_p50_ms": p50},
+        {"mode": f"batch{batch}", "requests": batches, "seconds": batched,
+         "requests_per_s": batches / batched, "rows_per_s": batches * batch / batched,
+         "server_p50_ms": None},
+    ]
+
+# Modules whose cold import time is measured by bench_imports.
+IMPORT_MODULES = ("propagation", "meander", "length_tuning", "bus_skew", "sweep",
+                  "length_report", "dispersion", "transmission_line", "monte_carlo",
+                  "results_store", "delay_service", "instrumentation", "calculator", "serpentine_routing")
+
+def _import_time(module):
+    """
+    Cumulative import time (s) of 'module' in a fresh interpreter, from
+    -X importtime, and the set of top-level packages it loaded.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, check=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    cumulative = 0.0
+    loaded = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        if not total.strip().isdigit():
+            continue
+        name = name.strip()
+        loaded.add(name.split(".")[0])
+        if name == module:
+            cumulative = int(total) / 1e6
+    return cumulative, loaded
+
+def bench_imports(modules=IMPORT_MODULES, repeat=3):
+    """
+    Cold import time of each tool module (best of 'repeat' fresh
+    interpreters, via -X importtime), and whether importing it pulls in
+    Matplotlib or Tk.
+    """
+    rows = []
+    for module in modules:
+        best = float("inf")
+        for _ in range(repeat):
+            seconds, loaded = _import_time(module)
+            best = min(best, seconds)
+        rows.append({"module": module, "import_ms": best * 1e3,
+                     "matplotlib": "matplotlib" in loaded, "tkinter": "tkinter" in loaded})
+    return rows
+
+BENCHMARKS = {
+    "sweep": bench_sweep,
+    "meander": bench_meander,
+    "propagation": bench_propagation,
+    "update": bench_update,
+    "startup": bench_startup,
+    "imports": bench_imports,
+    "dispersion": bench_dispersion,
+    "stackup": bench_stackup,
+    "monte_carlo": bench_monte_carlo,
+    "bus_skew": bench_bus_skew,
+    "service": bench_service,
+}
+
+def print_rows(name, rows):
+    print(f"== {name}")
+    keys = list(rows[0])
+    print("  ".join(f"{k:>14}" for k in keys))
+    for row in rows:
+        print("  ".join(f"{v:>14.6g}" if isinstance(v, float) else f"{str(v):>14}" for v in row.values()))
+
+def environment():
+    """
+    Revision and library versions recorded alongside JSON results.
+    """
+    import matplotlib
+
+    try:
+        revision = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        revision = ""
+    return {
+        "revision": revision or None,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def compare(old, new):
+    """
+    Print new/old ratios of the numeric fields of two JSON result files,
+    matching benchmarks by name and rows by position.
+    """
+    print(f"== {old['environment']['revision']} -> {new['environment']['revision']}")
+    for name, rows in new["results"].items():
+        for old_row, row in zip(old["results"].get(name, ()), rows):
+            ratios = [f"{k} x{row[k] / old_row[k]:.3g}" for k, v in row.items()
+                      if isinstance(v, float) and old_row.get(k)]
+            labels = [str(v) for v in row.values() if isinstance(v, str)]
+            print(f"{name} {' '.join(labels)}: {', '.join(ratios)}")
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmarks for the bend-delay tools.")
+    parser.add_argument("names", nargs="*", default=list(BENCHMARKS),
+                        help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--points", type=float, default=1e7, help="sweep grid size")
+    parser.add_argument("--workers", default=None,
+                        help="comma-separated worker counts for the sweep benchmark")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="print ratios against a JSON file from an earlier run")
+    args = parser.parse_args(argv)
+
+    for name in args.names:
+        if name not in BENCHMARKS:
+            print(f"error: unknown benchmark {name}", file=sys.stderr)
+            return 1
+    results = {}
+    for name in args.names:
+        if name == "sweep":
+            workers = [int(w) for w in args.workers.split(",")] if args.workers else None
+            rows = bench_sweep(int(args.points), workers)
+        else:
+            rows = BENCHMARKS[name]()
+        print_rows(name, rows)
+        results[name] = rows
+    report = {"environment": environment(), "results": results}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,212 @@
+import math
+
+import numpy as np
+
+from arc_cache import DEFAULT_ARC_POINTS, unit_arc
+
+EDGES = ("center", "inner", "outer")
+
+# Difference between the centerline and the inner (or outer) edge length of
+# a 90° bend, per unit of trace width. Offsetting a quarter arc by W/2
+# changes its length by (π/2)(W/2); offsetting both legs of an L-shape by
+# W/2 changes their total by W.
+EDGE_FACTOR = {
+    "circular": math.pi / 4.0,
+    "right_angle": 1.0,
+}
+
+def right_angle_segments(leg, offset, out=None):
+    """
+    Endpoints of an L-shaped right angle bend as straight two-point
+    segments, shape (6, 2, 2) indexed [segment, x/y, endpoint]. Segments are
+    horizontal/vertical pairs for the centerline (at 'leg'), outer edge
+    (leg + offset) and inner edge (leg - offset).
+    Pass 'out' to fill a persistent buffer instead of allocating.
+    """
+    if out is None:
+        out = np.empty((6, 2, 2))
+    for i, r in enumerate((leg, leg + offset, leg - offset)):
+        horiz, vert = out[2 * i], out[2 * i + 1]
+        horiz[0, 0], horiz[0, 1] = 0.0, r
+        horiz[1] = r
+        vert[0] = r
+        vert[1, 0], vert[1, 1] = 0.0, r
+    return out
+
+class RightAngleBend:
+    """
+    L-shaped 90° bend with centerline length 'length' (two legs of
+    length/2) and trace width 'width'.
+
+    All lengths and polylines are computed on demand from the two inputs.
+    """
+    __slots__ = ("length", "width")
+
+    def __init__(self, length, width):
+        self.length = length
+        self.width = width
+
+    def __repr__(self):
+        return f"RightAngleBend(length={self.length!r}, width={self.width!r})"
+
+    @property
+    def leg(self):
+        return self.length / 2.0
+
+    @property
+    def offset(self):
+        return self.width / 2.0
+
+    @property
+    def center_length(self):
+        return self.length
+
+    @property
+    def inner_length(self):
+        return self.length - self.width
+
+    @property
+    def outer_length(self):
+        return self.length + self.width
+
+    def edge_leg(self, edge="center"):
+        """
+        Leg length of the given edge ('center', 'inner' or 'outer').
+        """
+        if edge == "center":
+            return self.leg
+        if edge == "inner":
+            return self.leg - self.offset
+        if edge == "outer":
+            return self.leg + self.offset
+        raise ValueError(f"Unknown edge: {edge}")
+
+    def segments(self, out=None):
+        """
+        Two-point segments of all three edges; see right_angle_segments.
+        """
+        return right_angle_segments(self.leg, self.offset, out)
+
+    def polyline(self, edge="center"):
+        """
+        (x, y) vertices of one edge: (0, r) -> (r, r) -> (r, 0).
+        """
+        r = self.edge_leg(edge)
+        return np.array([0.0, r, r]), np.array([r, r, 0.0])
+
+class CircularBend:
+    """
+    Quarter-circle bend with centerline radius 'radius' and trace width
+    'width', centred on the origin and sweeping 0° to 90°.
+
+    'center_length' defaults to (π/2)·radius; from_center_length() keeps a
+    given centerline length exactly, so inner/outer lengths match the
+    calculator's L ∓ (π/4)·W formulas to the last digit.
+    """
+    __slots__ = ("radius", "width", "center_length")
+
+    def __init__(self, radius, width, center_length=None):
+        self.radius = radius
+        self.width = width
+        self.center_length = (math.pi / 2) * radius if center_length is None else center_length
+
+    @classmethod
+    def from_center_length(cls, length, width):
+        return cls((2 / math.pi) * length, width, length)
+
+    def __repr__(self):
+        return f"CircularBend(radius={self.radius!r}, width={self.width!r})"
+
+    @property
+    def offset(self):
+        return self.width / 2.0
+
+    @property
+    def inner_length(self):
+        return self.center_length - EDGE_FACTOR["circular"] * self.width
+
+    @property
+    def outer_length(self):
+        return self.center_length + EDGE_FACTOR["circular"] * self.width
+
+    def edge_radius(self, edge="center"):
+        """
+        Radius of the given edge ('center', 'inner' or 'outer').
+        """
+        if edge == "center":
+            return self.radius
+        if edge == "inner":
+            return self.radius - self.offset
+        if edge == "outer":
+            return self.radius + self.offset
+        raise ValueError(f"Unknown edge: {edge}")
+
+    def polyline(self, edge="center", points=None, buffer=None):
+        """
+        (x, y) samples of one edge, 'points' samples (default: the buffer's
+        current resolution, or DEFAULT_ARC_POINTS). With an
+        arc_cache.ArcBuffer as 'buffer' the samples are written into it
+        instead of newly allocated.
+        """
+        r = self.edge_radius(edge)
+        if buffer is not None:
+            return buffer.scale(r, points)
+        unit = unit_arc(points or DEFAULT_ARC_POINTS)
+        return unit[0] * r, unit[1] * r
+
+class BendArray:
+    """
+    Many bends of one kind ('circular' or 'right_angle'), stored as
+    float64 arrays of centerline length and width that broadcast together.
+
+    Lengths are evaluated on demand with vectorized NumPy; indexing returns
+    the scalar CircularBend / RightAngleBend for one element.
+    """
+    __slots__ = ("kind", "center_length", "width")
+
+    def __init__(self, kind, center_length, width):
+        if kind not in EDGE_FACTOR:
+            raise ValueError(f"Unknown bend kind: {kind}")
+        self.kind = kind
+        self.center_length, self.width = np.broadcast_arrays(
+            np.asarray(center_length, dtype=np.float64), np.asarray(width, dtype=np.float64))
+
+    def __len__(self):
+        return len(self.center_length)
+
+    @property
+    def shape(self):
+        return self.center_length.shape
+
+    def __getitem__(self, index):
+        length = self.center_length[index]
+        width = self.width[index]
+        if np.ndim(length):
+            return BendArray(self.kind, length, width)
+        if self.kind == "circular":
+            return CircularBend.from_center_length(float(length), float(width))
+        return RightAngleBend(float(length), float(width))
+
+    @property
+    def edge_delta(self):
+        """
+        Centerline minus inner-edge length (= outer minus centerline).
+        """
+        return EDGE_FACTOR[self.kind] * self.width
+
+    @property
+    def inner_length(self):
+        return self.center_length - self.edge_delta
+
+    @property
+    def outer_length(self):
+        return self.center_length + self.edge_delta
+
+    @property
+    def radius(self):
+        """
+        Centerline radius (circular) or leg length (right angle).
+        """
+        if self.kind == "circular":
+            return (2 / math.pi) * self.center_length
+        return self.center_length / 2.0
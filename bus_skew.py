@@ -0,0 +1,306 @@
+import heapq
+import itertools
+import math
+import sys
+from bisect import bisect_left, insort
+
+import numpy as np
+
+from bend_geometry import EDGE_FACTOR
+from propagation import convert_to_inches, read_records, records_to_batch, travel_time_ps
+
+def bus_delays_ps(L_inch, W_inch, Er, n_circular=0, n_right_angle=0):
+    """
+    Delay (ps) of each net: routed length L less the inside-edge shortcut
+    of every bend, (π/4)·W per circular bend and W per right-angle bend, as
+    compute_propagation_times does for a single bend. Broadcasts.
+    """
+    effective = (L_inch - n_circular * EDGE_FACTOR["circular"] * W_inch
+                 - n_right_angle * EDGE_FACTOR["right_angle"] * W_inch)
+    return travel_time_ps(effective, Er)
+
+# Items per block of the sorted delay index (blocks hold up to twice this).
+BLOCK_LOAD = 512
+
+class _SortedIndex:
+    """
+    Sorted list of (delay, name) items kept as a list of sorted blocks of
+    at most 2·load items, with the largest item of each block alongside
+    (the layout of sortedcontainers' SortedList). An insert or delete
+    bisects the block maxima and shifts one block, O(log n + load),
+    instead of shifting the whole list; a block split or removal shifts
+    the n/load maxima.
+    """
+    __slots__ = ("load", "_blocks", "_maxes", "_len")
+
+    def __init__(self, items=(), load=BLOCK_LOAD):
+        items = sorted(items)
+        self.load = load
+        self._blocks = [items[i:i + load] for i in range(0, len(items), load)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(items)
+
+    def __len__(self):
+        return self._len
+
+    def add(self, item):
+        blocks, maxes = self._blocks, self._maxes
+        if not blocks:
+            blocks.append([item])
+            maxes.append(item)
+        else:
+            i = bisect_left(maxes, item)
+            if i == len(maxes):
+                i -= 1
+                blocks[i].append(item)
+                maxes[i] = item
+            else:
+                insort(blocks[i], item)
+            block = blocks[i]
+            if len(block) > 2 * self.load:
+                blocks[i:i + 1] = [block[:self.load], block[self.load:]]
+                maxes[i:i + 1] = [block[self.load - 1], block[-1]]
+        self._len += 1
+
+    def remove(self, item):
+        blocks, maxes = self._blocks, self._maxes
+        i = bisect_left(maxes, item)
+        block = blocks[i] if i < len(blocks) else []
+        j = bisect_left(block, item)
+        if j == len(block) or block[j] != item:
+            raise ValueError(f"{item!r} is not in the index")
+        del block[j]
+        if block:
+            maxes[i] = block[-1]
+        else:
+            del blocks[i]
+            del maxes[i]
+        self._len -= 1
+
+    def first(self):
+        return self._blocks[0][0]
+
+    def last(self):
+        return self._blocks[-1][-1]
+
+    def head(self, k):
+        """
+        The k smallest items, in order.
+        """
+        return list(itertools.islice(itertools.chain.from_iterable(self._blocks), k))
+
+    def tail(self, k):
+        """
+        The k largest items, in order.
+        """
+        items = itertools.chain.from_iterable(reversed(block) for block in reversed(self._blocks))
+        return list(itertools.islice(items, k))[::-1]
+
+    def below(self, key):
+        """
+        Items < key, in order.
+        """
+        i = bisect_left(self._maxes, key)
+        items = list(itertools.chain.from_iterable(self._blocks[:i]))
+        if i < len(self._blocks):
+            block = self._blocks[i]
+            items += block[:bisect_left(block, key)]
+        return items
+
+    def from_key(self, key):
+        """
+        Items >= key, in order.
+        """
+        i = bisect_left(self._maxes, key)
+        if i == len(self._blocks):
+            return []
+        block = self._blocks[i]
+        return block[bisect_left(block, key):] + list(
+            itertools.chain.from_iterable(self._blocks[i + 1:]))
+
+def _check_name(name):
+    # Names break ties between equal delays in the index, so they must
+    # all compare with each other.
+    if not isinstance(name, str):
+        raise TypeError(f"Net names must be strings, got {type(name).__name__} {name!r}")
+
+class BusSkew:
+    """
+    Delays of the nets of one bus, kept in a sorted index so skew queries
+    stay cheap while nets are edited one at a time.
+
+    Delays are computed in bulk at construction. add(), remove() and
+    update() move one net within the index in O(log n + BLOCK_LOAD) (see
+    _SortedIndex), so loading a bus net by net stays O(n log n) rather
+    than quadratic. max_skew() and worst_pair() are O(1), outside() is
+    O(log n + n/BLOCK_LOAD + k) for k offending nets, and worst_pairs(k)
+    only looks at the k fastest and k slowest nets. Net names must be
+    strings.
+    """
+
+    def __init__(self, names, L, W, Er, n_circular=0, n_right_angle=0, units="inches"):
+        names = list(names)
+        for name in names:
+            _check_name(name)
+        if len(set(names)) != len(names):
+            raise ValueError("Net names must be unique")
+        to_inch = convert_to_inches(1.0, units)
+        L, W, Er, n_circular, n_right_angle = np.broadcast_arrays(
+            np.asarray(L, dtype=np.float64) * to_inch, np.asarray(W, dtype=np.float64) * to_inch,
+            np.asarray(Er, dtype=np.float64), np.asarray(n_circular), np.asarray(n_right_angle))
+        if L.shape != (len(names),):
+            raise ValueError("Expected one length per net")
+        delays = bus_delays_ps(L, W, Er, n_circular, n_right_angle)
+        # Per-net inputs (inches) and delay; the index holds (delay, name)
+        # so equal delays still sort deterministically.
+        self._nets = {
+            name: [l, w, er, int(nc), int(nr), d]
+            for name, l, w, er, nc, nr, d in zip(names, L.tolist(), W.tolist(), Er.tolist(),
+                                                 n_circular.tolist(), n_right_angle.tolist(),
+                                                 delays.tolist())
+        }
+        self._index = _SortedIndex((d, name) for name, (*_, d) in self._nets.items())
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, name):
+        return name in self._nets
+
+    def delay(self, name):
+        return self._nets[name][5]
+
+    def add(self, name, L, W, Er, n_circular=0, n_right_angle=0, units="inches"):
+        _check_name(name)
+        if name in self._nets:
+            raise ValueError(f"Net {name} already exists")
+        to_inch = convert_to_inches(1.0, units)
+        d = float(bus_delays_ps(L * to_inch, W * to_inch, Er, n_circular, n_right_angle))
+        self._nets[name] = [L * to_inch, W * to_inch, Er, n_circular, n_right_angle, d]
+        self._index.add((d, name))
+        return d
+
+    def remove(self, name):
+        net = self._nets.pop(name)
+        self._index.remove((net[5], name))
+
+    def update(self, name, L=None, W=None, Er=None, n_circular=None, n_right_angle=None,
+               units="inches"):
+        """
+        Change some of one net's inputs (lengths in 'units') and return its
+        new delay.
+        """
+        net = self._nets[name]
+        to_inch = convert_to_inches(1.0, units)
+        inputs = [net[0] if L is None else L * to_inch,
+                  net[1] if W is None else W * to_inch,
+                  net[2] if Er is None else Er,
+                  net[3] if n_circular is None else n_circular,
+                  net[4] if n_right_angle is None else n_right_angle]
+        d = float(bus_delays_ps(*inputs))
+        # Nothing is changed until the new delay is known, so a bad input
+        # leaves the net and its index entry as they were.
+        self._index.remove((net[5], name))
+        self._index.add((d, name))
+        net[:] = inputs + [d]
+        return d
+
+    def fastest(self):
+        d, name = self._index.first()
+        return name, d
+
+    def slowest(self):
+        d, name = self._index.last()
+        return name, d
+
+    def max_skew(self):
+        return self._index.last()[0] - self._index.first()[0]
+
+    def worst_pair(self):
+        """
+        (fastest net, slowest net, skew in ps).
+        """
+        (d0, fast), (d1, slow) = self._index.first(), self._index.last()
+        return fast, slow, d1 - d0
+
+    def worst_pairs(self, k=10):
+        """
+        The k net pairs with the largest skew, as (fast, slow, skew) tuples,
+        largest first. Every such pair has its fast net among the k fastest
+        and its slow net among the k slowest, so only those are compared.
+        """
+        n = len(self._index)
+        fast = list(enumerate(self._index.head(k)))
+        slow = list(enumerate(self._index.tail(k), max(n - k, 0)))
+        pairs = ((d1 - d0, a, b) for i, (d0, a) in fast for j, (d1, b) in slow if i < j)
+        return [(a, b, skew) for skew, a, b in heapq.nlargest(k, pairs)]
+
+    def outside(self, target_ps=None, tolerance_ps=0.0):
+        """
+        Nets whose delay is more than 'tolerance_ps' from 'target_ps'
+        (default: the slowest net), as (name, delay - target) pairs,
+        fastest first.
+        """
+        if target_ps is None:
+            target_ps = self._index.last()[0]
+        fast = self._index.below((target_ps - tolerance_ps,))
+        slow = self._index.from_key((math.nextafter(target_ps + tolerance_ps, math.inf),))
+        return [(name, d - target_ps) for d, name in fast + slow]
+
+    def summary(self, target_ps=None, tolerance_ps=0.0):
+        fast, slow, skew = self.worst_pair()
+        n_out = len(self.outside(target_ps, tolerance_ps))
+        return (f"{len(self)} nets, max skew {skew:.4g} ps ({fast} -> {slow}), "
+                f"{n_out} outside ±{tolerance_ps:g} ps")
+
+def bus_from_records(records):
+    """
+    Build a BusSkew from calculator-style records (net, L, W, Er, units)
+    with optional n_circular / n_right_angle bend counts.
+    """
+    records = list(records)
+    L, W, Er = records_to_batch(records)
+    names = [str(rec.get("net") or i) for i, rec in enumerate(records)]
+    n_circular = [int(rec.get("n_circular") or 0) for rec in records]
+    n_right_angle = [int(rec.get("n_right_angle") or 0) for rec in records]
+    return BusSkew(names, L, W, Er, n_circular, n_right_angle)
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Bus skew report: read per-net L/W/Er and bend counts "
+                    "(CSV with header or JSON Lines) and list the worst offenders.")
+    parser.add_argument("input", nargs="?", default="-", help="input file (default: stdin)")
+    parser.add_argument("--target-ps", type=float, default=None,
+                        help="target delay (default: slowest net)")
+    parser.add_argument("--tolerance-ps", type=float, default=0.0)
+    parser.add_argument("--pairs", type=int, default=5, help="worst pairs to list")
+    args = parser.parse_args(argv)
+
+    stream = sys.stdin if args.input == "-" else open(args.input, newline="")
+    try:
+        bus = bus_from_records(read_records(stream))
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    if not len(bus):
+        print("error: no nets in input", file=sys.stderr)
+        return 1
+
+    print(bus.summary(args.target_ps, args.tolerance_ps))
+    print("worst pairs:")
+    for fast, slow, skew in bus.worst_pairs(args.pairs):
+        print(f"  {fast} -> {slow}: {skew:.4g} ps")
+    offenders = bus.outside(args.target_ps, args.tolerance_ps)
+    if offenders:
+        print("outside tolerance:")
+        for name, delta in offenders:
+            print(f"  {name}: {delta:+.4g} ps")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,105 +1,173 @@
-import math
-import tkinter as tk
-from tkinter import ttk
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-def convert_to_inches(value, unit):
+from instrumentation import stage
+from monte_carlo import (DEFAULT_PERCENTILES, Distribution, format_percentile, nominal_delays,
+                         run_monte_carlo)
+from propagation import check_propagation_inputs, convert_to_inches, compute_propagation_times
+from results_cache import make_key, shared_cache
+
+# How often (ms) the Tk event loop checks a background job for progress
+# and its result.
+POLL_MS = 50
+
+# Default sample count of the tolerance study.
+DEFAULT_SAMPLES = 1_000_000
+
+# Result fields shown in the tolerance report, with their labels.
+TOLERANCE_FIELDS = (
+    ("t_circular_ps", "Circular-bend line"),
+    ("t_rightangle_ps", "Right-angle bend"),
+    ("dt_circular_ps", "Straight - Circular"),
+    ("dt_rightangle_ps", "Straight - Right-angle"),
+)
+
+class Cancelled(Exception):
     """
-    Convert a given 'value' in the specified 'unit' to inches.
-      - 'inches' -> 1 : 1
-      - 'meters' -> 1 inch = 0.0254 m => value_in_m / 0.0254
-      - 'mils'   -> 1 mil = 0.001 inch => value_in_mils * 0.001
+    Raised inside a background job once it has been cancelled.
     """
-    if unit == "inches":
-        return value
-    elif unit == "meters":
-        return value / 0.0254
-    elif unit == "mils":
-        return value * 0.001
-    else:
-        raise ValueError(f"Unknown unit: {unit}")
-
-def compute_propagation_times(L_inch, W_inch, Er):
+
+class _Job:
+    __slots__ = ("future", "cancelled", "fraction", "on_done", "on_progress", "on_error")
+
+    def __init__(self, on_done, on_progress, on_error):
+        self.future = None
+        self.cancelled = threading.Event()
+        self.fraction = 0.0
+        self.on_done = on_done
+        self.on_progress = on_progress
+        self.on_error = on_error
+
+    def progress(self, done, total):
+        if self.cancelled.is_set():
+            raise Cancelled()
+        self.fraction = done / total if total else 1.0
+
+class BackgroundRunner:
     """
-    Returns a multi-line string describing:
-      1) Effective lengths (inches => meters).
-      2) Propagation speed in the dielectric.
-      3) Travel times (in ps).
-      4) Time differences vs. the straight line (in ps).
-
-    Parameters
-    ----------
-      L_inch : float
-        The nominal centerline length in inches.
-      W_inch : float
-        The trace width in inches.
-      Er : float
-        The dielectric constant (relative permittivity).
+    Runs calculator jobs on a worker thread so the Tk event loop stays
+    responsive. submit(fn, on_done) calls fn(progress) on the worker; the
+    job reports with progress(done, total), which raises Cancelled once
+    cancel() has been called. The callbacks - on_done(result),
+    on_progress(fraction) and on_error(exc) - all run on the Tk thread:
+    'after' (root.after) reschedules poll() every 'poll_ms' while a job
+    is running.
+
+    Only the latest job is delivered: submitting a new one cancels the
+    one in flight, so a slow study never overwrites newer results.
     """
 
-    # 1) Effective Lengths (inches)
-    L_straight_in   = L_inch
-    L_circular_in   = L_inch - (math.pi / 4.0) * W_inch
-    L_rightangle_in = L_inch - W_inch
-
-    # 2) Convert inches to meters
-    inch_to_meter = 0.0254
-    L_straight_m   = L_straight_in   * inch_to_meter
-    L_circular_m   = L_circular_in   * inch_to_meter
-    L_rightangle_m = L_rightangle_in * inch_to_meter
-
-    # 3) Propagation Speed in dielectric: v = c / sqrt(Er)
-    c = 2.99792458e8  # speed of light in vacuum (m/s)
-    v = c / math.sqrt(Er)
-
-    # 4) Travel Times in picoseconds
-    #    time = distance / speed => convert seconds => ps (1 s = 1e12 ps)
-    sec_to_ps = 1e12
-    t_straight_s    = L_straight_m   / v
-    t_circular_s    = L_circular_m   / v
-    t_rightangle_s  = L_rightangle_m / v
-
-    t_straight_ps    = t_straight_s   * sec_to_ps
-    t_circular_ps    = t_circular_s   * sec_to_ps
-    t_rightangle_ps  = t_rightangle_s * sec_to_ps
-
-    # 5) Differences vs. straight line
-    dt_circular_ps   = t_straight_ps - t_circular_ps
-    dt_rightangle_ps = t_straight_ps - t_rightangle_ps
-
-    # Prepare a formatted results string (~10 significant figures)
+    def __init__(self, after, poll_ms=POLL_MS):
+        self._after = after
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="calculator")
+        self._job = None
+        self._polling = False
+
+    @property
+    def busy(self):
+        return self._job is not None
+
+    def submit(self, fn, on_done, on_progress=None, on_error=None):
+        self.cancel()
+        job = self._job = _Job(on_done, on_progress, on_error)
+        job.future = self._executor.submit(fn, job.progress)
+        if not self._polling:
+            self._polling = True
+            self._after(self.poll_ms, self.poll)
+
+    def cancel(self):
+        """
+        Cancel the running job, if any; its result is never delivered.
+        """
+        if self._job is not None:
+            self._job.cancelled.set()
+            self._job = None
+
+    def poll(self):
+        job = self._job
+        if job is None:
+            self._polling = False
+            return
+        if not job.future.done():
+            if job.on_progress is not None:
+                job.on_progress(job.fraction)
+            self._after(self.poll_ms, self.poll)
+            return
+        self._job = None
+        self._polling = False
+        exc = job.future.exception()
+        if exc is None:
+            job.on_done(job.future.result())
+        elif job.on_error is not None and not isinstance(exc, Cancelled):
+            job.on_error(exc)
+
+    def close(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+def format_tolerance_report(stats, nominal, W_sigma_inch, Er_sigma):
+    """
+    Returns a multi-line string summarising run_monte_carlo results: the
+    nominal, mean, σ and percentiles of the bend delays, the percentiles
+    to the precision of the quantile sketch.
+    """
+    count = next(iter(stats.values())).count
     result = []
     result.append("---------------------------------------------------")
-    result.append(f"INPUT PARAMETERS (Converted to inches internally):")
-    result.append(f"  L_inch = {L_inch:.10g} inches")
-    result.append(f"  W_inch = {W_inch:.10g} inches")
-    result.append(f"  Er     = {Er:.10g}")
-    result.append("")
-    result.append("EFFECTIVE LENGTHS (inches => meters):")
-    result.append(f"  Straight:    {L_straight_in:.10g} in   => {L_straight_m:.10g} m")
-    result.append(f"  Circular:    {L_circular_in:.10g} in   => {L_circular_m:.10g} m")
-    result.append(f"  Right-angle: {L_rightangle_in:.10g} in => {L_rightangle_m:.10g} m")
-    result.append("")
-    result.append("PROPAGATION SPEED:")
-    result.append("  c = 2.99792458e8 m/s")
-    result.append(f"  v = c / sqrt(Er) = {v:.10g} m/s")
-    result.append("")
-    result.append("TRAVEL TIMES (picoseconds):")
-    result.append(f"  Straight line:       {t_straight_ps:.10g} ps")
-    result.append(f"  Circular-bend line:  {t_circular_ps:.10g} ps")
-    result.append(f"  Right-angle bend:    {t_rightangle_ps:.10g} ps")
-    result.append("")
-    result.append("TIME DIFFERENCE vs. STRAIGHT (ps):")
-    result.append(f"  Straight - Circular:    {dt_circular_ps:.10g} ps")
-    result.append(f"  Straight - Right-angle: {dt_rightangle_ps:.10g} ps")
+    result.append(f"TOLERANCE STUDY ({count} samples):")
+    result.append(f"  W  sigma = {W_sigma_inch:.6g} inches")
+    result.append(f"  Er sigma = {Er_sigma:.6g}")
+    for name, label in TOLERANCE_FIELDS:
+        s = stats[name]
+        result.append("")
+        result.append(f"{label} (ps):")
+        result.append(f"  nominal {nominal[name]:.6g}  mean {s.mean:.6g}  sigma {s.std:.4g}")
+        cells = [f"p{p:g} {format_percentile(v, s.sketch.alpha)}" for p, v in
+                 zip(DEFAULT_PERCENTILES, s.percentiles(DEFAULT_PERCENTILES))]
+        for i in range(0, len(cells), 3):
+            result.append("  " + "  ".join(cells[i:i + 3]))
     result.append("---------------------------------------------------")
     return "\n".join(result)
 
+def tolerance_report(L_inch, W_inch, Er, W_sigma_inch, Er_sigma, samples=DEFAULT_SAMPLES,
+                     progress=None):
+    """
+    Monte Carlo study of a trace with normally distributed width and Er,
+    formatted with format_tolerance_report. 'progress' is passed on to
+    run_monte_carlo.
+    """
+    W = Distribution("normal", W_inch, W_sigma_inch)
+    Er = Distribution("normal", Er, Er_sigma)
+    stats = run_monte_carlo(L_inch, W, Er, samples, progress=progress)
+    return format_tolerance_report(stats, nominal_delays(L_inch, W, Er), W_sigma_inch,
+                                   Er_sigma)
+
+def show_text(text):
+    with stage("calculator.text"):
+        text_output.delete("1.0", tk.END)
+        text_output.insert(tk.END, text)
+
+def show_progress(fraction):
+    progress_bar["value"] = fraction
+    status.set(f"Running... {fraction:.0%}")
+
+def finish(text):
+    progress_bar["value"] = 0.0
+    status.set("")
+    show_text(text)
+
+def show_error(exc):
+    progress_bar["value"] = 0.0
+    status.set("")
+    show_text(f"Error: {exc}")
+
 def on_compute():
     """
     Callback for the 'Compute' button.
     Reads user inputs for L, W, Er, plus the selected units from each dropdown.
-    Converts L and W to inches, then calls compute_propagation_times.
-    Displays the results in text_output.
+    Converts L and W to inches, then calls compute_propagation_times on the
+    background runner, which displays the results in text_output.
     """
     try:
         # Get user inputs from the GUI
@@ -114,75 +182,180 @@ def on_compute():
         # Convert L and W to inches
         L_inch = convert_to_inches(L_value, L_unit)
         W_inch = convert_to_inches(W_value, W_unit)
+        check_propagation_inputs(L_inch, W_inch, Er_value)
 
-        # Perform the calculations
-        output_str = compute_propagation_times(L_inch, W_inch, Er_value)
+    except ValueError:
+        # If user typed invalid input
+        show_text("Error: Please enter valid numeric values.")
+        return
 
-        # Show results in the text box
-        text_output.delete("1.0", tk.END)
-        text_output.insert(tk.END, output_str)
+    # Results are memoized on the raw inputs and units. The cache is not
+    # thread-safe, so it is only used here and in the done callback, both
+    # on the Tk thread; only the calculation runs in the background.
+    cache = shared_cache()
+    key = make_key("report", L_value, W_value, Er_value, (L_unit, W_unit))
+    report = cache.get(key)
+    if report is not None:
+        runner.cancel()
+        finish(report)
+        return
+
+    def compute(progress):
+        with stage("calculator.compute"):
+            return compute_propagation_times(L_inch, W_inch, Er_value)
 
+    def done(report):
+        cache.put(key, report)
+        finish(report)
+
+    runner.submit(compute, done, on_error=show_error)
+
+def on_tolerance():
+    """
+    Callback for the 'Tolerance Study' button.
+    Runs a Monte Carlo study of the bend delays with the width and Er
+    spread by the given sigmas (W sigma in the W units) in the background,
+    updating the progress bar until the report is shown in text_output.
+    """
+    try:
+        L_inch = convert_to_inches(float(entry_L.get()), combo_L_units.get())
+        W_inch = convert_to_inches(float(entry_W.get()), combo_W_units.get())
+        W_sigma_inch = convert_to_inches(float(entry_W_sigma.get()), combo_W_units.get())
+        Er_value = float(entry_Er.get())
+        Er_sigma = float(entry_Er_sigma.get())
+        samples = int(float(entry_samples.get()))
+        if W_sigma_inch < 0 or Er_sigma < 0 or samples < 1:
+            raise ValueError()
     except ValueError:
-        # If user typed invalid input
-        text_output.delete("1.0", tk.END)
-        text_output.insert(tk.END, "Error: Please enter valid numeric values.")
+        show_text("Error: Please enter valid numeric values.")
+        return
+
+    def compute(progress):
+        with stage("calculator.tolerance"):
+            return tolerance_report(L_inch, W_inch, Er_value, W_sigma_inch, Er_sigma, samples,
+                                    progress)
+
+    show_progress(0.0)
+    runner.submit(compute, finish, show_progress, show_error)
+
+def on_cancel():
+    """
+    Callback for the 'Cancel' button: drop the running computation.
+    """
+    if runner.busy:
+        runner.cancel()
+        progress_bar["value"] = 0.0
+        status.set("Cancelled")
 
 # -----------------------------
 # Tkinter GUI Setup
 # -----------------------------
-root = tk.Tk()
-root.title("Propagation Time Calculator (Bend-Delay)")
+if __name__ == '__main__':
+    # Tk is only loaded when the window is opened, not on import.
+    import tkinter as tk
+    from tkinter import ttk
+
+    root = tk.Tk()
+    root.title("Propagation Time Calculator (Bend-Delay)")
+
+    # Main frame for input widgets
+    frame_inputs = ttk.Frame(root, padding="10")
+    frame_inputs.grid(row=0, column=0, sticky="w")
+
+    # 1. L input
+    label_L = ttk.Label(frame_inputs, text="Enter L:")
+    label_L.grid(row=0, column=0, padx=(0,5), pady=3, sticky="e")
+
+    entry_L = ttk.Entry(frame_inputs, width=15)
+    entry_L.grid(row=0, column=1, pady=3, sticky="w")
+    entry_L.insert(0, "10.0")  # default
+
+    combo_L_units = ttk.Combobox(frame_inputs, values=["inches", "meters", "mils"], width=8)
+    combo_L_units.grid(row=0, column=2, padx=(5,0), pady=3, sticky="w")
+    combo_L_units.current(0)  # default: "inches"
+
+    # 2. W input
+    label_W = ttk.Label(frame_inputs, text="Enter W:")
+    label_W.grid(row=1, column=0, padx=(0,5), pady=3, sticky="e")
+
+    entry_W = ttk.Entry(frame_inputs, width=15)
+    entry_W.grid(row=1, column=1, pady=3, sticky="w")
+    entry_W.insert(0, "0.005")  # default
+
+    combo_W_units = ttk.Combobox(frame_inputs, values=["inches", "meters", "mils"], width=8)
+    combo_W_units.grid(row=1, column=2, padx=(5,0), pady=3, sticky="w")
+    combo_W_units.current(0)  # default: "inches"
+
+    # 3. Er input
+    label_Er = ttk.Label(frame_inputs, text="Dielectric Constant (Er):")
+    label_Er.grid(row=2, column=0, padx=(0,5), pady=3, sticky="e")
+
+    entry_Er = ttk.Entry(frame_inputs, width=15)
+    entry_Er.grid(row=2, column=1, pady=3, sticky="w")
+    entry_Er.insert(0, "3.3")   # default
+
+    # 4. Tolerance study inputs (sigma of W in the W units, sigma of Er)
+    label_W_sigma = ttk.Label(frame_inputs, text="W tolerance (sigma):")
+    label_W_sigma.grid(row=3, column=0, padx=(0,5), pady=3, sticky="e")
+
+    entry_W_sigma = ttk.Entry(frame_inputs, width=15)
+    entry_W_sigma.grid(row=3, column=1, pady=3, sticky="w")
+    entry_W_sigma.insert(0, "0.0005")  # default
+
+    label_Er_sigma = ttk.Label(frame_inputs, text="Er tolerance (sigma):")
+    label_Er_sigma.grid(row=4, column=0, padx=(0,5), pady=3, sticky="e")
+
+    entry_Er_sigma = ttk.Entry(frame_inputs, width=15)
+    entry_Er_sigma.grid(row=4, column=1, pady=3, sticky="w")
+    entry_Er_sigma.insert(0, "0.1")   # default
+
+    label_samples = ttk.Label(frame_inputs, text="Samples:")
+    label_samples.grid(row=5, column=0, padx=(0,5), pady=3, sticky="e")
 
-# Main frame for input widgets
-frame_inputs = ttk.Frame(root, padding="10")
-frame_inputs.grid(row=0, column=0, sticky="w")
+    entry_samples = ttk.Entry(frame_inputs, width=15)
+    entry_samples.grid(row=5, column=1, pady=3, sticky="w")
+    entry_samples.insert(0, str(DEFAULT_SAMPLES))
 
-# 1. L input
-label_L = ttk.Label(frame_inputs, text="Enter L:")
-label_L.grid(row=0, column=0, padx=(0,5), pady=3, sticky="e")
+    # 5. Buttons: computations run in the background, so the window stays
+    # responsive and a long study can be cancelled
+    frame_buttons = ttk.Frame(frame_inputs)
+    frame_buttons.grid(row=6, column=0, columnspan=3, pady=8)
 
-entry_L = ttk.Entry(frame_inputs, width=15)
-entry_L.grid(row=0, column=1, pady=3, sticky="w")
-entry_L.insert(0, "10.0")  # default
+    button_compute = ttk.Button(frame_buttons, text="Compute", command=on_compute)
+    button_compute.grid(row=0, column=0, padx=3)
 
-combo_L_units = ttk.Combobox(frame_inputs, values=["inches", "meters", "mils"], width=8)
-combo_L_units.grid(row=0, column=2, padx=(5,0), pady=3, sticky="w")
-combo_L_units.current(0)  # default: "inches"
+    button_tolerance = ttk.Button(frame_buttons, text="Tolerance Study", command=on_tolerance)
+    button_tolerance.grid(row=0, column=1, padx=3)
 
-# 2. W input
-label_W = ttk.Label(frame_inputs, text="Enter W:")
-label_W.grid(row=1, column=0, padx=(0,5), pady=3, sticky="e")
+    button_cancel = ttk.Button(frame_buttons, text="Cancel", command=on_cancel)
+    button_cancel.grid(row=0, column=2, padx=3)
 
-entry_W = ttk.Entry(frame_inputs, width=15)
-entry_W.grid(row=1, column=1, pady=3, sticky="w")
-entry_W.insert(0, "0.005")  # default
+    # 6. Progress of the running computation
+    progress_bar = ttk.Progressbar(frame_inputs, mode="determinate", maximum=1.0, length=200)
+    progress_bar.grid(row=7, column=0, columnspan=2, pady=3, sticky="w")
 
-combo_W_units = ttk.Combobox(frame_inputs, values=["inches", "meters", "mils"], width=8)
-combo_W_units.grid(row=1, column=2, padx=(5,0), pady=3, sticky="w")
-combo_W_units.current(0)  # default: "inches"
+    status = tk.StringVar(value="")
+    label_status = ttk.Label(frame_inputs, textvariable=status)
+    label_status.grid(row=7, column=2, padx=(5,0), pady=3, sticky="w")
 
-# 3. Er input
-label_Er = ttk.Label(frame_inputs, text="Dielectric Constant (Er):")
-label_Er.grid(row=2, column=0, padx=(0,5), pady=3, sticky="e")
+    runner = BackgroundRunner(root.after)
 
-entry_Er = ttk.Entry(frame_inputs, width=15)
-entry_Er.grid(row=2, column=1, pady=3, sticky="w")
-entry_Er.insert(0, "3.3")   # default
+    def on_close():
+        runner.close()
+        root.destroy()
 
-# 4. Compute button
-button_compute = ttk.Button(frame_inputs, text="Compute", command=on_compute)
-button_compute.grid(row=3, column=0, columnspan=3, pady=8)
+    root.protocol("WM_DELETE_WINDOW", on_close)
 
-# Frame for results
-frame_results = ttk.Frame(root, padding="10")
-frame_results.grid(row=1, column=0, sticky="nsew")
+    # Frame for results
+    frame_results = ttk.Frame(root, padding="10")
+    frame_results.grid(row=1, column=0, sticky="nsew")
 
-# Slightly smaller horizontally, but enough lines to avoid vertical scrolling
-text_output = tk.Text(frame_results, width=60, height=25)
-text_output.grid(row=0, column=0, sticky="nsew")
+    # Slightly smaller horizontally, but enough lines to avoid vertical scrolling
+    text_output = tk.Text(frame_results, width=60, height=25)
+    text_output.grid(row=0, column=0, sticky="nsew")
 
-# Keep it a fixed size rather than resizing
-frame_results.columnconfigure(0, weight=0)
-frame_results.rowconfigure(0, weight=0)
+    # Keep it a fixed size rather than resizing
+    frame_results.columnconfigure(0, weight=0)
+    frame_results.rowconfigure(0, weight=0)
 
-root.mainloop()
+    root.mainloop()
@@ -0,0 +1,434 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from bend_geometry import EDGES, BendArray
+from monte_carlo import RunningStats
+from propagation import (DEFAULT_UNIT, PROPAGATION_DTYPE, compute_propagation_times_batch,
+                         convert_array_to_inches, convert_to_inches, records_to_batch)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Batches of more rows than this (and all sweeps) are computed and encoded
+# in the worker pool instead of on the event loop.
+OFFLOAD_ROWS = 50_000
+
+# Largest sweep grid (L x W x Er points) one request may ask for.
+MAX_SWEEP_POINTS = 1_000_000
+
+MAX_BODY_BYTES = 64 << 20
+MAX_HEADER_BYTES = 64 << 10
+
+# Idle keep-alive connections are closed after this many seconds.
+KEEPALIVE_TIMEOUT = 60.0
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 431: "Request Header Fields Too Large",
+            500: "Internal Server Error", 501: "Not Implemented"}
+
+class _Latency:
+    """
+    Per-endpoint request count, errors, rows and latency. Latencies are
+    buffered and folded into a RunningStats (with its quantile sketch) in
+    batches, so recording one costs a list append.
+    """
+    __slots__ = ("requests", "errors", "rows", "_pending", "_stats")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.rows = 0
+        self._pending = []
+        self._stats = RunningStats(alpha=0.01)
+
+    def record(self, seconds, rows, error):
+        self.requests += 1
+        self.errors += error
+        self.rows += rows
+        self._pending.append(seconds * 1e3)
+        if len(self._pending) >= 4096:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._stats.add(self._pending)
+            self._pending = []
+
+    def summary(self):
+        self._flush()
+        out = {"requests": self.requests, "errors": self.errors, "rows": self.rows}
+        s = self._stats
+        if s.count:
+            p50, p90, p99 = s.percentiles((50, 90, 99))
+            out["latency_ms"] = {"mean": s.mean, "p50": float(p50), "p90": float(p90),
+                                 "p99": float(p99), "max": s.max}
+        return out
+
+def _fields(fields, known):
+    if fields is None:
+        return list(known)
+    unknown = set(fields) - set(known)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return list(fields)
+
+def _delay_columns(L_inch, W_inch, Er, fields):
+    results = compute_propagation_times_batch(L_inch, W_inch, Er)
+    return {name: results[name].tolist() for name in fields}
+
+def _delays_json(L_inch, W_inch, Er, fields):
+    """
+    Pool task: a whole /delays response body, already encoded.
+    """
+    columns = _delay_columns(L_inch, W_inch, Er, fields)
+    return json.dumps({"rows": len(L_inch), "columns": columns}).encode()
+
+def _sweep_json(L, W, Er, units, fields):
+    """
+    Pool task: run a sweep in the worker and return the encoded body.
+    """
+    from sweep import run_sweep
+
+    results = run_sweep(L, W, Er, units=units, fields=fields, workers=1)
+    shape = (len(L), len(W), len(Er))
+    return json.dumps({"shape": shape, "fields": {name: results[name].tolist()
+                                                  for name in fields}}).encode()
+
+def _batch_inputs(body, default_er=None):
+    """
+    (L_inch, W_inch, Er, single) from a /delays or /bend body: one record
+    object, a list of records, {"records": [...]}, or columns
+    {"L": [...], "W": [...], "Er": [...]} with optional unit / L_unit /
+    W_unit names. Er is required unless 'default_er' is given.
+    """
+    if isinstance(body, dict) and isinstance(body.get("L"), list):
+        unit = body.get("unit") or DEFAULT_UNIT
+        L = convert_array_to_inches(body["L"], body.get("L_unit") or unit)
+        W = convert_array_to_inches(body["W"], body.get("W_unit") or unit)
+        Er = np.asarray(body["Er"] if default_er is None else body.get("Er", default_er),
+                        dtype=np.float64)
+        L, W, Er = np.broadcast_arrays(L, W, Er)
+        return L, W, Er, False
+    if isinstance(body, dict) and "records" not in body:
+        # One record: plain scalar conversion, the common per-query case.
+        unit = body.get("unit") or DEFAULT_UNIT
+        Er = body["Er"] if default_er is None else body.get("Er", default_er)
+        return (np.array([convert_to_inches(float(body["L"]), body.get("L_unit") or unit)]),
+                np.array([convert_to_inches(float(body["W"]), body.get("W_unit") or unit)]),
+                np.array([float(Er)]), True)
+    records = body.get("records") if isinstance(body, dict) else body
+    if not isinstance(records, list):
+        raise ValueError("Expected a record, a list of records or columns")
+    if default_er is not None:
+        records = [dict(rec, Er=rec.get("Er", default_er)) for rec in records]
+    return (*records_to_batch(records), False)
+
+class DelayService:
+    """
+    Local HTTP/JSON service for bend-delay queries.
+
+    Endpoints (JSON bodies, HTTP/1.1 keep-alive):
+      POST /delays   compute_propagation_times_batch for one record
+                     {"L", "W", "Er", "unit"} (answered as {"result": {...}}),
+                     a list of records, {"records": [...]} or columns
+                     {"L": [...], "W": [...], "Er": [...]} (answered as
+                     {"rows", "columns": {field: [...]}}); "fields" limits
+                     the returned fields.
+      POST /bend     centerline/inner/outer lengths and radius of circular
+                     or right-angle bends ({"kind", "L", "W", "unit"}), with
+                     edge polylines for a single bend if "polyline" is true.
+      POST /sweep    run_sweep over {"L", "W", "Er": [start, stop, num]}.
+      GET  /metrics  request counts, throughput and latency percentiles.
+      GET  /health
+
+    Small requests are answered on the event loop. Batches above
+    'offload_rows' rows and all sweeps run, including JSON encoding, in a
+    pool of 'workers' processes, so they do not stall other connections.
+    """
+
+    def __init__(self, workers=None, offload_rows=OFFLOAD_ROWS, max_body=MAX_BODY_BYTES,
+                 keepalive_timeout=KEEPALIVE_TIMEOUT):
+        self.workers = workers or os.cpu_count() or 1
+        self.offload_rows = offload_rows
+        self.max_body = max_body
+        self.keepalive_timeout = keepalive_timeout
+        self._pool = None
+        self._routes = {
+            "/delays": ("POST", self._delays),
+            "/bend": ("POST", self._bend),
+            "/sweep": ("POST", self._sweep),
+            "/metrics": ("GET", self._metrics),
+            "/health": ("GET", self._health),
+        }
+        self._endpoints = {path: _Latency() for path in self._routes}
+        self._started = time.perf_counter()
+        self.connections = 0
+        self.open_connections = 0
+
+    async def _offload(self, fn, *args):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    async def _delays(self, body):
+        L, W, Er, single = _batch_inputs(body)
+        fields = _fields(body.get("fields") if isinstance(body, dict) else None,
+                         PROPAGATION_DTYPE.names)
+        if single:
+            columns = _delay_columns(L, W, Er, fields)
+            return {"result": {name: values[0] for name, values in columns.items()}}, 1
+        if len(L) > self.offload_rows:
+            return await self._offload(_delays_json, L, W, Er, fields), len(L)
+        return {"rows": len(L), "columns": _delay_columns(L, W, Er, fields)}, len(L)
+
+    async def _bend(self, body):
+        if not isinstance(body, dict):
+            raise ValueError("Expected an object")
+        kind = body.get("kind", "circular")
+        L, W, _, single = _batch_inputs(body, default_er=1.0)
+        bends = BendArray(kind, L, W)
+        out = {"center_length": bends.center_length.tolist(),
+               "inner_length": bends.inner_length.tolist(),
+               "outer_length": bends.outer_length.tolist(),
+               "radius": bends.radius.tolist()}
+        if single:
+            out = {name: values[0] for name, values in out.items()}
+            if body.get("polyline"):
+                bend = bends[0]
+                points = body.get("points")
+                out["polyline"] = {}
+                for edge in EDGES:
+                    x, y = (bend.polyline(edge, int(points)) if points and kind == "circular"
+                            else bend.polyline(edge))
+                    out["polyline"][edge] = {"x": x.tolist(), "y": y.tolist()}
+        return out, len(L)
+
+    async def _sweep(self, body):
+        from sweep import SWEEP_FIELDS
+
+        if not isinstance(body, dict):
+            raise ValueError("Expected an object")
+        axes = []
+        for key in ("L", "W", "Er"):
+            start, stop, num = body[key]
+            axes.append(np.linspace(float(start), float(stop), int(num)))
+        points = axes[0].size * axes[1].size * axes[2].size
+        if points > MAX_SWEEP_POINTS:
+            raise ValueError(f"Sweep of {points} points exceeds the limit of {MAX_SWEEP_POINTS}")
+        fields = _fields(body.get("fields"), SWEEP_FIELDS)
+        return (await self._offload(_sweep_json, *axes, body.get("units", "inches"), fields),
+                points)
+
+    async def _metrics(self, body):
+        return self.metrics(), 0
+
+    async def _health(self, body):
+        return {"status": "ok"}, 0
+
+    def metrics(self):
+        uptime = time.perf_counter() - self._started
+        endpoints = {path: e.summary() for path, e in self._endpoints.items() if e.requests}
+        requests = sum(e["requests"] for e in endpoints.values())
+        rows = sum(e["rows"] for e in endpoints.values())
+        return {
+            "uptime_s": uptime,
+            "connections": self.connections,
+            "open_connections": self.open_connections,
+            "requests": requests,
+            "requests_per_connection": requests / self.connections if self.connections else 0.0,
+            "requests_per_s": requests / uptime,
+            "rows": rows,
+            "rows_per_s": rows / uptime,
+            "workers": self.workers,
+            "endpoints": endpoints,
+        }
+
+    async def _dispatch(self, method, path, body):
+        """
+        (status, JSON-serialisable payload or encoded bytes, rows).
+        """
+        route = self._routes.get(path)
+        if route is None:
+            return 404, {"error": f"No such endpoint: {path}"}, 0
+        if method != route[0]:
+            return 405, {"error": f"{path} expects {route[0]}"}, 0
+        try:
+            payload = json.loads(body) if body else {}
+            result, rows = await route[1](payload)
+        except (ValueError, KeyError, TypeError) as exc:
+            message = f"missing field {exc}" if isinstance(exc, KeyError) else str(exc)
+            return 400, {"error": message}, 0
+        return 200, result, rows
+
+    async def handle_connection(self, reader, writer):
+        self.connections += 1
+        self.open_connections += 1
+        loop = asyncio.get_running_loop()
+        idle = None
+        try:
+            while True:
+                # An idle timer closing the transport is much cheaper per
+                # request than wrapping every read in asyncio.wait_for.
+                idle = loop.call_later(self.keepalive_timeout, writer.close)
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, {"error": "Headers too large"}, False)
+                    break
+                idle.cancel()
+                start = time.perf_counter()
+                try:
+                    request_line, *lines = head.decode("latin-1").split("\r\n")
+                    method, target, version = request_line.split(" ", 2)
+                    headers = {}
+                    for line in lines:
+                        if line:
+                            name, value = line.split(":", 1)
+                            headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request"}, False)
+                    break
+                if "transfer-encoding" in headers:
+                    await self._respond(writer, 501, {"error": "Send a Content-Length body"},
+                                        False)
+                    break
+                if length > self.max_body:
+                    await self._respond(writer, 413, {"error": "Request body too large"}, False)
+                    break
+                if headers.get("expect", "").lower() == "100-continue":
+                    writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                try:
+                    body = await reader.readexactly(length) if length else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                connection = headers.get("connection", "").lower()
+                keep_alive = (connection != "close" if version == "HTTP/1.1"
+                              else connection == "keep-alive")
+
+                path = target.split("?", 1)[0]
+                try:
+                    status, payload, rows = await self._dispatch(method.upper(), path, body)
+                except Exception as exc:  # keep serving other requests
+                    status, payload, rows = 500, {"error": repr(exc)}, 0
+                await self._respond(writer, status, payload, keep_alive)
+                endpoint = self._endpoints.get(path)
+                if endpoint is not None:
+                    endpoint.record(time.perf_counter() - start, rows, status != 200)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            if idle is not None:
+                idle.cancel()
+            self.open_connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        head = (f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Start listening and return the asyncio server (port=0 picks a free
+        port; see server.sockets[0].getsockname()).
+        """
+        return await asyncio.start_server(self.handle_connection, host, port,
+                                          limit=MAX_HEADER_BYTES)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await self.start(host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+class ServiceClient:
+    """
+    Minimal client keeping one keep-alive connection to a DelayService.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=60.0):
+        import http.client
+
+        self._conn = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload)
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        self._conn.request(method, path, body, headers)
+        response = self._conn.getresponse()
+        data = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(f"{response.status}: {data.get('error')}")
+        return data
+
+    def delays(self, records, fields=None):
+        if isinstance(records, dict):
+            payload = dict(records, fields=fields) if fields else records
+        else:
+            payload = {"records": list(records), "fields": fields}
+        return self.request("POST", "/delays", payload)
+
+    def bend(self, kind, L, W, unit=DEFAULT_UNIT, polyline=False):
+        return self.request("POST", "/bend", {"kind": kind, "L": L, "W": W, "unit": unit,
+                                              "polyline": polyline})
+
+    def metrics(self):
+        return self.request("GET", "/metrics")
+
+    def close(self):
+        self._conn.close()
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Serve bend-delay queries as HTTP/JSON on localhost.")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help="address to bind (default: loopback only)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes for large batches and sweeps (default: CPU count)")
+    parser.add_argument("--offload-rows", type=int, default=OFFLOAD_ROWS,
+                        help="batches larger than this run in the worker pool")
+    args = parser.parse_args(argv)
+
+    service = DelayService(args.workers, args.offload_rows)
+    print(f"serving on http://{args.host}:{args.port} "
+          f"(/delays, /bend, /sweep, /metrics)", file=sys.stderr)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    except OSError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import time
+
+class EventCoalescer:
+    """
+    Throttle a callback to at most one call per 'frame_budget' seconds.
+
+    submit(value) records the newest value. If the previous call finished
+    at least one frame budget ago the callback runs immediately; otherwise
+    the value waits for a single-shot timer, and any value that arrives
+    before the timer fires replaces it (the older one is dropped). The
+    callback therefore always ends up seeing the latest value, but never
+    runs more often than the budget allows.
+
+    'timer' is a matplotlib-style timer (canvas.new_timer()) used to run the
+    trailing call; without one, pending values wait for the next submit()
+    or an explicit flush().
+    """
+
+    def __init__(self, callback, frame_budget=1/30, timer=None, clock=time.perf_counter):
+        self.callback = callback
+        self.frame_budget = frame_budget
+        self.clock = clock
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self._pending = False
+        self._value = None
+        self._running = False
+        self._last_run = float("-inf")
+        self._timer = timer
+        self._timer_armed = False
+        if timer is not None:
+            timer.single_shot = True
+            timer.add_callback(self._on_timer)
+
+    def submit(self, value=None):
+        self.received += 1
+        if self._pending:
+            self.dropped += 1
+        self._pending = True
+        self._value = value
+        if self._running:
+            return
+        wait = self._last_run + self.frame_budget - self.clock()
+        if wait <= 0:
+            self.flush()
+        else:
+            self._arm(wait)
+
+    def flush(self):
+        """
+        Run the callback now with the latest pending value, if any.
+        """
+        if not self._pending or self._running:
+            return
+        value = self._value
+        self._pending = False
+        self._value = None
+        self._running = True
+        try:
+            self.callback(value)
+        finally:
+            self._running = False
+            self._last_run = self.clock()
+            self.processed += 1
+        # Values submitted from inside the callback are handled next frame.
+        if self._pending:
+            self._arm(self.frame_budget)
+
+    def _arm(self, wait):
+        if self._timer is None or self._timer_armed:
+            return
+        self._timer_armed = True
+        self._timer.interval = max(1, int(wait * 1000))
+        self._timer.start()
+
+    def _on_timer(self):
+        self._timer_armed = False
+        wait = self._last_run + self.frame_budget - self.clock()
+        if wait > 0:
+            self._arm(wait)
+        else:
+            self.flush()
+
+    def summary(self):
+        return (f"{self.received} events received, {self.processed} processed, "
+                f"{self.dropped} dropped as stale")
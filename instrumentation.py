@@ -0,0 +1,254 @@
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# Setting either variable turns instrumentation on for the whole process:
+# $BEND_DELAY_PROFILE prints the per-stage summary at exit, and
+# $BEND_DELAY_TRACE names a Chrome trace JSON file written at exit
+# (open it in chrome://tracing or https://ui.perfetto.dev).
+PROFILE_ENV = "BEND_DELAY_PROFILE"
+TRACE_ENV = "BEND_DELAY_TRACE"
+
+# Trace events kept in memory; later events are only counted.
+MAX_TRACE_EVENTS = 1_000_000
+
+class StageStats:
+    """
+    Timing histogram of one stage: count, total and worst time (seconds)
+    and percentiles from a RunningStats quantile sketch. Durations are
+    buffered and folded into the sketch in batches, so recording one is a
+    list append.
+    """
+    __slots__ = ("count", "total", "max", "_pending", "_stats")
+
+    def __init__(self, alpha=0.01):
+        # Imported here: propagation uses this module, and monte_carlo
+        # imports propagation.
+        from monte_carlo import RunningStats
+
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._pending = []
+        self._stats = RunningStats(alpha=alpha)
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self._pending.append(seconds)
+        if len(self._pending) >= 4096:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._stats.add(self._pending)
+            self._pending = []
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentiles(self, p=(50, 90, 99)):
+        self._flush()
+        # The sketch is only accurate to alpha; keep it within the exact max.
+        return [min(float(v), self.max) for v in self._stats.percentiles(p)]
+
+class _Stage:
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._profiler.record(self._name, self._start, time.perf_counter())
+        return False
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+# Returned by stage() while instrumentation is off, so a disabled stage
+# costs one call and a no-op context manager.
+_NULL_STAGE = _NullStage()
+
+class Profiler:
+    """
+    Per-stage timings of one process, with an optional in-memory list of
+    Chrome trace 'complete' events (one per stage entry).
+    """
+
+    def __init__(self, trace=False, max_events=MAX_TRACE_EVENTS):
+        self.stages = {}
+        self.events = [] if trace else None
+        self.max_events = max_events
+        self.dropped = 0
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def record(self, name, start, end):
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            stats.record(end - start)
+            if self.events is not None:
+                if len(self.events) < self.max_events:
+                    self.events.append((name, start, end, threading.get_ident()))
+                else:
+                    self.dropped += 1
+
+    def summary_rows(self):
+        """
+        One dict per stage (times in ms), largest total first.
+        """
+        with self._lock:
+            rows = []
+            for name, s in self.stages.items():
+                p50, p90, p99 = s.percentiles()
+                rows.append({"stage": name, "count": s.count, "total_ms": s.total * 1e3,
+                             "mean_ms": s.mean * 1e3, "p50_ms": p50 * 1e3, "p90_ms": p90 * 1e3,
+                             "p99_ms": p99 * 1e3, "max_ms": s.max * 1e3})
+        return sorted(rows, key=lambda row: -row["total_ms"])
+
+    def summary(self):
+        rows = self.summary_rows()
+        if not rows:
+            return "no instrumented stages ran"
+        width = max(len(row["stage"]) for row in rows)
+        lines = [f"{'stage':<{width}} {'count':>8} {'total ms':>10} {'mean ms':>9} "
+                 f"{'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+        for row in rows:
+            lines.append(f"{row['stage']:<{width}} {row['count']:>8} {row['total_ms']:>10.3f} "
+                         f"{row['mean_ms']:>9.4f} {row['p50_ms']:>9.4f} {row['p99_ms']:>9.4f} "
+                         f"{row['max_ms']:>9.4f}")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """
+        The recorded events in the Chrome trace event format.
+        """
+        pid = os.getpid()
+        with self._lock:
+            events = [{"name": name, "cat": name.split(".", 1)[0], "ph": "X", "pid": pid,
+                       "tid": tid, "ts": (start - self._origin) * 1e6, "dur": (end - start) * 1e6}
+                      for name, start, end, tid in (self.events or ())]
+        events.append({"name": "process_name", "ph": "M", "pid": pid,
+                       "args": {"name": os.path.basename(sys.argv[0]) or "python"}})
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"dropped_events": self.dropped}}
+
+    def write_chrome_trace(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+_profiler = None
+
+def stage(name):
+    """
+    Context manager timing one stage under 'name' ('<component>.<stage>')
+    when instrumentation is enabled; a shared no-op otherwise.
+    """
+    if _profiler is None:
+        return _NULL_STAGE
+    return _Stage(_profiler, name)
+
+def instrument(name):
+    """
+    Decorator timing every call of a function as stage 'name'.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return fn(*args, **kwargs)
+            with _Stage(_profiler, name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def enabled():
+    return _profiler is not None
+
+def active_profiler():
+    return _profiler
+
+def enable(trace_path=None, summary=True, stream=None):
+    """
+    Turn instrumentation on for this process and return the Profiler. At
+    exit the summary is printed to 'stream' (default stderr) if 'summary'
+    is set, and the Chrome trace written to 'trace_path' if given. Calling
+    it again returns the running profiler.
+    """
+    global _profiler
+    if _profiler is not None:
+        return _profiler
+    profiler = _profiler = Profiler(trace=trace_path is not None)
+
+    def report():
+        if summary:
+            print(profiler.summary(), file=stream or sys.stderr)
+        if trace_path is not None:
+            profiler.write_chrome_trace(trace_path)
+            print(f"wrote {len(profiler.events)} trace events to {trace_path}",
+                  file=stream or sys.stderr)
+
+    atexit.register(report)
+    return profiler
+
+def disable():
+    """
+    Stop recording (the exit report of an earlier enable() still runs).
+    """
+    global _profiler
+    _profiler = None
+
+def _from_environment():
+    trace_path = os.environ.get(TRACE_ENV) or None
+    if os.environ.get(PROFILE_ENV) or trace_path:
+        enable(trace_path, summary=bool(os.environ.get(PROFILE_ENV)))
+
+_from_environment()
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description=f"Summarise a Chrome trace written via ${TRACE_ENV} per stage.")
+    parser.add_argument("trace", help="trace JSON file")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.trace) as f:
+            events = json.load(f)["traceEvents"]
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    profiler = Profiler()
+    for event in events:
+        if event.get("ph") == "X":
+            start = event["ts"] * 1e-6
+            profiler.record(event["name"], start, start + event["dur"] * 1e-6)
+    print(profiler.summary())
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
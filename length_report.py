@@ -0,0 +1,249 @@
+import csv
+import itertools
+import json
+import sys
+import time
+
+import numpy as np
+
+from instrumentation import stage
+from propagation import (DEFAULT_UNIT, PROPAGATION_DTYPE, check_propagation_inputs,
+                         compute_propagation_times_batch, convert_array_to_inches,
+                         convert_to_inches)
+from results_store import ColumnWriter, TextSink, open_sink
+
+# Column names looked up in each length report. Reports exported from PCB
+# tools rarely agree on naming, so every one of these can be overridden.
+DEFAULT_COLUMNS = {
+    "id": "net",
+    "L": "L",
+    "W": "W",
+    "Er": "Er",
+    "unit": "unit",
+    "L_unit": "L_unit",
+    "W_unit": "W_unit",
+}
+
+def read_column_chunks(stream, fmt="csv", chunk_size=65536):
+    """
+    Generator: read a CSV (with header) or JSON Lines stream 'chunk_size'
+    rows at a time and yield each chunk as a dict of column name -> list.
+    Only one chunk is held in memory at once. A JSON Lines chunk has a
+    column for every key found in any of its records, with None where a
+    record lacks the key; a CSV row with more or fewer fields than the
+    header is an error.
+    """
+    if fmt == "csv":
+        reader = csv.reader(stream)
+        header = next(reader, None)
+        if header is None:
+            return
+        header = [name.strip() for name in header]
+        rows_in = (row for row in reader if row)
+        start = 0
+        while True:
+            rows = list(itertools.islice(rows_in, chunk_size))
+            if not rows:
+                return
+            for i, row in enumerate(rows):
+                if len(row) != len(header):
+                    raise ValueError(f"Record {start + i} has {len(row)} fields, "
+                                     f"expected {len(header)}")
+            yield dict(zip(header, map(list, zip(*rows))))
+            start += len(rows)
+    elif fmt == "jsonl":
+        lines = (line for line in stream if line.strip())
+        start = 0
+        while True:
+            records = [json.loads(line) for line in itertools.islice(lines, chunk_size)]
+            if not records:
+                return
+            for i, rec in enumerate(records):
+                if not isinstance(rec, dict):
+                    raise ValueError(f"Record {start + i} is not a JSON object")
+            names = dict.fromkeys(name for rec in records for name in rec)
+            yield {name: [rec.get(name) for rec in records] for name in names}
+            start += len(records)
+    else:
+        raise ValueError(f"Unknown input format: {fmt}")
+
+def _units(columns, names, key, default_unit):
+    """
+    Resolve the unit for one dimension, row by row: per-dimension column,
+    then shared 'unit' column, then the default. Returns a string or an
+    array of strings.
+    """
+    own, shared = columns.get(names[key]), columns.get(names["unit"])
+    if own is None and shared is None:
+        return default_unit
+    n = len(own if own is not None else shared)
+    return np.array([unit or fallback or default_unit for unit, fallback in
+                     zip(own or [None] * n, shared or [None] * n)])
+
+def _column(columns, name, n, start=0, required=True):
+    """
+    (values, missing): one column as floats and a boolean mask of the rows
+    without a value (None when every row has one). Missing values are an
+    error if the column is 'required'.
+    """
+    values = columns.get(name)
+    if values is not None and None not in values:
+        return np.asarray(values, dtype=np.float64), None
+    if values is None:
+        missing = np.ones(n, dtype=bool)
+        values = np.zeros(n)
+    else:
+        missing = np.array([value is None for value in values])
+        values = np.asarray([0.0 if value is None else value for value in values],
+                            dtype=np.float64)
+    if required and missing.any():
+        if name not in columns and start == 0:
+            raise ValueError(f"Length report has no '{name}' column and no default was given")
+        raise ValueError(f"Record {start + int(missing.argmax())} has no '{name}' value and "
+                         f"no default was given")
+    return values, missing
+
+def convert_chunks(chunks, columns=None, default_unit=DEFAULT_UNIT, default_W=None, default_Er=None):
+    """
+    Generator: turn raw column chunks into (ids, L_inch, W_inch, Er) arrays,
+    converting units with convert_array_to_inches. Records without a width
+    or Er (no such column, or the key missing from a JSON record) use
+    default_W (in default_unit) / default_Er.
+    """
+    names = dict(DEFAULT_COLUMNS, **(columns or {}))
+    start = 0
+    for chunk in chunks:
+        n = len(next(iter(chunk.values())))
+        ids = chunk.get(names["id"])
+        L, _ = _column(chunk, names["L"], n, start)
+        W, W_missing = _column(chunk, names["W"], n, start, default_W is None)
+        Er, Er_missing = _column(chunk, names["Er"], n, start, default_Er is None)
+        start += n
+        L_inch = convert_array_to_inches(L, _units(chunk, names, "L_unit", default_unit))
+        W_inch = convert_array_to_inches(W, _units(chunk, names, "W_unit", default_unit))
+        # Defaults are in default_unit whatever the record's own unit.
+        if W_missing is not None:
+            W_inch[W_missing] = convert_to_inches(default_W, default_unit)
+        if Er_missing is not None:
+            Er[Er_missing] = default_Er
+        yield ids, L_inch, W_inch, Er
+
+def compute_chunks(converted):
+    """
+    Generator: compute bend delays (PROPAGATION_DTYPE records) per chunk.
+    """
+    start = 0
+    for ids, L_inch, W_inch, Er in converted:
+        with stage("length_report.compute"):
+            check_propagation_inputs(L_inch, W_inch, Er, start)
+            results = compute_propagation_times_batch(L_inch, W_inch, Er)
+        start += len(results)
+        yield ids, results
+
+def run_pipeline(src, dst, input_format="csv", output_format="csv", chunk_size=65536,
+                 columns=None, default_unit=DEFAULT_UNIT, default_W=None, default_Er=None,
+                 fields=None):
+    """
+    Stream a length report from 'src' to 'dst', one chunk at a time. 'dst'
+    is a text stream for the csv/jsonl output formats, a store directory
+    for output_format='columns', or any sink with write(results, ids)
+    (see results_store). 'fields' optionally restricts the written result
+    columns; text formatting dominates the run time, so fewer fields is
+    faster.
+
+    Returns a summary dict with the number of rows and chunks processed,
+    the elapsed wall time (s) and the throughput (rows/s).
+    """
+    unknown = set(fields or ()) - set(PROPAGATION_DTYPE.names)
+    if unknown:
+        raise ValueError(f"Unknown result fields: {', '.join(sorted(unknown))}")
+    id_name = (columns or {}).get("id", DEFAULT_COLUMNS["id"])
+    if isinstance(dst, (ColumnWriter, TextSink)):
+        sink = dst
+    elif output_format == "columns":
+        sink = ColumnWriter(dst, id_name)
+    else:
+        sink = TextSink(dst, output_format, id_name)
+    start = time.perf_counter()
+    rows = 0
+    n_chunks = 0
+    chunks = read_column_chunks(src, input_format, chunk_size)
+    converted = convert_chunks(chunks, columns, default_unit, default_W, default_Er)
+    try:
+        for ids, results in compute_chunks(converted):
+            if fields:
+                results = results[list(fields)]
+            with stage("length_report.write"):
+                sink.write(results, ids)
+            rows += len(results)
+            n_chunks += 1
+    finally:
+        if sink is not dst:
+            sink.close()
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "chunks": n_chunks,
+        "elapsed_s": elapsed,
+        "rows_per_s": rows / elapsed if elapsed > 0 else 0.0,
+    }
+
+def format_summary(summary):
+    return (f"{summary['rows']} rows in {summary['chunks']} chunks, "
+            f"{summary['elapsed_s']:.3f} s ({summary['rows_per_s']:.0f} rows/s)")
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Stream a CSV/JSONL length report through the bend-delay calculator "
+                    "with bounded memory.")
+    parser.add_argument("input", nargs="?", default="-", help="length report (default: stdin)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="results store directory, or a .csv/.jsonl file (default: stdout)")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"], default=None,
+                        help="default: from the file extension, else csv")
+    parser.add_argument("--output-format", choices=["columns", "csv", "jsonl"], default=None,
+                        help="default: columns for a directory, else csv/jsonl by extension")
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    parser.add_argument("--fields", default=None,
+                        help="comma-separated result fields to write (default: all)")
+    parser.add_argument("--unit", default=DEFAULT_UNIT, choices=["inches", "meters", "mils"],
+                        help="unit for rows without a unit column")
+    parser.add_argument("--width", type=float, default=None,
+                        help="trace width used for records without a width")
+    parser.add_argument("--er", type=float, default=None,
+                        help="dielectric constant used for records without an Er")
+    for key in DEFAULT_COLUMNS:
+        parser.add_argument(f"--{key.lower().replace('_', '-')}-col", dest=f"col_{key}",
+                            default=DEFAULT_COLUMNS[key], help=f"column holding {key}")
+    args = parser.parse_args(argv)
+
+    input_format = args.input_format
+    if input_format is None:
+        input_format = "jsonl" if args.input.endswith((".jsonl", ".ndjson")) else "csv"
+    columns = {key: getattr(args, f"col_{key}") for key in DEFAULT_COLUMNS}
+
+    try:
+        dst = open_sink(args.output, args.output_format, columns["id"])
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    src = sys.stdin if args.input == "-" else open(args.input, newline="")
+    try:
+        summary = run_pipeline(src, dst, input_format, chunk_size=args.chunk_size,
+                               columns=columns, default_unit=args.unit, default_W=args.width,
+                               default_Er=args.er,
+                               fields=args.fields.split(",") if args.fields else None)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        dst.close()
+    print(format_summary(summary), file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
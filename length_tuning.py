@@ -0,0 +1,222 @@
+import math
+import sys
+
+import numpy as np
+
+from bend_geometry import EDGE_FACTOR
+from meander import (CORNER_EDGE_FACTOR, CORNER_SAVING, DEFAULT_CORNER_FRACTION, _check_corner,
+                     corner_size_limits, default_corner_size, meander_lengths)
+from propagation import convert_to_inches, length_for_delay_in, read_records, travel_time_ps
+
+# One row per tuned net. Lengths are in the units the solver was called
+# with; 'added_length' is what the meander adds over the straight run it
+# replaces, and 'error_ps' is the achieved minus the target delay.
+TUNING_DTYPE = np.dtype([
+    ("base_delay_ps", "f8"),
+    ("target_delay_ps", "f8"),
+    ("n_legs", "i8"),
+    ("amplitude", "f8"),
+    ("corner_size", "f8"),
+    ("added_length", "f8"),
+    ("delay_ps", "f8"),
+    ("error_ps", "f8"),
+])
+
+def meander_extra_length(n_legs, amplitude, pitch, width, corner="arc", corner_size=None, lead=0.0):
+    """
+    Effective length a meander adds over its footprint, the straight run of
+    (n_legs - 1)·pitch + 2·lead it replaces in the route. Broadcasts like
+    meander.meander_lengths.
+    """
+    lengths = meander_lengths(n_legs, amplitude, pitch, width, corner, corner_size, lead)
+    return lengths["effective_length"] - ((np.asarray(n_legs) - 1) * pitch + 2 * np.asarray(lead))
+
+def solve_meanders(extra, width, pitch, max_amplitude, corner="arc", corner_size=None, lead=0.0,
+                   even=True):
+    """
+    Fewest legs, and the amplitude for them, so that a meander adds exactly
+    'extra' effective length. All numeric arguments broadcast; one corner
+    style per call. Returns (n_legs, amplitude, corner_size) arrays.
+
+    The added length is n·A minus a fixed loss per corner (the corner
+    saving plus the inside-edge shortcut), with 2(n - 1) corners plus two
+    more for the lead-in/out. That is linear in both n and A, so both come
+    out in closed form. With corner_size=None the corners follow
+    meander.default_corner_size: a fixed fraction of A, clipped to the
+    range of meander.corner_size_limits for the pitch, width and lead.
+    That makes the loss piecewise linear in A; each piece is solved
+    directly.
+
+    'even' rounds the leg count up to an even number so the route leaves
+    the meander on the same side it entered. Rows with extra <= 0 get no
+    meander (n_legs = 0).
+    """
+    _check_corner(corner)
+    extra, width, pitch, max_amplitude, lead = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.float64) for a in (extra, width, pitch, max_amplitude, lead)))
+    saving = CORNER_SAVING[corner]
+    edge = CORNER_EDGE_FACTOR[corner] * width
+    end_corners = 2 * (lead > 0)
+
+    auto = corner_size is None
+    if auto:
+        # Corner size as a function of A: fraction·A, but at least
+        # 'smallest' and at most 'cap' (the limit set by pitch and lead).
+        fraction = DEFAULT_CORNER_FRACTION[corner]
+        smallest = corner_size_limits(corner, pitch, np.inf, width, lead)[0]
+        cap = default_corner_size(corner, pitch, np.inf, lead, width)
+        if np.any(cap < smallest):
+            raise ValueError("pitch or lead is too small for any corner_size at this width")
+        size_max = np.clip(fraction * max_amplitude, smallest, cap)
+    else:
+        size_max = np.broadcast_to(np.asarray(corner_size, dtype=np.float64), extra.shape)
+        low, high = corner_size_limits(corner, pitch, max_amplitude, width, lead)
+        if corner != "right_angle" and (np.any(size_max > high) or np.any(size_max < low)):
+            raise ValueError("corner_size is outside the range the meander lengths hold for "
+                             "(see meander.corner_size_limits)")
+    loss_max = saving * size_max + edge
+    gain = max_amplitude - 2 * loss_max
+    if np.any(gain <= 0):
+        raise ValueError("max_amplitude is too small to add length with this width and corner size")
+
+    wanted = extra > 0
+    n = np.ceil((extra - (2 - end_corners) * loss_max) / gain)
+    n = np.maximum(n, 1).astype(np.int64)
+    if even:
+        n += n % 2
+    corners = 2 * (n - 1) + end_corners
+
+    if auto:
+        # The added length grows monotonically with A, so the first piece
+        # whose solution lies inside its own range is the answer.
+        capped = (extra + corners * (saving * cap + edge)) / n
+        floored = (extra + corners * (saving * smallest + edge)) / n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scaled = (extra + corners * edge) / (n - corners * saving * fraction)
+        amplitude = np.where(fraction * capped >= cap, capped,
+                             np.where(fraction * floored <= smallest, floored, scaled))
+        size = np.clip(fraction * amplitude, smallest, cap)
+    else:
+        size = size_max.copy()
+    amplitude = np.maximum(amplitude if auto else
+                           (extra + corners * (saving * size + edge)) / n, 2 * size)
+
+    n = np.where(wanted, n, 0)
+    amplitude = np.where(wanted, amplitude, 0.0)
+    size = np.where(wanted, size, 0.0)
+    return n, amplitude, size
+
+def solve_bus(lengths, Er, width, pitch, max_amplitude, target_delay_ps=None, tolerance_ps=0.0,
+              units="inches", corner="arc", corner_size=None, lead=0.0, even=True):
+    """
+    Length-match a bus: for each net (effective routed length 'lengths')
+    find the meander that brings its delay to 'target_delay_ps', by default
+    the delay of the slowest net. Er, width and the meander limits may be
+    scalars or per-net arrays; lengths are in 'units'. Nets already within
+    'tolerance_ps' of the target, or slower than it, get no meander.
+
+    Returns a structured array of TUNING_DTYPE. The achieved delay is
+    re-evaluated with the forward meander model, so 'error_ps' is the true
+    residual after amplitude clamping.
+    """
+    lengths = np.asarray(lengths, dtype=np.float64)
+    to_inch = convert_to_inches(1.0, units)
+    base_delay = travel_time_ps(lengths * to_inch, Er)
+    if target_delay_ps is None:
+        target_delay_ps = base_delay.max()
+    target_delay = np.broadcast_to(np.asarray(target_delay_ps, dtype=np.float64), base_delay.shape)
+    target_length = length_for_delay_in(target_delay, Er) / to_inch
+    extra = np.where(target_delay - base_delay > tolerance_ps, target_length - lengths, 0.0)
+
+    n, amplitude, size = solve_meanders(extra, width, pitch, max_amplitude, corner, corner_size,
+                                        lead, even)
+    tuned = n > 0
+    added = np.zeros(base_delay.shape)
+    if tuned.any():
+        width, pitch, lead = (np.broadcast_to(a, base_delay.shape)[tuned]
+                              for a in (width, pitch, lead))
+        added[tuned] = meander_extra_length(n[tuned], amplitude[tuned], pitch, width, corner,
+                                            size[tuned], lead)
+    delay = travel_time_ps((lengths + added) * to_inch, Er)
+
+    out = np.empty(base_delay.shape, dtype=TUNING_DTYPE)
+    out["base_delay_ps"] = base_delay
+    out["target_delay_ps"] = target_delay
+    out["n_legs"] = n
+    out["amplitude"] = amplitude
+    out["corner_size"] = size
+    out["added_length"] = added
+    out["delay_ps"] = delay
+    out["error_ps"] = delay - target_delay
+    return out
+
+def solve_arc_radius(target_delay_ps, Er, width, units="inches"):
+    """
+    Centerline radius of a quarter-circle bend whose effective (inner edge)
+    length L - (π/4)·W has the given delay, generalising the Plot 3 quarter
+    circle. Broadcasts over all arguments; radius and width in 'units'.
+    """
+    target_length = length_for_delay_in(np.asarray(target_delay_ps, dtype=np.float64), Er)
+    center_length = target_length / convert_to_inches(1.0, units) + EDGE_FACTOR["circular"] * np.asarray(width)
+    return (2 / math.pi) * center_length
+
+def main(argv=None):
+    import argparse
+
+    from results_store import OUTPUT_FORMATS, open_sink
+
+    parser = argparse.ArgumentParser(
+        description="Size meanders that length-match a bus. Reads net/L records "
+                    "(CSV with header or JSON Lines) and writes one meander per net.")
+    parser.add_argument("input", nargs="?", default="-", help="input file (default: stdin)")
+    parser.add_argument("--er", type=float, required=True, help="dielectric constant")
+    parser.add_argument("--width", type=float, required=True, help="trace width")
+    parser.add_argument("--pitch", type=float, required=True, help="leg spacing")
+    parser.add_argument("--max-amplitude", type=float, required=True, help="tallest allowed leg")
+    parser.add_argument("--units", default="mils", choices=["inches", "meters", "mils"])
+    parser.add_argument("--corner", default="arc", choices=["right_angle", "mitred", "arc"])
+    parser.add_argument("--corner-size", type=float, default=None,
+                        help="arc radius / chamfer size (default: half the pitch or amplitude "
+                             "for arcs, a quarter for chamfers)")
+    parser.add_argument("--lead", type=float, default=0.0, help="lead-in/out length")
+    parser.add_argument("--target-ps", type=float, default=None,
+                        help="target delay (default: slowest net)")
+    parser.add_argument("--tolerance-ps", type=float, default=0.0,
+                        help="leave nets within this much of the target untouched")
+    parser.add_argument("-o", "--output", default="-",
+                        help="results store directory, or a .csv/.jsonl file (default: stdout)")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default=None,
+                        help="default: columns for a directory, else csv/jsonl by extension")
+    args = parser.parse_args(argv)
+
+    stream = sys.stdin if args.input == "-" else open(args.input, newline="")
+    try:
+        records = list(read_records(stream))
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    if not records:
+        print("error: no nets in input", file=sys.stderr)
+        return 1
+    try:
+        lengths = [float(rec["L"]) for rec in records]
+        result = solve_bus(lengths, args.er, args.width, args.pitch, args.max_amplitude,
+                           args.target_ps, args.tolerance_ps, args.units, args.corner,
+                           args.corner_size, args.lead)
+    except KeyError as exc:
+        print(f"error: record is missing field {exc}", file=sys.stderr)
+        return 1
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    ids = [rec.get("net", i) for i, rec in enumerate(records)]
+    try:
+        with open_sink(args.output, args.output_format) as sink:
+            sink.write(result, ids)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,326 @@
+import math
+
+import numpy as np
+
+from bend_geometry import EDGE_FACTOR
+from propagation import convert_to_inches, travel_time_ps
+
+# A meander is built from 'n_legs' parallel legs of length 'amplitude',
+# spaced 'pitch' apart and joined alternately at the top and bottom, with
+# optional straight lead-in/lead-out runs of length 'lead':
+#
+#        __    __
+#       |  |  |  |
+#   ____|  |__|  |____
+#
+# Every joint is a 90° corner drawn in one of CORNER_STYLES. 'corner_size'
+# is the fillet radius for 'arc' corners and the length cut from each side
+# for 'mitred' (45° chamfer) corners.
+CORNER_STYLES = ("right_angle", "mitred", "arc")
+
+# Centerline length saved per corner, per unit of corner_size: an arc of
+# radius r replaces 2r of straight with (π/2)r; a chamfer of size c
+# replaces 2c with c·√2.
+CORNER_SAVING = {
+    "right_angle": 0.0,
+    "mitred": 2.0 - math.sqrt(2.0),
+    "arc": 2.0 - math.pi / 2.0,
+}
+
+# Difference between the centerline and the inside edge per corner, per
+# unit of trace width. A sharp 90° joint gives W; an arc gives (π/4)W; a
+# chamfer is two 45° joints, each shortening the inside by W·tan(22.5°).
+CORNER_EDGE_FACTOR = {
+    "right_angle": EDGE_FACTOR["right_angle"],
+    "mitred": 2.0 * math.tan(math.pi / 8.0),
+    "arc": EDGE_FACTOR["circular"],
+}
+
+# Default corner_size as a fraction of min(pitch, amplitude). Two arcs of
+# half the pitch make a semicircle, which the edge formulas handle; two
+# chamfers of half the pitch meet in a single 90° inside corner, which
+# they do not, so chamfers default to a quarter.
+DEFAULT_CORNER_FRACTION = {
+    "right_angle": 0.0,
+    "mitred": 0.25,
+    "arc": 0.5,
+}
+
+MEANDER_DTYPE = np.dtype([
+    ("n_corners", "i8"),
+    ("center_length", "f8"),
+    ("inner_length", "f8"),
+    ("outer_length", "f8"),
+    ("effective_length", "f8"),
+])
+
+def _check_corner(corner):
+    if corner not in CORNER_STYLES:
+        raise ValueError(f"Unknown corner style: {corner}")
+
+def _where(condition, a, b):
+    return a if condition else b
+
+def _corner_limits(corner, pitch, amplitude, width, lead, minimum, where):
+    # Shared by the array and the plain-float paths, which pass their own
+    # minimum() and where().
+    largest = minimum(pitch, amplitude) / 2.0
+    largest = where(lead > 0, minimum(largest, lead), largest)
+    smallest = 0.0 * largest
+    if corner == "mitred":
+        joint = width * math.tan(math.pi / 8.0)
+        largest = minimum(largest, (pitch - joint) / 2.0)
+        largest = minimum(largest, where(lead > 0, lead, amplitude) - joint / 2.0)
+        smallest = smallest + joint / math.sqrt(2.0)
+    elif corner == "arc":
+        smallest = smallest + width / 2.0
+    return smallest, largest
+
+def default_corner_size(corner, pitch, amplitude, lead=0.0, width=0.0):
+    """
+    corner_size used when none is given: DEFAULT_CORNER_FRACTION of
+    min(pitch, amplitude), cut down to the largest size corner_size_limits
+    allows for 'width' and 'lead'. Broadcasts.
+    """
+    size = DEFAULT_CORNER_FRACTION[corner] * np.minimum(pitch, amplitude)
+    return np.minimum(size, corner_size_limits(corner, pitch, amplitude, width, lead)[1])
+
+def corner_size_limits(corner, pitch, amplitude, width, lead=0.0):
+    """
+    Smallest and largest corner_size the closed-form lengths hold for, as
+    arrays (broadcasts). A corner may take at most half of the pitch and
+    amplitude, and all of the lead when there is one.
+
+    An arc needs a radius of at least W/2, or its inside edge folds into
+    a sharp corner. A chamfer's two 45° joints each take W·tan(22.5°)/2
+    off the inside edge of the runs next to them, so mitred corners have
+    to leave that much straight inside edge: W·tan(22.5°) on the run
+    between the two chamfers of a U-turn, half of it on the lead or on a
+    first and last leg without leads, and on the chamfer itself (hence
+    the minimum). Legs between two opposite turns lose on one edge what
+    they gain on the other and need no margin.
+    """
+    pitch, amplitude, width, lead = (np.asarray(a, dtype=np.float64)
+                                     for a in (pitch, amplitude, width, lead))
+    return _corner_limits(corner, pitch, amplitude, width, lead, np.minimum, np.where)
+
+def _size_error(corner_size, smallest, largest):
+    """
+    ValueError for corner sizes outside [smallest, largest], else None.
+    """
+    if np.any(corner_size > largest + 1e-12 * np.abs(largest)):
+        return ValueError("corner_size is too large: it can take at most half the pitch and "
+                          "amplitude, all of the lead, and chamfers must leave "
+                          "W·tan(22.5°) of straight inside edge between them")
+    if np.any(corner_size < smallest - 1e-12 * np.abs(smallest)):
+        return ValueError("corner_size is too small: arcs need a radius of at least W/2 and "
+                          "chamfers at least W·tan(22.5°)/√2 to keep their inside edge")
+    return None
+
+def _check_corner_size(corner, corner_size, pitch, amplitude, width, lead):
+    if corner == "right_angle":
+        return
+    error = _size_error(corner_size, *corner_size_limits(corner, pitch, amplitude, width, lead))
+    if error is not None:
+        raise error
+
+def _turns(n_legs, has_lead):
+    """
+    Number of right and left 90° turns along the path.
+    The first U-turn is at the top (two right turns) and they alternate;
+    the lead-in turns left and the lead-out turns right after an upward
+    last leg (odd n_legs), left after a downward one.
+    """
+    u_turns = n_legs - 1
+    right = 2 * ((u_turns + 1) // 2)
+    left = 2 * (u_turns // 2)
+    # Written arithmetically so it works on scalars and arrays alike.
+    lead = has_lead * 1
+    odd = n_legs % 2
+    return right + lead * odd, left + lead + lead * (1 - odd)
+
+class Meander:
+    """
+    One serpentine meander; see the module comment for the parameters.
+
+    Lengths are closed-form (O(1)) and use plain floats, so evaluating a
+    meander inside a length-matching loop costs a few microseconds.
+
+      center_length     length along the centerline
+      inner_length      shorter of the two trace edges
+      outer_length      longer of the two trace edges
+      effective_length  centerline minus the inside-edge shortcut at every
+                        corner, the same correction compute_propagation_times
+                        applies to a single bend (L - W, L - (π/4)W)
+
+    The edge lengths assume every straight run is long enough for the
+    inside edge to turn the corners at its ends (see corner_size_limits);
+    corner sizes outside that range raise ValueError. The default size is
+    default_corner_size().
+    """
+    __slots__ = ("n_legs", "amplitude", "pitch", "width", "corner", "corner_size", "lead")
+
+    def __init__(self, n_legs, amplitude, pitch, width, corner="arc", corner_size=None, lead=0.0):
+        _check_corner(corner)
+        if n_legs < 1:
+            raise ValueError("A meander needs at least one leg")
+        # Plain-float limits: numpy would dominate the cost of a Meander.
+        if corner != "right_angle":
+            smallest, largest = _corner_limits(corner, pitch, amplitude, width, lead, min, _where)
+            if corner_size is None:
+                corner_size = min(DEFAULT_CORNER_FRACTION[corner] * min(pitch, amplitude),
+                                  largest)
+            if (corner_size > largest + 1e-12 * abs(largest)
+                    or corner_size < smallest - 1e-12 * abs(smallest)):
+                raise _size_error(corner_size, smallest, largest)
+        elif corner_size is None:
+            corner_size = 0.0
+        self.n_legs = int(n_legs)
+        self.amplitude = amplitude
+        self.pitch = pitch
+        self.width = width
+        self.corner = corner
+        self.corner_size = corner_size
+        self.lead = lead
+
+    def __repr__(self):
+        return (f"Meander(n_legs={self.n_legs!r}, amplitude={self.amplitude!r}, "
+                f"pitch={self.pitch!r}, width={self.width!r}, corner={self.corner!r}, "
+                f"corner_size={self.corner_size!r}, lead={self.lead!r})")
+
+    @property
+    def n_corners(self):
+        right, left = _turns(self.n_legs, self.lead > 0)
+        return right + left
+
+    @property
+    def center_length(self):
+        straight = self.n_legs * self.amplitude + (self.n_legs - 1) * self.pitch + 2 * self.lead
+        return straight - self.n_corners * CORNER_SAVING[self.corner] * self.corner_size
+
+    def _edge_offset(self):
+        right, left = _turns(self.n_legs, self.lead > 0)
+        return abs(right - left) * CORNER_EDGE_FACTOR[self.corner] * self.width
+
+    @property
+    def inner_length(self):
+        return self.center_length - self._edge_offset()
+
+    @property
+    def outer_length(self):
+        return self.center_length + self._edge_offset()
+
+    @property
+    def effective_length(self):
+        return self.center_length - self.n_corners * CORNER_EDGE_FACTOR[self.corner] * self.width
+
+    def delay_ps(self, Er, units="inches", length="effective"):
+        """
+        Propagation delay (ps) over the 'effective' or 'center' length.
+        """
+        value = self.effective_length if length == "effective" else self.center_length
+        return float(travel_time_ps(convert_to_inches(value, units), Er))
+
+    def vertices(self, arc_points=8):
+        return meander_vertices(self.n_legs, self.amplitude, self.pitch, self.corner,
+                                self.corner_size, self.lead, arc_points)
+
+def meander_lengths(n_legs, amplitude, pitch, width, corner="arc", corner_size=None, lead=0.0):
+    """
+    Vectorized Meander lengths: all numeric arguments broadcast together
+    (one corner style per call). Returns a structured array of
+    MEANDER_DTYPE with the broadcast shape.
+    """
+    _check_corner(corner)
+    n_legs, amplitude, pitch, width, lead = np.broadcast_arrays(
+        np.asarray(n_legs, dtype=np.int64), np.asarray(amplitude, dtype=np.float64),
+        np.asarray(pitch, dtype=np.float64), np.asarray(width, dtype=np.float64),
+        np.asarray(lead, dtype=np.float64))
+    if np.any(n_legs < 1):
+        raise ValueError("A meander needs at least one leg")
+    if corner_size is None:
+        corner_size = default_corner_size(corner, pitch, amplitude, lead, width)
+    corner_size = np.broadcast_to(np.asarray(corner_size, dtype=np.float64), n_legs.shape)
+    _check_corner_size(corner, corner_size, pitch, amplitude, width, lead)
+
+    right, left = _turns(n_legs, lead > 0)
+    n_corners = right + left
+    edge = CORNER_EDGE_FACTOR[corner] * width
+    center = (n_legs * amplitude + (n_legs - 1) * pitch + 2 * lead
+              - n_corners * CORNER_SAVING[corner] * corner_size)
+    offset = np.abs(right - left) * edge
+
+    out = np.empty(n_legs.shape, dtype=MEANDER_DTYPE)
+    out["n_corners"] = n_corners
+    out["center_length"] = center
+    out["inner_length"] = center - offset
+    out["outer_length"] = center + offset
+    out["effective_length"] = center - n_corners * edge
+    return out
+
+def meander_delay_ps(lengths, Er, units="inches", length="effective"):
+    """
+    Delay (ps) for each row of a meander_lengths() result.
+    """
+    field = "effective_length" if length == "effective" else "center_length"
+    return travel_time_ps(convert_to_inches(lengths[field], units), Er)
+
+def meander_vertices(n_legs, amplitude, pitch, corner="arc", corner_size=None, lead=0.0,
+                     arc_points=8):
+    """
+    Centerline vertices of one meander as an (M, 2) array, built without
+    Python loops over the legs. Arc corners are sampled with 'arc_points'
+    points each.
+    """
+    _check_corner(corner)
+    if corner_size is None:
+        corner_size = float(default_corner_size(corner, pitch, amplitude, lead))
+    if corner != "right_angle" and (corner_size > min(pitch, amplitude) / 2.0
+                                    or (lead > 0 and corner_size > lead)):
+        raise ValueError("corner_size cannot exceed half the pitch or amplitude, or the lead")
+    n_legs = int(n_legs)
+
+    # Sharp-cornered path: leg i runs along x = lead + i·pitch, upwards for
+    # even i and downwards for odd i.
+    x = lead + pitch * np.arange(n_legs)
+    y0 = np.where(np.arange(n_legs) % 2 == 0, 0.0, amplitude)
+    legs = np.empty((2 * n_legs, 2))
+    legs[0::2, 0] = x
+    legs[1::2, 0] = x
+    legs[0::2, 1] = y0
+    legs[1::2, 1] = amplitude - y0
+    if lead > 0:
+        end_y = legs[-1, 1]
+        path = np.vstack(([[0.0, 0.0]], legs, [[x[-1] + lead, end_y]]))
+    else:
+        path = legs
+    if corner == "right_angle" or corner_size == 0 or len(path) < 3:
+        return path
+
+    corners = path[1:-1]
+    u_in = path[1:-1] - path[:-2]
+    u_in /= np.hypot(u_in[:, 0], u_in[:, 1])[:, None]
+    u_out = path[2:] - path[1:-1]
+    u_out /= np.hypot(u_out[:, 0], u_out[:, 1])[:, None]
+    start = corners - corner_size * u_in
+    end = corners + corner_size * u_out
+
+    if corner == "mitred":
+        replaced = np.stack((start, end), axis=1)
+    else:
+        # Fillet centre: from the incoming tangent point, one radius along
+        # the outgoing direction. Sweep ±90° depending on turn direction.
+        centre = start + corner_size * u_out
+        turn = np.sign(u_in[:, 0] * u_out[:, 1] - u_in[:, 1] * u_out[:, 0])
+        a0 = np.arctan2(start[:, 1] - centre[:, 1], start[:, 0] - centre[:, 0])
+        angles = a0[:, None] + turn[:, None] * np.linspace(0.0, np.pi / 2, arc_points)[None, :]
+        replaced = np.stack((centre[:, 0, None] + corner_size * np.cos(angles),
+                             centre[:, 1, None] + corner_size * np.sin(angles)), axis=2)
+    return np.vstack((path[:1], replaced.reshape(-1, 2), path[-1:]))
+
+def polyline_length(vertices):
+    """
+    Total length of an (M, 2) polyline.
+    """
+    d = np.diff(vertices, axis=0)
+    return float(np.hypot(d[:, 0], d[:, 1]).sum())
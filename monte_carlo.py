@@ -0,0 +1,447 @@
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from bend_geometry import EDGE_FACTOR
+from propagation import INCH_TO_METER, SEC_TO_PS, SPEED_OF_LIGHT, convert_to_inches
+
+# Quantities tracked per sample, named as in PROPAGATION_DTYPE.
+MC_FIELDS = (
+    "t_straight_ps",
+    "t_circular_ps",
+    "t_rightangle_ps",
+    "dt_circular_ps",
+    "dt_rightangle_ps",
+)
+
+DISTRIBUTIONS = ("fixed", "normal", "uniform")
+
+# Percentiles reported by default.
+DEFAULT_PERCENTILES = (0.1, 1.0, 50.0, 99.0, 99.9)
+
+# Samples per task handed to a worker; tasks (and their random streams) do
+# not depend on the worker count, so results are reproducible for a seed.
+TASK_SAMPLES = 1 << 22
+
+# Samples generated and evaluated at once inside a task.
+CHUNK_SAMPLES = 1 << 16
+
+# Lowest physical value of each input. Normal draws below it (a wide
+# tolerance on a small nominal) are redrawn, truncating the distribution;
+# nominals or uniform ranges reaching below it are rejected.
+PHYSICAL_MINIMUM = {"L": 0.0, "W": 0.0, "Er": 1.0}
+
+class Distribution:
+    """
+    Manufacturing spread of one input: 'fixed' (always 'nominal'),
+    'normal' ('spread' is σ) or 'uniform' (nominal ± 'spread').
+    """
+    __slots__ = ("kind", "nominal", "spread")
+
+    def __init__(self, kind, nominal, spread=0.0):
+        if kind not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution: {kind}")
+        if spread < 0:
+            raise ValueError("Distribution spread must be non-negative")
+        self.kind = kind
+        self.nominal = float(nominal)
+        self.spread = float(spread)
+
+    @classmethod
+    def parse(cls, text):
+        """
+        'KIND:NOMINAL:SPREAD' (e.g. 'normal:5:0.25'), or a bare number for a
+        fixed value.
+        """
+        parts = text.split(":")
+        if len(parts) == 1:
+            return cls("fixed", float(parts[0]))
+        if len(parts) != 3:
+            raise ValueError(f"Expected KIND:NOMINAL:SPREAD, got {text!r}")
+        return cls(parts[0], float(parts[1]), float(parts[2]))
+
+    def __repr__(self):
+        return f"Distribution({self.kind!r}, {self.nominal!r}, {self.spread!r})"
+
+    def sample(self, rng, n, minimum=None):
+        """
+        'n' draws; with 'minimum', normal draws below it are redrawn.
+        """
+        if self.kind == "normal" and self.spread > 0:
+            out = rng.normal(self.nominal, self.spread, n)
+            if minimum is not None:
+                low = np.flatnonzero(out < minimum)
+                while low.size:
+                    out[low] = rng.normal(self.nominal, self.spread, low.size)
+                    low = low[out[low] < minimum]
+            return out
+        if self.kind == "uniform" and self.spread > 0:
+            return rng.uniform(self.nominal - self.spread, self.nominal + self.spread, n)
+        return np.full(n, self.nominal)
+
+def _as_distribution(value):
+    return value if isinstance(value, Distribution) else Distribution("fixed", value)
+
+def _check_physical(name, dist):
+    minimum = PHYSICAL_MINIMUM[name]
+    low = dist.nominal - dist.spread if dist.kind == "uniform" else dist.nominal
+    if low < minimum:
+        raise ValueError(f"{name} distribution {dist} reaches below {minimum:g}")
+
+def _add_bins(offset, counts, new_offset, new_counts):
+    """
+    Sum of two dense bin-count arrays that start at bin indices 'offset'
+    and 'new_offset'. Returns (offset, counts).
+    """
+    if counts is None:
+        return new_offset, new_counts
+    lo = min(offset, new_offset)
+    hi = max(offset + len(counts), new_offset + len(new_counts))
+    if lo == offset and hi == offset + len(counts):
+        counts[new_offset - lo:new_offset - lo + len(new_counts)] += new_counts
+        return offset, counts
+    merged = np.zeros(hi - lo, dtype=np.int64)
+    merged[offset - lo:offset - lo + len(counts)] += counts
+    merged[new_offset - lo:new_offset - lo + len(new_counts)] += new_counts
+    return lo, merged
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative accuracy 'alpha' (DDSketch):
+    |x| is counted in the logarithmic bin ceil(log_γ |x|), γ = (1 + α) /
+    (1 - α), with separate bins for negative values. Every quantile is
+    returned within a relative error α of the true order statistic, the
+    memory is one counter per occupied bin (a few thousand for delays
+    spanning decades at α = 1e-3), and two sketches with the same α merge
+    exactly by adding counts, so per-worker sketches combine into the
+    sketch of the whole run.
+    """
+    __slots__ = ("alpha", "_log_gamma", "_bins", "zeros", "count")
+
+    def __init__(self, alpha=1e-3):
+        if not 0 < alpha < 1:
+            raise ValueError("alpha must be in (0, 1)")
+        self.alpha = alpha
+        self._log_gamma = math.log((1 + alpha) / (1 - alpha))
+        # Sign -> (first bin index, counts) for positive and negative values.
+        self._bins = {1: (0, None), -1: (0, None)}
+        self.zeros = 0
+        self.count = 0
+
+    def _add_magnitudes(self, sign, part):
+        # Bin indices via an in-place log; the offset comes from the smallest
+        # magnitude through the same operations, so it is the minimum index.
+        index = np.log(part)
+        index *= 1.0 / self._log_gamma
+        np.ceil(index, out=index)
+        lo = np.log(part.min(keepdims=True))
+        lo *= 1.0 / self._log_gamma
+        lo = int(np.ceil(lo)[0])
+        index -= lo
+        self._bins[sign] = _add_bins(*self._bins[sign], lo, np.bincount(index.astype(np.intp)))
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not values.size:
+            return
+        if not (math.isfinite(values.min()) and math.isfinite(values.max())):
+            raise ValueError("QuantileSketch values must be finite")
+        self.count += values.size
+        if values.min() > 0:
+            # Delays are positive: skip splitting by sign.
+            self._add_magnitudes(1, values)
+            return
+        for sign, part in ((1, values[values > 0]), (-1, -values[values < 0])):
+            if part.size:
+                self._add_magnitudes(sign, part)
+        self.zeros += int(np.count_nonzero(values == 0))
+
+    def merge(self, other):
+        if other.alpha != self.alpha:
+            raise ValueError("Only sketches with the same alpha can be merged")
+        for sign in (1, -1):
+            offset, counts = other._bins[sign]
+            if counts is not None:
+                self._bins[sign] = _add_bins(*self._bins[sign], offset, counts.copy())
+        self.zeros += other.zeros
+        self.count += other.count
+        return self
+
+    def quantiles(self, q):
+        """
+        Estimated values at quantiles 'q' (each in [0, 1]).
+        """
+        if not self.count:
+            raise ValueError("Empty sketch")
+        gamma = math.exp(self._log_gamma)
+        # Bins in ascending value order: negatives from the largest
+        # magnitude down, then zero, then positives.
+        values, counts = [], []
+        offset, c = self._bins[-1]
+        if c is not None:
+            values.append(-2 * gamma ** (offset + np.arange(len(c)))[::-1] / (gamma + 1))
+            counts.append(c[::-1])
+        values.append(np.zeros(1))
+        counts.append(np.array([self.zeros]))
+        offset, c = self._bins[1]
+        if c is not None:
+            values.append(2 * gamma ** (offset + np.arange(len(c))) / (gamma + 1))
+            counts.append(c)
+        values = np.concatenate(values)
+        cumulative = np.cumsum(np.concatenate(counts))
+        rank = np.asarray(q, dtype=np.float64) * (self.count - 1)
+        return values[np.searchsorted(cumulative, rank, side="right")]
+
+class RunningStats:
+    """
+    Streaming statistics of one quantity: count, mean and variance
+    (Welford/Chan updates per chunk), min/max, a QuantileSketch for
+    percentiles and, when 'limits' (lo, hi) are given, the exact number of
+    samples inside them. Instances from different chunks or processes
+    merge into the statistics of the combined samples.
+    """
+    __slots__ = ("count", "mean", "m2", "min", "max", "limits", "within", "sketch")
+
+    def __init__(self, limits=None, alpha=1e-3):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.limits = limits
+        self.within = 0
+        self.sketch = QuantileSketch(alpha)
+
+    def _combine(self, n, mean, m2):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not values.size:
+            return
+        mean = float(values.mean())
+        centred = values - mean
+        self._combine(values.size, mean, float(np.dot(centred, centred)))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if self.limits is not None:
+            lo, hi = self.limits
+            self.within += int(np.count_nonzero((values >= lo) & (values <= hi)))
+        self.sketch.add(values)
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self.within += other.within
+            self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    @property
+    def yield_fraction(self):
+        """
+        Fraction of samples inside 'limits' (None without limits).
+        """
+        if self.limits is None or not self.count:
+            return None
+        return self.within / self.count
+
+    def percentiles(self, p=DEFAULT_PERCENTILES):
+        return self.sketch.quantiles(np.asarray(p, dtype=np.float64) / 100.0)
+
+def format_percentile(value, alpha):
+    """
+    'value' rounded to the significant digits a QuantileSketch of relative
+    accuracy 'alpha' resolves (3 at alpha = 1e-3), so the sketch's bin
+    quantisation does not show up as digits.
+    """
+    digits = max(1, math.floor(-math.log10(alpha) + 1e-9))
+    return np.format_float_positional(value, precision=digits, unique=False, fractional=False,
+                                      trim="-")
+
+def _evaluate(L_inch, W_inch, Er, fields):
+    """
+    MC_FIELDS for arrays of sampled inputs (the calculator's formulas, with
+    the per-inch delay factor of sweep.py).
+    """
+    ps_per_inch = np.sqrt(Er)
+    ps_per_inch *= INCH_TO_METER * SEC_TO_PS / SPEED_OF_LIGHT
+    t_straight = L_inch * ps_per_inch
+    dt = {"circular": EDGE_FACTOR["circular"] * W_inch * ps_per_inch,
+          "rightangle": EDGE_FACTOR["right_angle"] * W_inch * ps_per_inch}
+    out = {}
+    for name in fields:
+        if name == "t_straight_ps":
+            out[name] = t_straight
+        elif name.startswith("t_"):
+            out[name] = t_straight - dt[name[2:-3]]
+        else:
+            out[name] = dt[name[3:-3]]
+    return out
+
+def nominal_delays(L, W, Er, units="inches", fields=MC_FIELDS):
+    """
+    MC_FIELDS at the nominal value of every input distribution.
+    """
+    to_inch = convert_to_inches(1.0, units)
+    L, W, Er = (_as_distribution(d).nominal for d in (L, W, Er))
+    values = _evaluate(np.array([L * to_inch]), np.array([W * to_inch]), np.array([Er]), fields)
+    return {name: float(v[0]) for name, v in values.items()}
+
+def _mc_task(task, progress=None):
+    """
+    Pool task: draw 'n' samples from the task's own random stream in
+    chunks and return the RunningStats of each field. 'progress', when
+    run in-process, is called with the size of every finished chunk.
+    """
+    L, W, Er, to_inch, n, seed, fields, limits, alpha = task
+    rng = np.random.default_rng(seed)
+    stats = {name: RunningStats(limits.get(name), alpha) for name in fields}
+    for start in range(0, n, CHUNK_SAMPLES):
+        m = min(CHUNK_SAMPLES, n - start)
+        L_inch = L.sample(rng, m, PHYSICAL_MINIMUM["L"])
+        L_inch *= to_inch
+        W_inch = W.sample(rng, m, PHYSICAL_MINIMUM["W"])
+        W_inch *= to_inch
+        values = _evaluate(L_inch, W_inch, Er.sample(rng, m, PHYSICAL_MINIMUM["Er"]), fields)
+        for name in fields:
+            stats[name].add(values[name])
+        if progress is not None:
+            progress(m)
+    return stats
+
+def run_monte_carlo(L, W, Er, samples, units="inches", fields=MC_FIELDS, skew_budget_ps=None,
+                    workers=1, seed=0, alpha=1e-3, progress=None):
+    """
+    Monte Carlo delay statistics under manufacturing tolerances.
+
+    L, W and Er are Distributions (or plain numbers for fixed values), L
+    and W in 'units'. 'samples' draws are evaluated in chunks of
+    CHUNK_SAMPLES, so memory stays bounded for any sample count; work is
+    split into tasks of TASK_SAMPLES, each with its own random stream
+    spawned from 'seed', and spread over 'workers' processes. The result
+    does not depend on the number of workers. Normal draws below
+    PHYSICAL_MINIMUM are redrawn; a nominal or uniform range below it
+    raises ValueError.
+
+    With 'skew_budget_ps', each field also counts the samples whose delay
+    lies within ±skew_budget_ps of its nominal value (see
+    RunningStats.yield_fraction).
+
+    'progress' is called as progress(done, samples) while the run goes on:
+    after every chunk with one worker, after every task with several. An
+    exception raised from it (e.g. to cancel) stops the run.
+
+    Returns a dict mapping each field to its merged RunningStats.
+    """
+    fields = tuple(fields)
+    unknown = set(fields) - set(MC_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown Monte Carlo fields: {', '.join(sorted(unknown))}")
+    samples = int(samples)
+    if samples < 1:
+        raise ValueError("Need at least one sample")
+    L, W, Er = (_as_distribution(d) for d in (L, W, Er))
+    for name, dist in (("L", L), ("W", W), ("Er", Er)):
+        _check_physical(name, dist)
+    limits = {}
+    if skew_budget_ps is not None:
+        nominal = nominal_delays(L, W, Er, units, fields)
+        limits = {name: (v - skew_budget_ps, v + skew_budget_ps) for name, v in nominal.items()}
+    to_inch = convert_to_inches(1.0, units)
+    sizes = [min(TASK_SAMPLES, samples - start) for start in range(0, samples, TASK_SAMPLES)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(L, W, Er, to_inch, n, s, fields, limits, alpha) for n, s in zip(sizes, seeds)]
+
+    done = 0
+
+    def report(n):
+        nonlocal done
+        done += n
+        progress(done, samples)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    if workers == 1:
+        chunk_progress = report if progress is not None else None
+        parts = (_mc_task(task, chunk_progress) for task in tasks)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        parts = pool.map(_mc_task, tasks)
+    try:
+        # Merge in task order so the floating-point sums are reproducible.
+        total = {name: RunningStats(limits.get(name), alpha) for name in fields}
+        for size, part in zip(sizes, parts):
+            for name in fields:
+                total[name].merge(part[name])
+            if workers > 1 and progress is not None:
+                report(size)
+    finally:
+        if workers > 1:
+            pool.shutdown(cancel_futures=True)
+    return total
+
+def main(argv=None):
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Monte Carlo bend delay under W/Er/L manufacturing tolerances. "
+                    "Inputs are KIND:NOMINAL:SPREAD with KIND one of "
+                    f"{', '.join(DISTRIBUTIONS)} (normal: SPREAD is sigma, uniform: "
+                    "NOMINAL ± SPREAD), or a bare number.")
+    parser.add_argument("--L", type=Distribution.parse, required=True, help="trace length")
+    parser.add_argument("--W", type=Distribution.parse, required=True, help="trace width")
+    parser.add_argument("--Er", type=Distribution.parse, required=True, help="dielectric constant")
+    parser.add_argument("--units", default="mils", choices=["inches", "meters", "mils"])
+    parser.add_argument("--samples", type=float, default=1e6)
+    parser.add_argument("--skew-budget-ps", type=float, default=None,
+                        help="report the yield within ± this of the nominal delay")
+    parser.add_argument("--percentiles", default=",".join(f"{p:g}" for p in DEFAULT_PERCENTILES))
+    parser.add_argument("--alpha", type=float, default=1e-3,
+                        help="relative accuracy of the percentiles")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    try:
+        percentiles = [float(p) for p in args.percentiles.split(",")]
+        start = time.perf_counter()
+        stats = run_monte_carlo(args.L, args.W, args.Er, args.samples, args.units,
+                                skew_budget_ps=args.skew_budget_ps, workers=args.workers,
+                                seed=args.seed, alpha=args.alpha)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    nominal = nominal_delays(args.L, args.W, args.Er, args.units)
+
+    header = ["field", "nominal", "mean", "std", "min"] + [f"p{p:g}" for p in percentiles] + ["max"]
+    if args.skew_budget_ps is not None:
+        header.append("yield")
+    print(" ".join(f"{h:>16}" for h in header))
+    for name, s in stats.items():
+        # Percentiles are only as precise as the sketch; the rest is exact.
+        cells = ([f"{name:>16}"] + [f"{v:>16.6g}" for v in (nominal[name], s.mean, s.std, s.min)]
+                 + [f"{format_percentile(v, args.alpha):>16}" for v in s.percentiles(percentiles)]
+                 + [f"{s.max:>16.6g}"])
+        if s.yield_fraction is not None:
+            cells.append(f"{s.yield_fraction:>16.6%}")
+        print(" ".join(cells))
+    count = next(iter(stats.values())).count
+    print(f"{count} samples in {elapsed:.1f} s ({count / elapsed:.3g} samples/s)", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
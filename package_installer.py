@@ -1,15 +1,18 @@
 import sys
 import subprocess
+from importlib.metadata import PackageNotFoundError, version
 
 def install(package):
     subprocess.check_call([sys.executable, "-m", "pip", "install", package])
 
 required_packages = ["numpy", "matplotlib"]
 
+# Check the installed distribution metadata rather than importing each
+# package, which would initialize all of matplotlib just to see it exists.
 for pkg in required_packages:
     try:
-        __import__(pkg)
-    except ImportError:
+        version(pkg)
+    except PackageNotFoundError:
         print(f"Package {pkg} not found. Installing...")
         install(pkg)
 
@@ -0,0 +1,372 @@
+import csv
+import json
+import sys
+
+import numpy as np
+
+from bend_geometry import BendArray
+from instrumentation import stage
+
+def convert_to_inches(value, unit):
+    """
+    Convert a given 'value' in the specified 'unit' to inches.
+      - 'inches' -> 1 : 1
+      - 'meters' -> 1 inch = 0.0254 m => value_in_m / 0.0254
+      - 'mils'   -> 1 mil = 0.001 inch => value_in_mils * 0.001
+    """
+    if unit == "inches":
+        return value
+    elif unit == "meters":
+        return value / 0.0254
+    elif unit == "mils":
+        return value * 0.001
+    else:
+        raise ValueError(f"Unknown unit: {unit}")
+
+def convert_array_to_inches(values, units):
+    """
+    Vectorized convert_to_inches.
+
+    'values' is array_like; 'units' is either a single unit name or an
+    array_like of unit names broadcastable to 'values'. Each distinct unit
+    is converted with convert_to_inches on its slice of the input, so the
+    results match the scalar function exactly.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if isinstance(units, str):
+        return np.asarray(convert_to_inches(values, units), dtype=np.float64)
+    values, units = np.broadcast_arrays(values, np.asarray(units))
+    out = np.empty(values.shape, dtype=np.float64)
+    for unit in np.unique(units):
+        mask = units == unit
+        out[mask] = convert_to_inches(values[mask], str(unit))
+    return out
+
+# Physical constants shared by the scalar and batch paths
+INCH_TO_METER = 0.0254
+SPEED_OF_LIGHT = 2.99792458e8  # speed of light in vacuum (m/s)
+SEC_TO_PS = 1e12
+
+# Record layout returned by compute_propagation_times_batch
+PROPAGATION_DTYPE = np.dtype([
+    ("L_inch", "f8"),
+    ("W_inch", "f8"),
+    ("Er", "f8"),
+    ("L_straight_in", "f8"),
+    ("L_circular_in", "f8"),
+    ("L_rightangle_in", "f8"),
+    ("L_straight_m", "f8"),
+    ("L_circular_m", "f8"),
+    ("L_rightangle_m", "f8"),
+    ("v", "f8"),
+    ("t_straight_ps", "f8"),
+    ("t_circular_ps", "f8"),
+    ("t_rightangle_ps", "f8"),
+    ("dt_circular_ps", "f8"),
+    ("dt_rightangle_ps", "f8"),
+])
+
+def check_propagation_inputs(L, W, Er, start=0):
+    """
+    Raise ValueError unless every L and W is finite and >= 0 and every Er
+    finite and > 0 (anything else gives an infinite or NaN velocity, or a
+    negative length). 'start' is the index of the first record, used in
+    error messages.
+    """
+    L, W, Er = (np.asarray(values, dtype=np.float64) for values in (L, W, Er))
+    for name, values, valid in (("L", L, np.isfinite(L) & (L >= 0)),
+                                ("W", W, np.isfinite(W) & (W >= 0)),
+                                ("Er", Er, np.isfinite(Er) & (Er > 0))):
+        if not valid.all():
+            i = int(np.flatnonzero(~valid.ravel())[0])
+            bound = "> 0" if name == "Er" else ">= 0"
+            where = f" (record {start + i})" if values.ndim else ""
+            raise ValueError(f"{name} must be a finite number {bound}, got "
+                             f"{values.ravel()[i]:g}{where}")
+
+def compute_propagation_times_batch(L_inch, W_inch, Er):
+    """
+    Vectorized version of compute_propagation_times.
+
+    L_inch, W_inch and Er may be scalars or arrays of any shapes that
+    broadcast together. Returns a structured array (dtype
+    PROPAGATION_DTYPE) with the broadcast shape, one record per net:
+      1) Effective lengths in inches and meters.
+      2) Propagation speed in the dielectric (m/s).
+      3) Travel times (in ps).
+      4) Time differences vs. the straight line (in ps).
+
+    Parameters
+    ----------
+      L_inch : float or array_like
+        The nominal centerline length(s) in inches.
+      W_inch : float or array_like
+        The trace width(s) in inches.
+      Er : float or array_like
+        The dielectric constant(s) (relative permittivity).
+
+    Raises ValueError if any L or W is negative or any Er is not positive,
+    or if any input is not finite.
+    """
+    L, W, Er = np.broadcast_arrays(np.asarray(L_inch, dtype=np.float64),
+                                   np.asarray(W_inch, dtype=np.float64),
+                                   np.asarray(Er, dtype=np.float64))
+    check_propagation_inputs(L, W, Er)
+    # 1) Effective Lengths (inches): inner-edge length of each bend type
+    L_circular_in = BendArray("circular", L, W).inner_length
+    L_rightangle_in = BendArray("right_angle", L, W).inner_length
+
+    # 2) Convert inches to meters
+    L_straight_m = L * INCH_TO_METER
+    L_circular_m = L_circular_in * INCH_TO_METER
+    L_rightangle_m = L_rightangle_in * INCH_TO_METER
+
+    # 3) Propagation Speed in dielectric: v = c / sqrt(Er)
+    v = SPEED_OF_LIGHT / np.sqrt(Er)
+
+    # 4) Travel Times in picoseconds
+    t_straight_ps = L_straight_m / v * SEC_TO_PS
+    t_circular_ps = L_circular_m / v * SEC_TO_PS
+    t_rightangle_ps = L_rightangle_m / v * SEC_TO_PS
+
+    # Intermediates are computed contiguously and written into the
+    # record array once per field (strided field access is slow).
+    out = np.empty(L.shape, dtype=PROPAGATION_DTYPE)
+    out["L_inch"] = L
+    out["W_inch"] = W
+    out["Er"] = Er
+    out["L_straight_in"] = L
+    out["L_circular_in"] = L_circular_in
+    out["L_rightangle_in"] = L_rightangle_in
+    out["L_straight_m"] = L_straight_m
+    out["L_circular_m"] = L_circular_m
+    out["L_rightangle_m"] = L_rightangle_m
+    out["v"] = v
+    out["t_straight_ps"] = t_straight_ps
+    out["t_circular_ps"] = t_circular_ps
+    out["t_rightangle_ps"] = t_rightangle_ps
+
+    # 5) Differences vs. straight line
+    out["dt_circular_ps"] = t_straight_ps - t_circular_ps
+    out["dt_rightangle_ps"] = t_straight_ps - t_rightangle_ps
+    return out
+
+def travel_time_ps(L_inch, Er):
+    """
+    Travel time in picoseconds over a length given in inches, with
+    v = c / sqrt(Er) as in compute_propagation_times_batch. Works on floats
+    or arrays.
+    """
+    return L_inch * INCH_TO_METER / (SPEED_OF_LIGHT / np.sqrt(Er)) * SEC_TO_PS
+
+def length_for_delay_in(t_ps, Er):
+    """
+    Inverse of travel_time_ps: length in inches that takes 't_ps'
+    picoseconds at dielectric constant 'Er'.
+    """
+    return t_ps / SEC_TO_PS * (SPEED_OF_LIGHT / np.sqrt(Er)) / INCH_TO_METER
+
+def format_propagation_report(r):
+    """
+    Returns a multi-line string describing a single record produced by
+    compute_propagation_times_batch (~10 significant figures).
+    """
+    result = []
+    result.append("---------------------------------------------------")
+    result.append(f"INPUT PARAMETERS (Converted to inches internally):")
+    result.append(f"  L_inch = {r['L_inch']:.10g} inches")
+    result.append(f"  W_inch = {r['W_inch']:.10g} inches")
+    result.append(f"  Er     = {r['Er']:.10g}")
+    result.append("")
+    result.append("EFFECTIVE LENGTHS (inches => meters):")
+    result.append(f"  Straight:    {r['L_straight_in']:.10g} in   => {r['L_straight_m']:.10g} m")
+    result.append(f"  Circular:    {r['L_circular_in']:.10g} in   => {r['L_circular_m']:.10g} m")
+    result.append(f"  Right-angle: {r['L_rightangle_in']:.10g} in => {r['L_rightangle_m']:.10g} m")
+    result.append("")
+    result.append("PROPAGATION SPEED:")
+    result.append("  c = 2.99792458e8 m/s")
+    result.append(f"  v = c / sqrt(Er) = {r['v']:.10g} m/s")
+    result.append("")
+    result.append("TRAVEL TIMES (picoseconds):")
+    result.append(f"  Straight line:       {r['t_straight_ps']:.10g} ps")
+    result.append(f"  Circular-bend line:  {r['t_circular_ps']:.10g} ps")
+    result.append(f"  Right-angle bend:    {r['t_rightangle_ps']:.10g} ps")
+    result.append("")
+    result.append("TIME DIFFERENCE vs. STRAIGHT (ps):")
+    result.append(f"  Straight - Circular:    {r['dt_circular_ps']:.10g} ps")
+    result.append(f"  Straight - Right-angle: {r['dt_rightangle_ps']:.10g} ps")
+    result.append("---------------------------------------------------")
+    return "\n".join(result)
+
+def compute_propagation_times(L_inch, W_inch, Er):
+    """
+    Returns a multi-line string describing:
+      1) Effective lengths (inches => meters).
+      2) Propagation speed in the dielectric.
+      3) Travel times (in ps).
+      4) Time differences vs. the straight line (in ps).
+
+    Thin formatter over compute_propagation_times_batch; use the batch
+    function directly when evaluating many nets.
+
+    Parameters
+    ----------
+      L_inch : float
+        The nominal centerline length in inches.
+      W_inch : float
+        The trace width in inches.
+      Er : float
+        The dielectric constant (relative permittivity).
+    """
+    with stage("propagation.compute"):
+        record = compute_propagation_times_batch(L_inch, W_inch, Er)[()]
+    with stage("propagation.format"):
+        return format_propagation_report(record)
+
+# -----------------------------
+# Headless command-line interface
+# -----------------------------
+# Input records carry L, W and Er plus optional units. 'unit' applies to both
+# L and W; 'L_unit' / 'W_unit' override it per dimension. Missing units
+# default to inches, matching the calculator GUI.
+DEFAULT_UNIT = "inches"
+
+def _read_csv_records(lines):
+    for record in csv.DictReader(lines):
+        yield record
+
+def _read_jsonl_records(lines):
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+def _chain_line(first, lines):
+    yield first
+    yield from lines
+
+def read_records(stream, fmt="auto"):
+    """
+    Yield input records (dicts) from a CSV or JSON Lines text stream.
+    With fmt='auto' the format is detected from the first non-blank
+    character: '{' means JSON Lines, anything else CSV with a header row.
+    """
+    lines = iter(stream)
+    first = ""
+    for first in lines:
+        if first.strip():
+            break
+    else:
+        return
+    if fmt == "auto":
+        fmt = "jsonl" if first.lstrip().startswith("{") else "csv"
+    rest = _chain_line(first, lines)
+    if fmt == "jsonl":
+        yield from _read_jsonl_records(rest)
+    elif fmt == "csv":
+        yield from _read_csv_records(rest)
+    else:
+        raise ValueError(f"Unknown input format: {fmt}")
+
+def records_to_batch(records, start=0):
+    """
+    Convert a list of input records into (L_inch, W_inch, Er) arrays.
+    'start' is the index of the first record, used in error messages.
+    """
+    n = len(records)
+    L = np.empty(n)
+    W = np.empty(n)
+    Er = np.empty(n)
+    L_units = []
+    W_units = []
+    for i, rec in enumerate(records):
+        try:
+            L[i] = float(rec["L"])
+            W[i] = float(rec["W"])
+            Er[i] = float(rec["Er"])
+        except KeyError as exc:
+            raise ValueError(f"Record {start + i} is missing field {exc}") from None
+        unit = rec.get("unit") or DEFAULT_UNIT
+        L_units.append(rec.get("L_unit") or unit)
+        W_units.append(rec.get("W_unit") or unit)
+    return (convert_array_to_inches(L, np.array(L_units)),
+            convert_array_to_inches(W, np.array(W_units)),
+            Er)
+
+def iter_results(records, chunk_size=4096):
+    """
+    Compute results for an iterable of input records, yielding one
+    structured array (PROPAGATION_DTYPE) per chunk of at most chunk_size
+    records. Only one chunk is held in memory at a time.
+    """
+    chunk = []
+    start = 0
+    for rec in records:
+        chunk.append(rec)
+        if len(chunk) >= chunk_size:
+            yield _compute_records(chunk, start)
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        yield _compute_records(chunk, start)
+
+def _compute_records(chunk, start):
+    batch = records_to_batch(chunk, start)
+    # Checked here first so an error names the record in the whole stream.
+    check_propagation_inputs(*batch, start)
+    return compute_propagation_times_batch(*batch)
+
+def write_results(results, stream, fmt="csv", header=True, ids=None, id_name="net"):
+    """
+    Write a structured result array to a text stream as CSV or JSON Lines.
+    All fields of 'results' are written, so a field subset such as
+    results[["L_inch", "dt_rightangle_ps"]] writes only those columns.
+    If 'ids' is given (one label per result), it is written as a leading
+    column named 'id_name'.
+    """
+    names = results.dtype.names
+    rows = results.tolist()
+    if ids is not None:
+        names = (id_name,) + names
+        rows = [(i,) + row for i, row in zip(ids, rows)]
+    if fmt == "csv":
+        writer = csv.writer(stream, lineterminator="\n")
+        if header:
+            writer.writerow(names)
+        writer.writerows(rows)
+    elif fmt == "jsonl":
+        for row in rows:
+            stream.write(json.dumps(dict(zip(names, row))))
+            stream.write("\n")
+    else:
+        raise ValueError(f"Unknown output format: {fmt}")
+
+def main(argv=None):
+    import argparse
+
+    from results_store import OUTPUT_FORMATS, open_sink
+
+    parser = argparse.ArgumentParser(
+        description="Bend-delay calculator: read L/W/Er records from stdin "
+                    "(CSV with header or JSON Lines) and stream results to stdout, "
+                    "or to a columnar store with -o DIR.")
+    parser.add_argument("--input-format", choices=["auto", "csv", "jsonl"], default="auto")
+    parser.add_argument("-o", "--output", default="-",
+                        help="results store directory, or a .csv/.jsonl file (default: stdout)")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default=None,
+                        help="default: columns for a directory, else csv/jsonl by extension")
+    parser.add_argument("--chunk-size", type=int, default=4096,
+                        help="records computed per batch (default: 4096)")
+    args = parser.parse_args(argv)
+
+    try:
+        with open_sink(args.output, args.output_format) as sink:
+            for results in iter_results(read_records(sys.stdin, args.input_format),
+                                        args.chunk_size):
+                sink.write(results)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
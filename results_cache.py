@@ -0,0 +1,152 @@
+import atexit
+import os
+import pickle
+from collections import OrderedDict
+
+# Environment variables configuring the shared cache used by the front ends.
+CACHE_PATH_ENV = "BEND_DELAY_CACHE"
+CACHE_SIZE_ENV = "BEND_DELAY_CACHE_SIZE"
+DEFAULT_MAXSIZE = 4096
+
+def make_key(kind, L, W, Er=None, units="inches"):
+    """
+    Cache key for one computation: kind of result plus (L, W, Er, units).
+    'units' may be a single unit or an (L_unit, W_unit) pair.
+    """
+    if not isinstance(units, str):
+        units = tuple(units)
+    return (kind, float(L), float(W), None if Er is None else float(Er), units)
+
+class ResultsCache:
+    """
+    Bounded least-recently-used cache of computed results, with hit, miss
+    and eviction counters.
+
+    If 'path' is given the cache is loaded from it on construction (when
+    the file exists) and save() writes it back, so results survive between
+    sessions.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, path=None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for 'key', calling compute() and storing its
+        result on a miss.
+        """
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            value = compute()
+            self.put(key, value)
+            return value
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def clear(self):
+        self._data.clear()
+
+    def save(self, path=None):
+        """
+        Write the cached entries (most recently used last) to 'path' or the
+        path given at construction. The file is replaced atomically.
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("No cache path given")
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(list(self._data.items()), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def load(self, path=None):
+        """
+        Merge entries saved by save() into the cache. Unreadable files, and
+        files that do not hold a list of (key, value) pairs, are ignored as
+        a whole so a stale or corrupt cache never blocks the tools.
+        """
+        path = path or self.path
+        try:
+            with open(path, "rb") as f:
+                items = pickle.load(f)
+            # A damaged pickle can fail in almost any way, or load as
+            # something else entirely; check the shape before merging.
+            if not isinstance(items, list):
+                return
+            entries = OrderedDict()
+            for item in items:
+                if not isinstance(item, tuple) or len(item) != 2:
+                    return
+                entries[item[0]] = item[1]
+        except Exception:
+            return
+        for key, value in entries.items():
+            self.put(key, value)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"cache: {s['hits']} hits, {s['misses']} misses, {s['evictions']} evictions "
+                f"({s['hit_rate']:.1%} hit rate, {s['size']}/{s['maxsize']} entries)")
+
+_shared_cache = None
+
+def shared_cache():
+    """
+    The process-wide cache shared by the calculator and the interactive
+    plots. Its size comes from $BEND_DELAY_CACHE_SIZE; if $BEND_DELAY_CACHE
+    names a file, the cache is loaded from it and saved back at exit.
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        path = os.environ.get(CACHE_PATH_ENV) or None
+        maxsize = int(os.environ.get(CACHE_SIZE_ENV, DEFAULT_MAXSIZE))
+        _shared_cache = ResultsCache(maxsize, path)
+        if path is not None:
+            atexit.register(_shared_cache.save)
+    return _shared_cache
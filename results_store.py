@@ -0,0 +1,341 @@
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+from propagation import write_results
+
+# Output formats of the batch tools: a columnar store directory, or text.
+OUTPUT_FORMATS = ("columns", "csv", "jsonl")
+
+SCHEMA_FILE = "schema.json"
+STORE_VERSION = 1
+
+# Units of result columns, by name suffix (checked in order) or full name.
+COLUMN_UNITS = (
+    ("_inch", "inch"),
+    ("_in", "inch"),
+    ("_m", "m"),
+    ("_ps", "ps"),
+    ("_ohm", "ohm"),
+    ("_hz", "Hz"),
+)
+NAMED_UNITS = {"v": "m/s", "Er": "", "Er_eff": ""}
+
+# Size of the .npy header written by ColumnWriter. It is reserved up front
+# and rewritten with the final row count on close; 128 bytes keeps the
+# data 64-byte aligned and fits any 1-D shape of a plain dtype.
+_HEADER_BYTES = 128
+
+def column_unit(name):
+    """
+    Unit of a result column from its name ('' for dimensionless columns,
+    None when unknown).
+    """
+    if name in NAMED_UNITS:
+        return NAMED_UNITS[name]
+    for suffix, unit in COLUMN_UNITS:
+        if name.endswith(suffix):
+            return unit
+    return None
+
+def _npy_header(dtype, rows):
+    """
+    .npy version 1.0 header for a 1-D array of 'rows' items, padded to
+    exactly _HEADER_BYTES.
+    """
+    header = repr({"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False,
+                   "shape": (rows,)})
+    size = _HEADER_BYTES - 10
+    if len(header) + 1 > size:
+        raise ValueError(f"Column dtype {dtype} does not fit the .npy header")
+    header = (header.ljust(size - 1) + "\n").encode("latin1")
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", size) + header
+
+def write_schema(path, columns, rows, **metadata):
+    """
+    Write the store's schema.json: the row count and, per column, its name,
+    dtype ('utf8' for string columns), shape and unit. Extra keyword
+    arguments are stored as metadata.
+    """
+    schema = {"version": STORE_VERSION, "rows": rows, "columns": columns}
+    if metadata:
+        schema["metadata"] = metadata
+    with open(os.path.join(path, SCHEMA_FILE), "w") as f:
+        json.dump(schema, f, indent=1)
+
+def column_schema(name, dtype, shape):
+    return {"name": name, "dtype": dtype if isinstance(dtype, str) else np.dtype(dtype).str,
+            "shape": list(shape), "unit": column_unit(name)}
+
+class ColumnWriter:
+    """
+    Streaming writer of a columnar results store: a directory holding one
+    .npy file per numeric field, string ids as '<name>.offsets.npy' (int64
+    start offsets, n + 1 of them) plus '<name>.utf8', and schema.json.
+
+    write() appends one chunk of structured results (the first chunk fixes
+    the columns) and may be called any number of times; memory use does
+    not grow with the row count. The files are valid .npy once close() has
+    rewritten their headers with the final length, after which
+    open_columns() maps them without parsing.
+    """
+
+    def __init__(self, path, id_name="net"):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.id_name = id_name
+        self.rows = 0
+        self._dtype = None
+        self._files = {}
+        self._ids = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open(self, dtype, with_ids):
+        self._dtype = dtype
+        for name in dtype.names:
+            f = open(os.path.join(self.path, f"{name}.npy"), "wb")
+            f.write(_npy_header(dtype[name], 0))
+            self._files[name] = f
+        if with_ids:
+            offsets = open(os.path.join(self.path, f"{self.id_name}.offsets.npy"), "wb")
+            offsets.write(_npy_header(np.dtype(np.int64), 0))
+            offsets.write(np.zeros(1, dtype=np.int64).tobytes())
+            self._ids = (offsets, open(os.path.join(self.path, f"{self.id_name}.utf8"), "wb"), 0)
+
+    def write(self, results, ids=None):
+        if self._dtype is None:
+            self._open(results.dtype, ids is not None)
+        elif results.dtype != self._dtype:
+            raise ValueError("All chunks must have the same fields")
+        if (ids is not None) != (self._ids is not None):
+            raise ValueError("Give ids with every chunk or with none")
+        for name, f in self._files.items():
+            f.write(np.ascontiguousarray(results[name]).tobytes())
+        if ids is not None:
+            offsets, data, end = self._ids
+            encoded = [str(i).encode("utf-8") for i in ids]
+            ends = end + np.cumsum([len(b) for b in encoded], dtype=np.int64)
+            offsets.write(ends.tobytes())
+            data.write(b"".join(encoded))
+            self._ids = (offsets, data, int(ends[-1]) if len(ends) else end)
+        self.rows += len(results)
+
+    def close(self):
+        columns = []
+        if self._ids is not None:
+            offsets, data, _ = self._ids
+            offsets.seek(0)
+            offsets.write(_npy_header(np.dtype(np.int64), self.rows + 1))
+            offsets.close()
+            data.close()
+            self._ids = None
+            columns.append(column_schema(self.id_name, "utf8", (self.rows,)))
+        for name, f in self._files.items():
+            f.seek(0)
+            f.write(_npy_header(self._dtype[name], self.rows))
+            f.close()
+            columns.append(column_schema(name, self._dtype[name], (self.rows,)))
+        self._files = {}
+        write_schema(self.path, columns, self.rows)
+
+def write_columns(path, results, ids=None, id_name="net"):
+    """
+    Write one structured result array (and optional ids) as a columnar
+    store.
+    """
+    with ColumnWriter(path, id_name) as writer:
+        writer.write(results, ids)
+
+class StringColumn:
+    """
+    Read-only view of a stored string column: the offsets and UTF-8 bytes
+    are memory-mapped and only decoded on access.
+    """
+    __slots__ = ("_offsets", "_data")
+
+    def __init__(self, offsets, data):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        start, stop = self._offsets[index], self._offsets[index + 1]
+        return bytes(self._data[start:stop]).decode("utf-8")
+
+class ColumnStore:
+    """
+    A columnar results store opened with open_columns(): store[name] is a
+    read-only memory-mapped array (a StringColumn for ids), so slicing a
+    multi-GB result set only touches the pages it reads.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, SCHEMA_FILE)) as f:
+            self.schema = json.load(f)
+        self.rows = self.schema["rows"]
+        self._columns = {}
+
+    def __len__(self):
+        return self.rows
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    @property
+    def names(self):
+        return [col["name"] for col in self.schema["columns"]]
+
+    def unit(self, name):
+        return self._column(name)["unit"]
+
+    def is_string(self, name):
+        return self._column(name)["dtype"] == "utf8"
+
+    def _column(self, name):
+        for col in self.schema["columns"]:
+            if col["name"] == name:
+                return col
+        raise KeyError(name)
+
+    def __getitem__(self, name):
+        if name not in self._columns:
+            col = self._column(name)
+            if col["dtype"] == "utf8":
+                offsets = np.load(os.path.join(self.path, f"{name}.offsets.npy"), mmap_mode="r")
+                data_path = os.path.join(self.path, f"{name}.utf8")
+                data = (np.memmap(data_path, dtype=np.uint8, mode="r")
+                        if os.path.getsize(data_path) else np.empty(0, dtype=np.uint8))
+                self._columns[name] = StringColumn(offsets, data)
+            else:
+                self._columns[name] = np.load(os.path.join(self.path, f"{name}.npy"),
+                                              mmap_mode="r")
+        return self._columns[name]
+
+    def records(self, names=None, rows=slice(None)):
+        """
+        Structured array of the numeric columns 'names' (default: all) for
+        the selected 'rows', e.g. to pass a slice on to write_results.
+        """
+        names = [n for n in (names or self.names) if not self.is_string(n)]
+        columns = [self[n][rows] for n in names]
+        out = np.empty(columns[0].shape if columns else (0,),
+                       dtype=[(n, c.dtype) for n, c in zip(names, columns)])
+        for n, c in zip(names, columns):
+            out[n] = c
+        return out
+
+def open_columns(path):
+    return ColumnStore(path)
+
+def output_format(output, fmt=None):
+    """
+    Resolve the output format of a batch tool: an explicit 'fmt' wins;
+    stdout ('-') gets csv; a .csv / .jsonl / .ndjson path gets that text
+    format; any other path is a columnar store directory.
+    """
+    if fmt is not None:
+        return fmt
+    if output == "-":
+        return "csv"
+    if output.endswith(".csv"):
+        return "csv"
+    if output.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return "columns"
+
+class TextSink:
+    """
+    write_results() to a text stream with the header written once, with
+    the same write(results, ids) / close() interface as ColumnWriter. The
+    stream is only closed if 'close_stream' is set.
+    """
+
+    def __init__(self, stream, fmt="csv", id_name="net", close_stream=False):
+        self.stream = stream
+        self.fmt = fmt
+        self.id_name = id_name
+        self.close_stream = close_stream
+        self.rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, results, ids=None):
+        write_results(results, self.stream, self.fmt, header=(self.rows == 0), ids=ids,
+                      id_name=self.id_name)
+        self.stream.flush()
+        self.rows += len(results)
+
+    def close(self):
+        if self.close_stream:
+            self.stream.close()
+
+def open_sink(output="-", fmt=None, id_name="net"):
+    """
+    Results sink for the batch tools' '-o' option: a ColumnWriter for a
+    columnar store (the default for any path that is not .csv/.jsonl), or
+    a TextSink for stdout and text files.
+    """
+    fmt = output_format(output, fmt)
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {fmt}")
+    if fmt == "columns":
+        if output == "-":
+            raise ValueError("A columnar store needs an output directory (-o DIR)")
+        return ColumnWriter(output, id_name)
+    if output == "-":
+        return TextSink(sys.stdout, fmt, id_name)
+    return TextSink(open(output, "w", newline=""), fmt, id_name, close_stream=True)
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Inspect a columnar results store, or export rows of it as text.")
+    parser.add_argument("store", help="store directory")
+    parser.add_argument("--rows", nargs=2, type=int, metavar=("START", "STOP"), default=None,
+                        help="export these rows as CSV instead of printing the schema")
+    parser.add_argument("--fields", default=None, help="comma-separated columns to export")
+    parser.add_argument("--output-format", choices=["csv", "jsonl"], default="csv")
+    args = parser.parse_args(argv)
+
+    try:
+        store = open_columns(args.store)
+        if args.rows is None:
+            print(f"{store.rows} rows")
+            for col in store.schema["columns"]:
+                print(f"  {col['name']:<20} {col['dtype']:<6} {col['unit'] or '-'}")
+            return 0
+        rows = slice(*args.rows)
+        names = args.fields.split(",") if args.fields else store.names
+        id_name = next((n for n in names if store.is_string(n)), None)
+        write_results(store.records(names, rows), sys.stdout, args.output_format,
+                      ids=store[id_name][rows] if id_name else None, id_name=id_name)
+    except (OSError, KeyError, ValueError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
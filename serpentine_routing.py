@@ -1,15 +1,154 @@
+import sys
+import time
+
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.widgets import Slider
 
-def plot_trace_interactive():
+from arc_cache import ArcBuffer, arc_points_for
+from bend_geometry import CircularBend, RightAngleBend
+from event_scheduler import EventCoalescer
+from instrumentation import enabled as instrumentation_enabled
+from instrumentation import instrument, stage
+from results_cache import make_key, shared_cache
+
+# Line styles of the red right angle bend segments, in the order produced
+# by RightAngleBend.segments: (format, linewidth).
+RED_SEGMENT_STYLES = (
+    ('r--', 2), ('r--', 2),  # centerline: horizontal, vertical
+    ('r-', 1), ('r-', 1),    # outer edge
+    ('r-', 1), ('r-', 1),    # inner edge
+)
+
+# Line styles of each circular bend edge: (edge, linestyle, linewidth).
+ARC_EDGE_STYLES = (
+    ('center', ':', 2),
+    ('inner', '-', 1),
+    ('outer', '-', 1),
+)
+
+class UpdateTimer:
+    """
+    Built-in latency counter for slider events: number of updates, total,
+    mean and worst time spent in the update callback (seconds).
+    """
+    __slots__ = ("count", "total", "worst")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.worst:
+            self.worst = seconds
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self):
+        return (f"{self.count} updates, mean {self.mean * 1e3:.3f} ms, "
+                f"max {self.worst * 1e3:.3f} ms per update")
+
+def _plot_right_angle(ax, segments):
+    lines = []
+    for (fmt, linewidth), seg in zip(RED_SEGMENT_STYLES, segments):
+        line, = ax.plot(seg[0], seg[1], fmt, linewidth=linewidth)
+        lines.append(line)
+    return lines
+
+# Blit mode keeps the current axis limits while the content still fits and
+# is at least this fraction of the view; otherwise limits and ticks are
+# recomputed (and the static background re-rendered). A recomputed view is
+# made RELIMIT_GROWTH times the content, so a steady drag upwards only
+# relimits every so often instead of on every step.
+RELIMIT_SHRINK = 0.6
+RELIMIT_GROWTH = 1.5
+
+def _set_view(ax, extent, grid_step):
+    ax.set_xlim(0, extent)
+    ax.set_ylim(0, extent)
+    ax.set_xticks(np.arange(0, extent + grid_step, grid_step))
+    ax.set_yticks(np.arange(0, extent + grid_step, grid_step))
+
+# Default chord-error tolerance of adaptively sampled arcs, in screen (or
+# exported image) pixels.
+ARC_TOLERANCE_PX = 0.25
+
+def _arc_tolerance(ax, extent, tolerance_px):
+    """
+    'tolerance_px' converted to data units for an equal-aspect axes
+    showing [0, extent] on its shorter side.
+    """
+    return tolerance_px * extent / min(ax.bbox.width, ax.bbox.height)
+
+def _needs_relimit(current, wanted):
+    return wanted > current or wanted < RELIMIT_SHRINK * current
+
+def _view_extents(geometry):
+    """
+    Axis extent of each plot: the outer edge of the widest trace plus a
+    margin of 20% of the right angle bend's leg.
+    """
+    right_angle = geometry["right_angle"]
+    margin = 0.2 * right_angle.leg
+    outer = right_angle.edge_leg("outer")
+    return [outer + margin, geometry["green"].edge_radius("outer") + margin, outer + margin]
+
+def _bend_label(title, bend):
+    return (f"{title}:\nCenter: {bend.center_length:.1f} mils\n"
+            f"Inner: {bend.inner_length:.1f} mils\nOuter: {bend.outer_length:.1f} mils")
+
+def panel_geometry(trace_length, trace_width):
+    """
+    Bend models and label text for all three plots at one (L, W) slider
+    position, in mils. Results are memoized in the shared results cache,
+    since the integer-valued sliders revisit the same positions constantly.
+    """
+    right_angle = RightAngleBend(trace_length, trace_width)
+    # Plot 1: circular bend with R = L/2
+    blue = CircularBend(trace_length / 2.0, trace_width)
+    # Plot 2: circular trace with R = (L√2)/2
+    green = CircularBend(trace_length * np.sqrt(2) / 2.0, trace_width)
+    # Plot 3: zero-width quarter circle whose arc length equals the right
+    # angle bend's inner length, R = (2/π)(L - W)
+    quarter = CircularBend.from_center_length(right_angle.inner_length, 0.0)
+    return {
+        "right_angle": right_angle,
+        "blue": blue,
+        "green": green,
+        "quarter": quarter,
+        "red_text": _bend_label("Right Angle Bend", right_angle),
+        "blue_text": _bend_label("Circular Bend", blue),
+        "green_text": _bend_label("Circular Trace", green),
+        "quarter_text": f"Quarter Circ: {quarter.center_length:.1f} mils",
+    }
+
+def build_trace_figure(arc_points=None, render_mode='full', frame_budget=1/30, interactive=True,
+                       arc_tolerance=ARC_TOLERANCE_PX):
+    """
+    Build the three-panel interactive figure without showing it.
+    Returns (figure, (length slider, width slider), update timer); the
+    other arguments are those of plot_trace_interactive.
+
+    With interactive=False slider changes only update the artists and the
+    view; the caller draws or saves the figure (used for batch export).
+    """
+    # Matplotlib is imported here rather than at module level so the
+    # geometry helpers above stay cheap to import for headless tools.
+    import matplotlib.pyplot as plt
+    from matplotlib.widgets import Slider
+
+    if render_mode not in ('full', 'blit'):
+        raise ValueError(f"Unknown render mode: {render_mode}")
+    blit = render_mode == 'blit'
+
     # Initial parameters (units in mils)
     initial_trace_length = 50  # total trace length in mils
     initial_trace_width = 10   # trace width in mils
 
-    # Derived parameters:
-    ref_length = initial_trace_length / 2.0
-    offset = initial_trace_width / 2.0
+    geometry = panel_geometry(initial_trace_length, initial_trace_width)
 
     # Create a figure with three subplots side by side.
     fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(18, 6))
@@ -23,293 +162,234 @@ def plot_trace_interactive():
     trace_width_slider = Slider(slider_ax_width, 'Trace Width (mils)', 1, 50,
                                 valinit=initial_trace_width, valstep=1)
 
-    # Pre-calculate theta for a quarter circle (0° to 90°)
-    theta = np.linspace(0, np.pi/2, 200)
+    # Every arc artist gets a preallocated buffer, scaled from a cached unit
+    # quarter circle (0° to 90°). With arc_points=None the resolution follows
+    # the radius and the view so chords stay within 'arc_tolerance' pixels
+    # of the true arc. Entries are (geometry key, edge, panel, line, buffer).
+    arcs = []
+
+    def arc_resolution(bend, edge, panel):
+        if arc_points:
+            return arc_points
+        ax = axes[panel]
+        tolerance = _arc_tolerance(ax, view_extents[panel], arc_tolerance)
+        return arc_points_for(bend.edge_radius(edge), tolerance)
+
+    def plot_arc(panel, key, color, edges=ARC_EDGE_STYLES):
+        bend = geometry[key]
+        for edge, linestyle, linewidth in edges:
+            buffer = ArcBuffer(arc_resolution(bend, edge, panel))
+            line, = axes[panel].plot(*bend.polyline(edge, buffer=buffer), color + linestyle,
+                                     linewidth=linewidth)
+            arcs.append((key, edge, panel, line, buffer))
+
+    # The red right angle bend is identical on all three plots: its segments
+    # are computed once per event into this buffer and shared.
+    red_segments = geometry["right_angle"].segments()
+
+    def setup_axes(ax, title, extent):
+        _set_view(ax, extent, grid_step)
+        ax.set_aspect('equal', 'box')
+        ax.grid(True)
+        ax.set_xlabel("x (mils)")
+        ax.set_ylabel("y (mils)")
+        ax.set_title(title)
+
+    def label(ax, x, y, text, color, **kwargs):
+        return ax.text(x, y, text, transform=ax.transAxes, color=color, fontsize=10, **kwargs)
+
+    grid_step = initial_trace_length / 10.0
+    view_extents = _view_extents(geometry)
+    axes = (ax1, ax2, ax3)
 
     # ---------------------------
     # Plot 1: Combined Traces (Circular Bend in blue and Right Angle Bend in red)
     # ---------------------------
-    # Blue Circular Bend (using ref_length = L/2)
-    x_center_blue = ref_length * np.cos(theta)
-    y_center_blue = ref_length * np.sin(theta)
-    blue_centerline, = ax1.plot(x_center_blue, y_center_blue, 'b:', linewidth=2)
-    x_inner_blue = (ref_length - offset) * np.cos(theta)
-    y_inner_blue = (ref_length - offset) * np.sin(theta)
-    blue_inner, = ax1.plot(x_inner_blue, y_inner_blue, 'b-', linewidth=1)
-    x_outer_blue = (ref_length + offset) * np.cos(theta)
-    y_outer_blue = (ref_length + offset) * np.sin(theta)
-    blue_outer, = ax1.plot(x_outer_blue, y_outer_blue, 'b-', linewidth=1)
-
-    # Red Right Angle Bend (for Plot 1)
-    x_red_horiz = np.linspace(0, ref_length, 200)
-    red_horiz_center, = ax1.plot(x_red_horiz, np.full_like(x_red_horiz, ref_length),
-                                  'r--', linewidth=2)
-    y_red_vert = np.linspace(0, ref_length, 200)
-    red_vert_center, = ax1.plot(np.full_like(y_red_vert, ref_length), y_red_vert,
-                                 'r--', linewidth=2)
-    x_red_horiz_outer = np.linspace(0, ref_length + offset, 200)
-    red_horiz_outer, = ax1.plot(x_red_horiz_outer, np.full_like(x_red_horiz_outer, ref_length + offset),
-                                'r-', linewidth=1)
-    y_red_vert_outer = np.linspace(0, ref_length + offset, 200)
-    red_vert_outer, = ax1.plot(np.full_like(y_red_vert_outer, ref_length + offset), y_red_vert_outer,
-                               'r-', linewidth=1)
-    x_red_horiz_inner = np.linspace(0, ref_length - offset, 200)
-    red_horiz_inner, = ax1.plot(x_red_horiz_inner, np.full_like(x_red_horiz_inner, ref_length - offset),
-                                'r-', linewidth=1)
-    y_red_vert_inner = np.linspace(0, ref_length - offset, 200)
-    red_vert_inner, = ax1.plot(np.full_like(y_red_vert_inner, ref_length - offset), y_red_vert_inner,
-                               'r-', linewidth=1)
-
-    margin1 = 0.2 * ref_length
-    ax1.set_xlim(0, ref_length + offset + margin1)
-    ax1.set_ylim(0, ref_length + offset + margin1)
-    ax1.set_aspect('equal', 'box')
-    grid_step = initial_trace_length / 10.0
-    ax1.set_xticks(np.arange(0, ref_length + offset + margin1 + grid_step, grid_step))
-    ax1.set_yticks(np.arange(0, ref_length + offset + margin1 + grid_step, grid_step))
-    ax1.grid(True)
-    ax1.set_xlabel("x (mils)")
-    ax1.set_ylabel("y (mils)")
-    ax1.set_title("Plot 1: Combined Traces")
-    # Text labels on Plot 1:
-    red_center_len = initial_trace_length
-    red_inner_len = initial_trace_length - initial_trace_width
-    red_outer_len = initial_trace_length + initial_trace_width
-    ax1.text(0.05, 0.95,
-             f"Right Angle Bend:\nCenter: {red_center_len:.1f} mils\nInner: {red_inner_len:.1f} mils\nOuter: {red_outer_len:.1f} mils",
-             transform=ax1.transAxes, color='r', fontsize=10, verticalalignment='top')
-    blue_center_len = (np.pi/2) * ref_length
-    blue_inner_len  = (np.pi/2) * (ref_length - offset)
-    blue_outer_len  = (np.pi/2) * (ref_length + offset)
-    ax1.text(0.55, 0.95,
-             f"Circular Bend:\nCenter: {blue_center_len:.1f} mils\nInner: {blue_inner_len:.1f} mils\nOuter: {blue_outer_len:.1f} mils",
-             transform=ax1.transAxes, color='b', fontsize=10, verticalalignment='top')
+    plot_arc(0, "blue", 'b')
+    red_lines1 = _plot_right_angle(ax1, red_segments)
+    setup_axes(ax1, "Plot 1: Combined Traces", view_extents[0])
+    red_text1 = label(ax1, 0.05, 0.95, geometry["red_text"], 'r', verticalalignment='top')
+    blue_text1 = label(ax1, 0.55, 0.95, geometry["blue_text"], 'b', verticalalignment='top')
+
+    # ---------------------------
+    # Plot 2: Red Right Angle Bend with Green Circular Trace, R = (L√2)/2
+    # ---------------------------
+    red_lines2 = _plot_right_angle(ax2, red_segments)
+    plot_arc(1, "green", 'g')
+    setup_axes(ax2, "Plot 2: R = (L·√2)/2", view_extents[1])
+    red_text2 = label(ax2, 0.05, 0.90, geometry["red_text"], 'r', verticalalignment='top')
+    green_text2 = label(ax2, 0.55, 0.90, geometry["green_text"], 'g', verticalalignment='top')
 
     # ---------------------------
-    # Plot 2: Red Right Angle Bend with Green Circular Trace
+    # Plot 3: Right Angle Bend with Quarter Circle Matching Inner Length
     # ---------------------------
-    # Draw the red right angle bend (same as in Plot 1)
-    x_red_horiz2 = np.linspace(0, ref_length, 200)
-    red_horiz_center2, = ax2.plot(x_red_horiz2, np.full_like(x_red_horiz2, ref_length),
-                                   'r--', linewidth=2)
-    y_red_vert2 = np.linspace(0, ref_length, 200)
-    red_vert_center2, = ax2.plot(np.full_like(y_red_vert2, ref_length), y_red_vert2,
-                                  'r--', linewidth=2)
-    x_red_horiz_outer2 = np.linspace(0, ref_length + offset, 200)
-    red_horiz_outer2, = ax2.plot(x_red_horiz_outer2, np.full_like(x_red_horiz_outer2, ref_length + offset),
-                                 'r-', linewidth=1)
-    y_red_vert_outer2 = np.linspace(0, ref_length + offset, 200)
-    red_vert_outer2, = ax2.plot(np.full_like(y_red_vert_outer2, ref_length + offset), y_red_vert_outer2,
-                                'r-', linewidth=1)
-    x_red_horiz_inner2 = np.linspace(0, ref_length - offset, 200)
-    red_horiz_inner2, = ax2.plot(x_red_horiz_inner2, np.full_like(x_red_horiz_inner2, ref_length - offset),
-                                 'r-', linewidth=1)
-    y_red_vert_inner2 = np.linspace(0, ref_length - offset, 200)
-    red_vert_inner2, = ax2.plot(np.full_like(y_red_vert_inner2, ref_length - offset), y_red_vert_inner2,
-                                'r-', linewidth=1)
-    # Draw the green circular trace.
-    # Use R_green = (L√2)/2.
-    R_green = initial_trace_length * np.sqrt(2) / 2.0
-    x_center_green = R_green * np.cos(theta)
-    y_center_green = R_green * np.sin(theta)
-    green_centerline, = ax2.plot(x_center_green, y_center_green, 'g:', linewidth=2)
-    x_inner_green = (R_green - offset) * np.cos(theta)
-    y_inner_green = (R_green - offset) * np.sin(theta)
-    green_inner, = ax2.plot(x_inner_green, y_inner_green, 'g-', linewidth=1)
-    x_outer_green = (R_green + offset) * np.cos(theta)
-    y_outer_green = (R_green + offset) * np.sin(theta)
-    green_outer, = ax2.plot(x_outer_green, y_outer_green, 'g-', linewidth=1)
-
-    margin2 = 0.2 * (initial_trace_length * np.sqrt(2) / 2.0)
-    ax2.set_xlim(0, (initial_trace_length * np.sqrt(2) / 2.0) + offset + margin2)
-    ax2.set_ylim(0, (initial_trace_length * np.sqrt(2) / 2.0) + offset + margin2)
-    ax2.set_aspect('equal', 'box')
-    ax2.set_xticks(np.arange(0, (initial_trace_length * np.sqrt(2) / 2.0) + offset + margin2 + grid_step, grid_step))
-    ax2.set_yticks(np.arange(0, (initial_trace_length * np.sqrt(2) / 2.0) + offset + margin2 + grid_step, grid_step))
-    ax2.grid(True)
-    ax2.set_xlabel("x (mils)")
-    ax2.set_ylabel("y (mils)")
-    ax2.set_title("Plot 2: R = (L·√2)/2")
-    # Text labels on Plot 2:
-    red_center_len2 = initial_trace_length
-    red_inner_len2 = initial_trace_length - initial_trace_width
-    red_outer_len2 = initial_trace_length + initial_trace_width
-    ax2.text(0.05, 0.90,
-             f"Right Angle Bend:\nCenter: {red_center_len2:.1f} mils\nInner: {red_inner_len2:.1f} mils\nOuter: {red_outer_len2:.1f} mils",
-             transform=ax2.transAxes, color='r', fontsize=10, verticalalignment='top')
-    green_center_len = (np.pi/2) * R_green
-    green_inner_len  = (np.pi/2) * (R_green - offset)
-    green_outer_len  = (np.pi/2) * (R_green + offset)
-    ax2.text(0.55, 0.90,
-             f"Circular Trace:\nCenter: {green_center_len:.1f} mils\nInner: {green_inner_len:.1f} mils\nOuter: {green_outer_len:.1f} mils",
-             transform=ax2.transAxes, color='g', fontsize=10, verticalalignment='top')
+    red_lines3 = _plot_right_angle(ax3, red_segments)
+    plot_arc(2, "quarter", 'g', edges=(('center', '-', 2),))
+    quarter_text3 = label(ax3, 0.05, 0.75, geometry["quarter_text"], 'g')
+    setup_axes(ax3, "Plot 3: R = (2/π)(L – W)", view_extents[2])
+    red_text3 = label(ax3, 0.05, 0.95, geometry["red_text"], 'r', verticalalignment='top')
+
+    red_lines = red_lines1 + red_lines2 + red_lines3
+    red_texts = (red_text1, red_text2, red_text3)
+    update_timer = UpdateTimer()
+    results_cache = shared_cache()
 
     # ---------------------------
-    # Plot 3: Right Angle Bend with Quarter Circle Matching Inner Length (unchanged)
+    # Blitting: everything that changes per event is animated and drawn on
+    # top of a cached copy of the static figure.
     # ---------------------------
-    x_red_horiz3 = np.linspace(0, ref_length, 200)
-    red_horiz_center3, = ax3.plot(x_red_horiz3, np.full_like(x_red_horiz3, ref_length),
-                                   'r--', linewidth=2)
-    y_red_vert3 = np.linspace(0, ref_length, 200)
-    red_vert_center3, = ax3.plot(np.full_like(y_red_vert3, ref_length), y_red_vert3,
-                                  'r--', linewidth=2)
-    x_red_horiz_outer3 = np.linspace(0, ref_length + offset, 200)
-    red_horiz_outer3, = ax3.plot(x_red_horiz_outer3, np.full_like(x_red_horiz_outer3, ref_length + offset),
-                                  'r-', linewidth=1)
-    y_red_vert_outer3 = np.linspace(0, ref_length + offset, 200)
-    red_vert_outer3, = ax3.plot(np.full_like(y_red_vert_outer3, ref_length + offset), y_red_vert_outer3,
-                                 'r-', linewidth=1)
-    x_red_horiz_inner3 = np.linspace(0, ref_length - offset, 200)
-    red_horiz_inner3, = ax3.plot(x_red_horiz_inner3, np.full_like(x_red_horiz_inner3, ref_length - offset),
-                                  'r-', linewidth=1)
-    y_red_vert_inner3 = np.linspace(0, ref_length - offset, 200)
-    red_vert_inner3, = ax3.plot(np.full_like(y_red_vert_inner3, ref_length - offset), y_red_vert_inner3,
-                                 'r-', linewidth=1)
-    # Quarter circle in Plot 3: Its arc length equals the red inner length = (trace_length - trace_width).
-    R_quarter = (2/np.pi) * (initial_trace_length - initial_trace_width)
-    x_quarter3 = R_quarter * np.cos(theta)
-    y_quarter3 = R_quarter * np.sin(theta)
-    quarter_line3, = ax3.plot(x_quarter3, y_quarter3, 'g-', linewidth=2)
-    quarter_text3 = ax3.text(0.05, 0.75,
-                             f"Quarter Circ: {(np.pi/2)*R_quarter:.1f} mils",
-                             transform=ax3.transAxes, fontsize=10, color='g')
-    margin3 = 0.2 * ref_length
-    ax3.set_xlim(0, ref_length + offset + margin3)
-    ax3.set_ylim(0, ref_length + offset + margin3)
-    ax3.set_aspect('equal', 'box')
-    ax3.set_xticks(np.arange(0, ref_length + offset + margin3 + grid_step, grid_step))
-    ax3.set_yticks(np.arange(0, ref_length + offset + margin3 + grid_step, grid_step))
-    ax3.grid(True)
-    ax3.set_xlabel("x (mils)")
-    ax3.set_ylabel("y (mils)")
-    ax3.set_title("Plot 3: R = (2/π)(L – W)")
-    red_text_3 = f"Right Angle Bend:\nCenter: {initial_trace_length:.1f} mils\nInner: {initial_trace_length - initial_trace_width:.1f} mils\nOuter: {initial_trace_length + initial_trace_width:.1f} mils"
-    ax3.text(0.05, 0.95, red_text_3, transform=ax3.transAxes, color='r', fontsize=10, verticalalignment='top')
+    dynamic_artists = red_lines + [line for _, _, _, line, _ in arcs] + [
+        quarter_text3, blue_text1, green_text2, *red_texts]
+    slider_axes = (slider_ax_length, slider_ax_width)
+    background = None
+
+    def draw_dynamic():
+        for artist in dynamic_artists:
+            artist.axes.draw_artist(artist)
+        for ax in slider_axes:
+            fig.draw_artist(ax)
+
+    def on_draw(event):
+        nonlocal background
+        background = fig.canvas.copy_from_bbox(fig.bbox)
+        draw_dynamic()
+
+    if blit:
+        for artist in dynamic_artists:
+            artist.set_animated(True)
+        # The sliders would otherwise request a full redraw on every move.
+        for slider in (trace_length_slider, trace_width_slider):
+            slider.drawon = False
+        for ax in slider_axes:
+            ax.set_animated(True)
+        fig.canvas.mpl_connect('draw_event', on_draw)
+    if not interactive:
+        for slider in (trace_length_slider, trace_width_slider):
+            slider.drawon = False
 
     # ---------------------------
     # Update Function for the Sliders
     # ---------------------------
     def update(val):
+        start = time.perf_counter()
         trace_length = trace_length_slider.val
         trace_width  = trace_width_slider.val
-        new_ref = trace_length / 2.0
-        new_offset = trace_width / 2.0
-
-        # Update Plot 1 (Combined Traces)
-        new_x_center_blue = new_ref * np.cos(theta)
-        new_y_center_blue = new_ref * np.sin(theta)
-        blue_centerline.set_data(new_x_center_blue, new_y_center_blue)
-        new_x_inner_blue = (new_ref - new_offset) * np.cos(theta)
-        new_y_inner_blue = (new_ref - new_offset) * np.sin(theta)
-        blue_inner.set_data(new_x_inner_blue, new_y_inner_blue)
-        new_x_outer_blue = (new_ref + new_offset) * np.cos(theta)
-        new_y_outer_blue = (new_ref + new_offset) * np.sin(theta)
-        blue_outer.set_data(new_x_outer_blue, new_y_outer_blue)
-
-        new_x_red_horiz = np.linspace(0, new_ref, 200)
-        red_horiz_center.set_data(new_x_red_horiz, np.full_like(new_x_red_horiz, new_ref))
-        new_y_red_vert = np.linspace(0, new_ref, 200)
-        red_vert_center.set_data(np.full_like(new_y_red_vert, new_ref), new_y_red_vert)
-        new_x_red_horiz_outer = np.linspace(0, new_ref + new_offset, 200)
-        red_horiz_outer.set_data(new_x_red_horiz_outer, np.full_like(new_x_red_horiz_outer, new_ref + new_offset))
-        new_y_red_vert_outer = np.linspace(0, new_ref + new_offset, 200)
-        red_vert_outer.set_data(np.full_like(new_y_red_vert_outer, new_ref + new_offset), new_y_red_vert_outer)
-        new_x_red_horiz_inner = np.linspace(0, new_ref - new_offset, 200)
-        red_horiz_inner.set_data(new_x_red_horiz_inner, np.full_like(new_x_red_horiz_inner, new_ref - new_offset))
-        new_y_red_vert_inner = np.linspace(0, new_ref - new_offset, 200)
-        red_vert_inner.set_data(np.full_like(new_y_red_vert_inner, new_ref - new_offset), new_y_red_vert_inner)
-
-        margin_new = 0.2 * new_ref
-        ax1.set_xlim(0, new_ref + new_offset + margin_new)
-        ax1.set_ylim(0, new_ref + new_offset + margin_new)
-        new_grid_step = trace_length / 10.0
-        ax1.set_xticks(np.arange(0, new_ref + new_offset + margin_new + new_grid_step, new_grid_step))
-        ax1.set_yticks(np.arange(0, new_ref + new_offset + margin_new + new_grid_step, new_grid_step))
-        new_red_center = trace_length
-        new_red_inner  = trace_length - trace_width
-        new_red_outer  = trace_length + trace_width
-        ax1.texts[0].set_text(f"Right Angle Bend:\nCenter: {new_red_center:.1f} mils\nInner: {new_red_inner:.1f} mils\nOuter: {new_red_outer:.1f} mils")
-        new_blue_center = (np.pi/2) * new_ref
-        new_blue_inner  = (np.pi/2) * (new_ref - new_offset)
-        new_blue_outer  = (np.pi/2) * (new_ref + new_offset)
-        ax1.texts[1].set_text(f"Circular Bend:\nCenter: {new_blue_center:.1f} mils\nInner: {new_blue_inner:.1f} mils\nOuter: {new_blue_outer:.1f} mils")
-
-        # Update Plot 2 (Red Right Angle Bend + Green Circular Trace)
-        # Update red right-angle bend on Plot 2 (same as in Plot 1)
-        new_x_red_horiz2 = np.linspace(0, new_ref, 200)
-        red_horiz_center2.set_data(new_x_red_horiz2, np.full_like(new_x_red_horiz2, new_ref))
-        new_y_red_vert2 = np.linspace(0, new_ref, 200)
-        red_vert_center2.set_data(np.full_like(new_y_red_vert2, new_ref), new_y_red_vert2)
-        new_x_red_horiz_outer2 = np.linspace(0, new_ref + new_offset, 200)
-        red_horiz_outer2.set_data(new_x_red_horiz_outer2, np.full_like(new_x_red_horiz_outer2, new_ref + new_offset))
-        new_y_red_vert_outer2 = np.linspace(0, new_ref + new_offset, 200)
-        red_vert_outer2.set_data(np.full_like(new_y_red_vert_outer2, new_ref + new_offset), new_y_red_vert_outer2)
-        new_x_red_horiz_inner2 = np.linspace(0, new_ref - new_offset, 200)
-        red_horiz_inner2.set_data(new_x_red_horiz_inner2, np.full_like(new_x_red_horiz_inner2, new_ref - new_offset))
-        new_y_red_vert_inner2 = np.linspace(0, new_ref - new_offset, 200)
-        red_vert_inner2.set_data(np.full_like(new_y_red_vert_inner2, new_ref - new_offset), new_y_red_vert_inner2)
-        # Update green circular trace on Plot 2:
-        new_R_green = trace_length * np.sqrt(2) / 2.0
-        new_x_center_green = new_R_green * np.cos(theta)
-        new_y_center_green = new_R_green * np.sin(theta)
-        green_centerline.set_data(new_x_center_green, new_y_center_green)
-        new_x_inner_green = (new_R_green - new_offset) * np.cos(theta)
-        new_y_inner_green = (new_R_green - new_offset) * np.sin(theta)
-        green_inner.set_data(new_x_inner_green, new_y_inner_green)
-        new_x_outer_green = (new_R_green + new_offset) * np.cos(theta)
-        new_y_outer_green = (new_R_green + new_offset) * np.sin(theta)
-        green_outer.set_data(new_x_outer_green, new_y_outer_green)
-        ax2.set_xlim(0, new_R_green + new_offset + margin_new)
-        ax2.set_ylim(0, new_R_green + new_offset + margin_new)
-        ax2.set_xticks(np.arange(0, new_R_green + new_offset + margin_new + new_grid_step, new_grid_step))
-        ax2.set_yticks(np.arange(0, new_R_green + new_offset + margin_new + new_grid_step, new_grid_step))
-        new_green_center = (np.pi/2) * new_R_green
-        new_green_inner  = (np.pi/2) * (new_R_green - new_offset)
-        new_green_outer  = (np.pi/2) * (new_R_green + new_offset)
-        # Place green text on the right side.
-        ax2.texts[1].set_text(f"Right Angle Bend:\nCenter: {trace_length:.1f} mils\nInner: {trace_length - trace_width:.1f} mils\nOuter: {trace_length + trace_width:.1f} mils")
-        ax2.texts[2].set_text(f"Circular Trace:\nCenter: {new_green_center:.1f} mils\nInner: {new_green_inner:.1f} mils\nOuter: {new_green_outer:.1f} mils")
-
-        # Update Plot 3 (Right Angle Bend with Quarter Circle Matching Inner Length)
-        new_x_red_horiz3 = np.linspace(0, new_ref, 200)
-        red_horiz_center3.set_data(new_x_red_horiz3, np.full_like(new_x_red_horiz3, new_ref))
-        new_y_red_vert3 = np.linspace(0, new_ref, 200)
-        red_vert_center3.set_data(np.full_like(new_y_red_vert3, new_ref), new_y_red_vert3)
-        new_x_red_horiz_outer3 = np.linspace(0, new_ref + new_offset, 200)
-        red_horiz_outer3.set_data(new_x_red_horiz_outer3, np.full_like(new_x_red_horiz_outer3, new_ref + new_offset))
-        new_y_red_vert_outer3 = np.linspace(0, new_ref + new_offset, 200)
-        red_vert_outer3.set_data(np.full_like(new_y_red_vert_outer3, new_ref + new_offset), new_y_red_vert_outer3)
-        new_x_red_horiz_inner3 = np.linspace(0, new_ref - new_offset, 200)
-        red_horiz_inner3.set_data(new_x_red_horiz_inner3, np.full_like(new_x_red_horiz_inner3, new_ref - new_offset))
-        new_y_red_vert_inner3 = np.linspace(0, new_ref - new_offset, 200)
-        red_vert_inner3.set_data(np.full_like(new_y_red_vert_inner3, new_ref - new_offset), new_y_red_vert_inner3)
-        new_R_quarter = (2/np.pi) * (trace_length - trace_width)
-        new_x_quarter3 = new_R_quarter * np.cos(theta)
-        new_y_quarter3 = new_R_quarter * np.sin(theta)
-        quarter_line3.set_data(new_x_quarter3, new_y_quarter3)
-        new_quarter_len = (np.pi/2) * new_R_quarter
-        quarter_text3.set_text(f"Quarter Circ: {new_quarter_len:.1f} mils")
-        ax3.set_xlim(0, new_ref + new_offset + margin_new)
-        ax3.set_ylim(0, new_ref + new_offset + margin_new)
-        ax3.set_xticks(np.arange(0, new_ref + new_offset + margin_new + new_grid_step, new_grid_step))
-        ax3.set_yticks(np.arange(0, new_ref + new_offset + margin_new + new_grid_step, new_grid_step))
-        ax3.texts[0].set_text(f"Right Angle Bend Center: {trace_length:.1f} mils")
-
-        for ax in (ax1, ax2, ax3):
-            ax.figure.canvas.draw_idle()
-
-    # For Plot 2, add a red text label (for the right angle bend) and a green text label (for the circular trace).
-    ax2.text(0.05, 0.90,
-             f"Right Angle Bend:\nCenter: {initial_trace_length:.1f} mils\nInner: {initial_trace_length - initial_trace_width:.1f} mils\nOuter: {initial_trace_length + initial_trace_width:.1f} mils",
-             transform=ax2.transAxes, color='r', fontsize=10, verticalalignment='top')
-    ax2.text(0.55, 0.90,
-             f"Circular Trace:\nCenter: {(np.pi/2)*R_green:.1f} mils\nInner: {(np.pi/2)*(R_green - offset):.1f} mils\nOuter: {(np.pi/2)*(R_green + offset):.1f} mils",
-             transform=ax2.transAxes, color='g', fontsize=10, verticalalignment='top')
-
-    trace_length_slider.on_changed(update)
-    trace_width_slider.on_changed(update)
+        with stage("update.geometry"):
+            geometry = results_cache.get_or_compute(
+                make_key("panel_geometry", trace_length, trace_width, units="mils"),
+                lambda: panel_geometry(trace_length, trace_width))
+
+            # Red right angle bend, shared by all three plots: two points per
+            # straight segment, written into the persistent buffer.
+            geometry["right_angle"].segments(out=red_segments)
+            for i, line in enumerate(red_lines):
+                seg = red_segments[i % 6]
+                line.set_data(seg[0], seg[1])
 
+        # Axis limits and ticks
+        with stage("update.axes"):
+            new_grid_step = trace_length / 10.0
+            wanted = _view_extents(geometry)
+            relimit = (not blit or background is None
+                       or any(map(_needs_relimit, view_extents, wanted)))
+            if relimit:
+                for i, ax in enumerate(axes):
+                    extent = wanted[i] * RELIMIT_GROWTH if blit else wanted[i]
+                    _set_view(ax, extent, new_grid_step)
+                    view_extents[i] = extent
+
+        # Circular bends (blue, green and quarter circle), sampled for the
+        # view they are drawn in
+        with stage("update.arcs"):
+            for key, edge, panel, line, buffer in arcs:
+                bend = geometry[key]
+                line.set_data(*bend.polyline(edge, arc_resolution(bend, edge, panel),
+                                             buffer=buffer))
+
+        with stage("update.text"):
+            for text in red_texts:
+                text.set_text(geometry["red_text"])
+            blue_text1.set_text(geometry["blue_text"])
+            green_text2.set_text(geometry["green_text"])
+            quarter_text3.set_text(geometry["quarter_text"])
+
+        if relimit:
+            if interactive:
+                fig.canvas.draw_idle()
+        else:
+            with stage("update.blit"):
+                fig.canvas.restore_region(background)
+                draw_dynamic()
+                fig.canvas.blit(fig.bbox)
+        update_timer.record(time.perf_counter() - start)
+
+    # Coalesce slider events: both sliders feed one scheduler, which calls
+    # update() with only the newest value once per frame budget.
+    scheduler = EventCoalescer(update, frame_budget,
+                               timer=fig.canvas.new_timer(interval=max(1, int(frame_budget * 1000))))
+    trace_length_slider.on_changed(scheduler.submit)
+    trace_width_slider.on_changed(scheduler.submit)
+
+    def on_close(event):
+        # Session statistics only go out with the stage profile
+        # ($BEND_DELAY_PROFILE / $BEND_DELAY_TRACE or --profile / --trace).
+        if instrumentation_enabled():
+            for summary in (update_timer, scheduler, results_cache):
+                print(summary.summary(), file=sys.stderr)
+
+    fig.canvas.mpl_connect('close_event', on_close)
+    if instrumentation_enabled():
+        # Full redraws happen later, in the canvas's draw_idle callback; time
+        # them at the figure (an instance attribute, so only when enabled).
+        fig.draw = instrument("figure.draw")(fig.draw)
+    return fig, (trace_length_slider, trace_width_slider), update_timer
+
+def plot_trace_interactive(arc_points=None, render_mode='full', frame_budget=1/30,
+                           arc_tolerance=ARC_TOLERANCE_PX):
+    """
+    Show the three-panel interactive figure.
+
+    render_mode='full' redraws the whole figure on every slider event.
+    render_mode='blit' caches the static background (axes, ticks, grid,
+    titles) and only redraws the traces, labels and sliders; limits and
+    ticks are recomputed only when the traces outgrow the view or shrink
+    well inside it.
+
+    Slider events are coalesced so the figure updates at most once per
+    'frame_budget' seconds with the latest slider values; intermediate
+    values are dropped. frame_budget=0 updates on every event.
+
+    Arcs are sampled with 'arc_points' points each or, by default, with
+    just enough points that no chord strays more than 'arc_tolerance'
+    pixels from the true arc at the current zoom (see
+    arc_cache.arc_points_for).
+    """
+    import matplotlib.pyplot as plt
+
+    fig, sliders, update_timer = build_trace_figure(arc_points, render_mode, frame_budget,
+                                                    arc_tolerance=arc_tolerance)
     plt.show()
+    return update_timer
 
 if __name__ == '__main__':
-    plot_trace_interactive()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Interactive 90 degree vs. circular bend plots.")
+    parser.add_argument("--render-mode", choices=["full", "blit"], default="full",
+                        help="'blit' only redraws the traces on slider moves (faster on remote displays)")
+    parser.add_argument("--arc-points", type=int, default=None,
+                        help="fixed samples per arc (default: adaptive)")
+    parser.add_argument("--arc-tolerance", type=float, default=ARC_TOLERANCE_PX,
+                        help="max chord error of adaptive arcs, in pixels")
+    parser.add_argument("--fps", type=float, default=30,
+                        help="maximum slider update rate (0: update on every event)")
+    parser.add_argument("--profile", action="store_true",
+                        help="print per-stage update timings at exit")
+    parser.add_argument("--trace", default=None, metavar="PATH",
+                        help="write a Chrome trace of the update stages to PATH at exit")
+    args = parser.parse_args()
+    if args.profile or args.trace:
+        import instrumentation
+        instrumentation.enable(args.trace, summary=args.profile)
+    plot_trace_interactive(args.arc_points, args.render_mode, 1 / args.fps if args.fps > 0 else 0,
+                           args.arc_tolerance)
@@ -0,0 +1,285 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from bend_geometry import EDGE_FACTOR
+from propagation import INCH_TO_METER, SEC_TO_PS, SPEED_OF_LIGHT, convert_to_inches
+from results_store import column_schema, write_schema
+
+# Quantities available on every (L, W, Er) grid point.
+#   L_circular_in / L_rightangle_in   effective lengths (inches)
+#   t_circular_ps / t_rightangle_ps   travel times of the bent trace (ps)
+#   dt_circular_ps / dt_rightangle_ps straight minus bend travel time (ps)
+SWEEP_FIELDS = (
+    "L_circular_in",
+    "L_rightangle_in",
+    "t_circular_ps",
+    "t_rightangle_ps",
+    "dt_circular_ps",
+    "dt_rightangle_ps",
+)
+
+# Grids with fewer points than this run in-process unless a worker count
+# is given: a process pool and shared memory cost more than the sweep.
+POOL_MIN_POINTS = 1 << 20
+
+def slider_grid(step=1.0):
+    """
+    The (L, W) range covered by the serpentine_routing sliders, in mils:
+    L from 1 to 100 and W from 1 to 50. A smaller 'step' gives a finer grid.
+    """
+    L = np.arange(1.0, 100.0 + step / 2, step)
+    W = np.arange(1.0, 50.0 + step / 2, step)
+    return L, W
+
+def _compute_slab(L, W, Er, fields, outputs):
+    """
+    Evaluate 'fields' for the box L x W x Er (1-D slices of the axes),
+    writing into the matching arrays of 'outputs' (each shaped
+    (len(L), len(W), len(Er))).
+
+    Travel times use a per-inch delay factor sqrt(Er) * 0.0254 / c, which
+    equals the calculator's L_m / v up to rounding in the last digit.
+    """
+    ps_per_inch = np.sqrt(Er) * (INCH_TO_METER * SEC_TO_PS / SPEED_OF_LIGHT)
+    W_circular = EDGE_FACTOR["circular"] * W
+    for name in fields:
+        out = outputs[name]
+        if name == "L_circular_in":
+            np.subtract(L[:, None, None], W_circular[None, :, None], out=out)
+        elif name == "L_rightangle_in":
+            np.subtract(L[:, None, None], W[None, :, None], out=out)
+        elif name == "t_circular_ps":
+            np.subtract(L[:, None, None], W_circular[None, :, None], out=out)
+            np.multiply(out, ps_per_inch, out=out)
+        elif name == "t_rightangle_ps":
+            np.subtract(L[:, None, None], W[None, :, None], out=out)
+            np.multiply(out, ps_per_inch, out=out)
+        elif name == "dt_circular_ps":
+            out[...] = np.multiply.outer(W_circular, ps_per_inch)
+        elif name == "dt_rightangle_ps":
+            out[...] = np.multiply.outer(W, ps_per_inch)
+        else:
+            raise ValueError(f"Unknown sweep field: {name}")
+
+def _grid_boxes(start, stop, shape):
+    """
+    Cover the flat C-order index range [start, stop) of a grid of 'shape'
+    with at most 2 * len(shape) - 1 boxes, each a tuple of one slice per
+    axis, so a block of the flattened grid can still be evaluated with
+    broadcasting.
+    """
+    if not shape:
+        return [()] if stop > start else []
+    inner = int(np.prod(shape[1:], dtype=np.int64))
+    first, head = divmod(start, inner)
+    last, tail = divmod(stop, inner)
+    if first == last:
+        return [(slice(first, first + 1),) + box
+                for box in _grid_boxes(head, tail, shape[1:])]
+    boxes = []
+    if head:
+        boxes += [(slice(first, first + 1),) + box
+                  for box in _grid_boxes(head, inner, shape[1:])]
+        first += 1
+    if last > first:
+        boxes.append((slice(first, last),) + tuple(slice(0, n) for n in shape[1:]))
+    if tail:
+        boxes += [(slice(last, last + 1),) + box
+                  for box in _grid_boxes(0, tail, shape[1:])]
+    return boxes
+
+def _sweep_worker(task):
+    """
+    Process-pool task: attach to the shared result buffers by name and fill
+    the flat index range [start, stop) of the grid.
+    """
+    buffers, shape, dtype, L, W, Er, fields, start, stop = task
+    segments = []
+    arrays = {}
+    for name in fields:
+        kind, location = buffers[name]
+        if kind == "shm":
+            shm = shared_memory.SharedMemory(name=location)
+            segments.append(shm)
+            arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        else:
+            arrays[name] = np.load(location, mmap_mode="r+")
+    for box in _grid_boxes(start, stop, shape):
+        outputs = {name: arr[box] for name, arr in arrays.items()}
+        _compute_slab(L[box[0]], W[box[1]], Er[box[2]], fields, outputs)
+    # Views must be released before the shared memory can be closed.
+    outputs = None
+    arrays.clear()
+    for shm in segments:
+        shm.close()
+    return stop - start
+
+def _partition(n, parts):
+    """
+    Split range(n) into at most 'parts' contiguous (start, stop) blocks.
+    """
+    parts = max(1, min(parts, n))
+    edges = np.linspace(0, n, parts + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+class SweepResult(dict):
+    """
+    Dict of sweep results, field -> array, returned by run_sweep.
+
+    With several workers the arrays are views of the shared-memory
+    segments the workers wrote, which stay mapped until close(); use the
+    result in a 'with' block, or call close() once the arrays (and any
+    views of them) are no longer needed. Copy an array to keep it past
+    close(). For in-process and .npy sweeps close() only empties the dict.
+    """
+
+    def __init__(self, arrays, segments=()):
+        super().__init__(arrays)
+        self._segments = list(segments)
+
+    def close(self):
+        self.clear()
+        segments, self._segments = self._segments, []
+        for shm in segments:
+            # BufferError here means a view of the segment is still alive.
+            shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def run_sweep(L, W, Er, units="inches", fields=SWEEP_FIELDS, workers=None,
+              dtype=np.float64, out_dir=None, tasks_per_worker=4):
+    """
+    Evaluate bend lengths and delays over the full L x W x Er grid.
+
+    Parameters
+    ----------
+      L, W : array_like
+        Grid axes for the centerline length and trace width, in 'units'.
+      Er : array_like
+        Grid axis for the dielectric constant.
+      units : str
+        Unit of L and W ('inches', 'meters' or 'mils'); results are in
+        inches / ps as in the calculator.
+      fields : sequence of str
+        Subset of SWEEP_FIELDS to compute.
+      workers : int or None
+        Number of worker processes. With 1 the sweep runs in-process; the
+        default is os.cpu_count(), or 1 for grids below POOL_MIN_POINTS,
+        where starting a pool costs more than the sweep.
+      dtype : numpy dtype
+        Result dtype; float32 halves memory for very large sweeps.
+      out_dir : str or None
+        If given, each field is written to '<out_dir>/<field>.npy' (the
+        axes to 'axes.npz') and memory-mapped arrays are returned.
+
+    Returns a SweepResult mapping each field to an array of shape
+    (len(L), len(W), len(Er)). With several workers the arrays are the
+    shared-memory segments the workers wrote, not copies of them, and are
+    valid until the result is closed.
+    """
+    L = np.ascontiguousarray(convert_to_inches(np.asarray(L, dtype=np.float64).ravel(), units))
+    W = np.ascontiguousarray(convert_to_inches(np.asarray(W, dtype=np.float64).ravel(), units))
+    Er = np.ascontiguousarray(np.asarray(Er, dtype=np.float64).ravel())
+    fields = tuple(fields)
+    unknown = set(fields) - set(SWEEP_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown sweep fields: {', '.join(sorted(unknown))}")
+    shape = (L.size, W.size, Er.size)
+    dtype = np.dtype(dtype)
+    if workers is None:
+        workers = (os.cpu_count() or 1) if np.prod(shape) >= POOL_MIN_POINTS else 1
+
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+        np.savez(os.path.join(out_dir, "axes.npz"), L_inch=L, W_inch=W, Er=Er)
+        results = SweepResult({})
+        buffers = {}
+        for name in fields:
+            path = os.path.join(out_dir, f"{name}.npy")
+            results[name] = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+            buffers[name] = ("npy", path)
+        if workers == 1:
+            _compute_slab(L, W, Er, fields, results)
+        else:
+            for arr in results.values():
+                arr.flush()
+            _run_pool(buffers, shape, dtype, L, W, Er, fields, workers, tasks_per_worker)
+        # Describe the fields like any other results store (the grid axes
+        # stay in axes.npz).
+        write_schema(out_dir, [column_schema(name, dtype, shape) for name in fields], shape[0],
+                     axes="axes.npz", axis_names=["L_inch", "W_inch", "Er"])
+        return results
+
+    if workers == 1:
+        results = SweepResult({name: np.empty(shape, dtype=dtype) for name in fields})
+        _compute_slab(L, W, Er, fields, results)
+        return results
+
+    nbytes = max(1, int(np.prod(shape)) * dtype.itemsize)
+    segments = {}
+    try:
+        for name in fields:
+            segments[name] = shared_memory.SharedMemory(create=True, size=nbytes)
+        buffers = {name: ("shm", shm.name) for name, shm in segments.items()}
+        _run_pool(buffers, shape, dtype, L, W, Er, fields, workers, tasks_per_worker)
+    except BaseException:
+        for shm in segments.values():
+            shm.close()
+            shm.unlink()
+        raise
+    # Drop the names now that the workers are done; the memory stays mapped
+    # until the result is closed.
+    for shm in segments.values():
+        shm.unlink()
+    return SweepResult({name: np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+                        for name, shm in segments.items()}, segments.values())
+
+def _run_pool(buffers, shape, dtype, L, W, Er, fields, workers, tasks_per_worker):
+    # Split the flattened grid, so short axes still keep every worker busy.
+    blocks = _partition(int(np.prod(shape)), workers * tasks_per_worker)
+    tasks = [(buffers, shape, dtype, L, W, Er, fields, start, stop) for start, stop in blocks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for _ in pool.map(_sweep_worker, tasks):
+            pass
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Sweep circular-bend and right-angle lengths/delays over an L x W x Er grid.")
+    parser.add_argument("--L", nargs=3, type=float, metavar=("START", "STOP", "NUM"),
+                        default=[1, 100, 100], help="length axis as linspace (default: slider range)")
+    parser.add_argument("--W", nargs=3, type=float, metavar=("START", "STOP", "NUM"),
+                        default=[1, 50, 50], help="width axis as linspace (default: slider range)")
+    parser.add_argument("--Er", nargs=3, type=float, metavar=("START", "STOP", "NUM"),
+                        default=[3.0, 4.5, 16], help="Er axis as linspace")
+    parser.add_argument("--units", default="mils", choices=["inches", "meters", "mils"])
+    parser.add_argument("--fields", default=",".join(SWEEP_FIELDS))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--float32", action="store_true", help="store results as float32")
+    parser.add_argument("-o", "--out-dir", required=True, help="directory for the .npy results")
+    args = parser.parse_args(argv)
+
+    axes = [np.linspace(a, b, int(n)) for a, b, n in (args.L, args.W, args.Er)]
+    try:
+        results = run_sweep(*axes, units=args.units, fields=args.fields.split(","),
+                            workers=args.workers,
+                            dtype=np.float32 if args.float32 else np.float64,
+                            out_dir=args.out_dir)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    shape = next(iter(results.values())).shape
+    print(f"wrote {len(results)} fields of shape {shape} to {args.out_dir}", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from bus_skew import BusSkew, _SortedIndex
+
+def _reference(bus):
+    return sorted((bus.delay(name), name) for name in bus._nets)
+
+def test_sorted_index_matches_sorted_list():
+    rng = np.random.default_rng(0)
+    index = _SortedIndex(load=8)
+    reference = []
+    for step in range(3000):
+        if reference and rng.random() < 0.4:
+            item = reference.pop(int(rng.integers(len(reference))))
+            index.remove(item)
+        else:
+            item = (float(rng.integers(50)), f"n{step}")
+            index.add(item)
+            reference.append(item)
+        reference.sort()
+        assert len(index) == len(reference)
+    assert index.head(len(reference) + 5) == reference
+    assert index.tail(7) == reference[-7:]
+    assert index.below((20.0,)) == [item for item in reference if item < (20.0,)]
+    assert index.from_key((20.0,)) == [item for item in reference if item >= (20.0,)]
+    with pytest.raises(ValueError):
+        index.remove((100.0, "missing"))
+
+def test_incremental_bus_matches_bulk():
+    rng = np.random.default_rng(1)
+    L = rng.uniform(1.0, 2.0, 2000)
+    bulk = BusSkew([f"n{i}" for i in range(len(L))], L, 0.005, 3.8)
+    bus = BusSkew([], [], 0.005, 3.8)
+    for i, length in enumerate(L):
+        bus.add(f"n{i}", length, 0.005, 3.8)
+    assert bus.worst_pair() == bulk.worst_pair()
+    assert bus.worst_pairs(5) == bulk.worst_pairs(5)
+    for i in range(0, len(L), 7):
+        bus.update(f"n{i}", L=float(rng.uniform(1.0, 2.0)))
+    bus.remove("n3")
+    reference = _reference(bus)
+    assert bus._index.head(len(bus)) == reference
+    target = reference[len(reference) // 2][0]
+    assert bus.outside(target, 1.0) == [(name, d - target) for d, name in reference
+                                        if abs(d - target) > 1.0]
+
+@pytest.mark.parametrize("order", ["ascending", "descending", "random"])
+def test_index_blocks_stay_bounded(order):
+    # Every insert shifts at most one block of <= 2*load items, so bounded
+    # blocks mean incremental loading is O(n log n), not quadratic.
+    load = 16
+    keys = np.random.default_rng(2).uniform(0.0, 1.0, 20_000)
+    if order != "random":
+        keys.sort()
+    if order == "descending":
+        keys = keys[::-1]
+    index = _SortedIndex(load=load)
+    for i, key in enumerate(keys.tolist()):
+        index.add((key, f"n{i}"))
+    sizes = [len(block) for block in index._blocks]
+    assert max(sizes) <= 2 * load
+    assert len(sizes) <= len(keys) // load
+    assert index._maxes == [block[-1] for block in index._blocks]
+
+def test_incremental_bus_blocks_stay_bounded():
+    bus = BusSkew([], [], 0.005, 3.8)
+    for i, length in enumerate(np.random.default_rng(3).uniform(1.0, 2.0, 5000).tolist()):
+        bus.add(f"n{i}", length, 0.005, 3.8)
+    assert max(len(block) for block in bus._index._blocks) <= 2 * bus._index.load
+    assert bus._index.head(len(bus)) == _reference(bus)
+
+def test_failed_update_leaves_net_unchanged():
+    bus = BusSkew(["a", "b"], [1.0, 2.0], 0.005, 3.8)
+    before = list(bus._nets["a"])
+    with pytest.raises(ValueError):
+        bus.update("a", L=1.5, units="furlongs")
+    with pytest.raises(TypeError):
+        bus.update("a", L="long")
+    assert bus._nets["a"] == before
+    assert bus._index.head(2) == _reference(bus)
+
+def test_names_must_be_strings():
+    with pytest.raises(TypeError):
+        BusSkew(["a", 1], [1.0, 1.0], 0.005, 3.8)
+    bus = BusSkew(["a"], [1.0], 0.005, 3.8)
+    with pytest.raises(TypeError):
+        bus.add(2, 1.0, 0.005, 3.8)
+    assert len(bus) == 1
@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+import calculator
+from results_cache import ResultsCache
+
+class _Entry:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+class _TkThreadCache(ResultsCache):
+    """
+    ResultsCache that fails if it is touched off the thread that made it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.thread = threading.get_ident()
+
+    def get(self, *args):
+        assert threading.get_ident() == self.thread
+        return super().get(*args)
+
+    def put(self, *args):
+        assert threading.get_ident() == self.thread
+        super().put(*args)
+
+    def get_or_compute(self, *args):
+        assert threading.get_ident() == self.thread
+        return super().get_or_compute(*args)
+
+@pytest.fixture
+def gui(monkeypatch):
+    pending = []
+    runner = calculator.BackgroundRunner(lambda ms, fn: pending.append(fn), poll_ms=1)
+    shown = []
+    cache = _TkThreadCache()
+    monkeypatch.setattr(calculator, "shared_cache", lambda: cache)
+    monkeypatch.setattr(calculator, "finish", shown.append)
+    monkeypatch.setattr(calculator, "show_text", shown.append, raising=False)
+    monkeypatch.setattr(calculator, "show_error", lambda exc: pytest.fail(str(exc)),
+                        raising=False)
+    monkeypatch.setattr(calculator, "runner", runner, raising=False)
+    for name, value in (("entry_L", "10"), ("entry_W", "5"), ("entry_Er", "4.2"),
+                        ("combo_L_units", "inches"), ("combo_W_units", "mils")):
+        monkeypatch.setattr(calculator, name, _Entry(value), raising=False)
+
+    def run_events():
+        # Stand-in for the Tk event loop: run poll() until the job is done.
+        while pending:
+            pending.pop(0)()
+            time.sleep(0.001)
+
+    yield cache, shown, run_events
+    runner.close()
+
+def test_report_cache_stays_on_tk_thread(gui):
+    cache, shown, run_events = gui
+    calculator.on_compute()
+    run_events()
+    assert len(shown) == 1 and len(cache) == 1
+    calculator.on_compute()
+    run_events()
+    assert shown[1] == shown[0]
+    assert cache.hits == 1
+
+def test_non_physical_er_shows_input_error(gui, monkeypatch):
+    cache, shown, run_events = gui
+    monkeypatch.setattr(calculator, "entry_Er", _Entry("0"))
+    calculator.on_compute()
+    run_events()
+    assert shown == ["Error: Please enter valid numeric values."]
+    assert len(cache) == 0
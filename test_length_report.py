@@ -0,0 +1,33 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from length_report import convert_chunks, read_column_chunks
+
+def _convert(text, fmt, **kwargs):
+    chunks = read_column_chunks(io.StringIO(text), fmt, chunk_size=2)
+    return [np.concatenate(arrays) for arrays in zip(*(chunk[1:] for chunk in
+                                                         convert_chunks(chunks, **kwargs)))]
+
+def test_jsonl_keys_from_later_records_are_kept():
+    records = [{"net": "a", "L": 1000},
+               {"net": "b", "L": 1, "unit": "inches", "Er": 4.0},
+               {"net": "c", "L": 2000, "W": 10, "L_unit": "mils"},
+               {"net": "d", "L": 0.0254, "W": 0.000127, "unit": "meters", "W_unit": "meters"}]
+    text = "".join(json.dumps(rec) + "\n" for rec in records)
+    L, W, Er = _convert(text, "jsonl", default_unit="mils", default_W=5.0, default_Er=3.8)
+    np.testing.assert_allclose(L, [1.0, 1.0, 2.0, 1.0])
+    np.testing.assert_allclose(W, [0.005, 0.005, 0.01, 0.005])
+    np.testing.assert_allclose(Er, [3.8, 4.0, 3.8, 3.8])
+
+def test_jsonl_missing_value_without_default_rejected():
+    text = '{"L": 1, "W": 1, "Er": 4}\n{"L": 1, "W": 1, "Er": 4}\n{"L": 1, "W": 1}\n'
+    with pytest.raises(ValueError, match="Record 2"):
+        _convert(text, "jsonl")
+
+def test_ragged_csv_row_rejected():
+    text = "net,L,W,Er\na,1,1,4\nb,1,1,4\nc,1,1\n"
+    with pytest.raises(ValueError, match="Record 2 has 3 fields"):
+        list(read_column_chunks(io.StringIO(text), "csv", chunk_size=2))
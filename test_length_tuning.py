@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from length_tuning import solve_bus, solve_meanders
+from meander import Meander, corner_size_limits
+from trace_outline import measure_trace
+
+@pytest.mark.parametrize("lead", [0.0, 5.0])
+@pytest.mark.parametrize("max_amplitude", [15.0, 60.0])
+def test_mitred_solution_matches_outline(lead, max_amplitude):
+    lengths = np.random.default_rng(1).uniform(1000.0, 1500.0, 32)
+    result = solve_bus(lengths, 3.8, 4.0, 10.0, max_amplitude, units="mils", corner="mitred",
+                       lead=lead)
+    tuned = result[result["n_legs"] > 0]
+    assert len(tuned) == len(lengths) - 1
+    assert np.abs(result["error_ps"]).max() < 1e-9
+    for row in tuned:
+        m = Meander(int(row["n_legs"]), row["amplitude"], 10.0, 4.0, "mitred", row["corner_size"],
+                    lead)
+        assert row["corner_size"] < 10.0 / 2
+        assert row["amplitude"] <= max_amplitude * (1 + 1e-12)
+        measured = measure_trace(m.vertices(), 4.0)
+        for field in ("center_length", "inner_length", "outer_length"):
+            assert getattr(m, field) == pytest.approx(float(measured[field]), rel=1e-12)
+        footprint = (m.n_legs - 1) * m.pitch + 2 * lead
+        assert row["added_length"] == pytest.approx(m.effective_length - footprint, rel=1e-12)
+
+@pytest.mark.parametrize("corner", ["mitred", "arc"])
+def test_auto_corner_sizes_within_limits(corner):
+    extra = np.linspace(1.0, 400.0, 200)
+    n, amplitude, size = solve_meanders(extra, 4.0, 10.0, 40.0, corner, lead=3.0)
+    smallest, largest = corner_size_limits(corner, 10.0, amplitude, 4.0, 3.0)
+    assert np.all(size >= smallest - 1e-12)
+    assert np.all(size <= largest + 1e-12)
+
+def test_half_pitch_chamfer_rejected():
+    with pytest.raises(ValueError):
+        solve_meanders(100.0, 4.0, 10.0, 40.0, "mitred", corner_size=5.0)
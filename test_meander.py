@@ -0,0 +1,52 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from meander import Meander, corner_size_limits, meander_lengths, polyline_length
+from trace_outline import measure_trace
+
+def _measure(meander, arc_points=2049):
+    return measure_trace(meander.vertices(arc_points), meander.width)
+
+@pytest.mark.parametrize("n_legs, amplitude, pitch, width, lead",
+                         list(itertools.product((1, 2, 3, 4), (20, 40), (6, 10, 20), (1, 4),
+                                                (0, 2, 15))))
+def test_mitred_closed_form_within_limits(n_legs, amplitude, pitch, width, lead):
+    smallest, largest = corner_size_limits("mitred", pitch, amplitude, width, lead)
+    if largest < smallest:
+        pytest.skip("no valid chamfer for this geometry")
+    for size in np.linspace(float(smallest), float(largest), 4):
+        m = Meander(n_legs, amplitude, pitch, width, "mitred", size, lead)
+        measured = _measure(m)
+        for field in ("center_length", "inner_length", "outer_length"):
+            assert getattr(m, field) == pytest.approx(float(measured[field]), rel=1e-12)
+
+@pytest.mark.parametrize("corner", ["mitred", "arc"])
+def test_short_lead_default_matches_vertices(corner):
+    m = Meander(4, 40, 10, 4, corner, lead=3)
+    assert m.corner_size <= 3
+    assert m.center_length == pytest.approx(polyline_length(m.vertices(4097)), rel=1e-6)
+
+@pytest.mark.parametrize("corner", ["mitred", "arc"])
+def test_corner_larger_than_lead_rejected(corner):
+    with pytest.raises(ValueError):
+        Meander(4, 40, 10, 4, corner, corner_size=5, lead=2)
+    with pytest.raises(ValueError):
+        meander_lengths(4, 40, 10, 4, corner, corner_size=5, lead=2)
+
+def test_meeting_chamfers_rejected():
+    with pytest.raises(ValueError):
+        Meander(4, 40, 10, 4, "mitred", corner_size=5, lead=10)
+
+@pytest.mark.parametrize("corner", ["mitred", "arc"])
+def test_scalar_limits_match_array_limits(corner):
+    for pitch, amplitude, width, lead in itertools.product((6, 10), (20, 40), (1, 4), (0, 3)):
+        m = Meander(2, amplitude, pitch, width, corner, lead=lead)
+        lengths = meander_lengths(2, amplitude, pitch, width, corner, lead=lead)
+        assert m.center_length == pytest.approx(float(lengths["center_length"]), rel=1e-15)
+        smallest, largest = corner_size_limits(corner, pitch, amplitude, width, lead)
+        with pytest.raises(ValueError):
+            Meander(2, amplitude, pitch, width, corner, float(largest) * 1.01, lead)
+        with pytest.raises(ValueError):
+            Meander(2, amplitude, pitch, width, corner, float(smallest) * 0.99, lead)
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from monte_carlo import Distribution, QuantileSketch, format_percentile, run_monte_carlo
+
+def test_sketch_rejects_non_finite():
+    sketch = QuantileSketch()
+    for bad in ([1.0, np.nan], [np.inf, 2.0], [-np.inf]):
+        with pytest.raises(ValueError):
+            sketch.add(bad)
+    assert sketch.count == 0
+
+def test_wide_er_tolerance_is_truncated():
+    # About 2% of these Er draws are below 1 and would be non-physical.
+    stats = run_monte_carlo(1.0, 0.005, Distribution("normal", 2.0, 0.5), 200_000)
+    for s in stats.values():
+        assert s.count == 200_000
+        assert np.all(np.isfinite(s.percentiles([0.1, 50, 99.9])))
+    floor = run_monte_carlo(1.0, 0.005, 1.0, 1)["t_straight_ps"].min
+    assert stats["t_straight_ps"].min >= floor
+
+@pytest.mark.parametrize("L, W, Er", [
+    (1.0, 0.005, Distribution("normal", 0.5, 0.1)),
+    (1.0, 0.005, Distribution("uniform", 1.5, 1.0)),
+    (1.0, Distribution("uniform", 0.005, 0.01), 4.0),
+])
+def test_non_physical_nominal_rejected(L, W, Er):
+    with pytest.raises(ValueError):
+        run_monte_carlo(L, W, Er, 1000)
+
+def test_percentiles_formatted_to_sketch_precision():
+    assert format_percentile(1464.11, 1e-3) == "1460"
+    assert format_percentile(0.604713, 1e-3) == "0.605"
+    assert format_percentile(0.604713, 1e-2) == "0.6"
@@ -0,0 +1,37 @@
+import asyncio
+import io
+
+import numpy as np
+import pytest
+
+from delay_service import DelayService
+from propagation import compute_propagation_times, compute_propagation_times_batch, main
+
+@pytest.mark.parametrize("L, W, Er", [(1.0, 0.01, 0.0), (1.0, 0.01, -4.0), (1.0, 0.01, np.nan),
+                                      (1.0, 0.01, np.inf), (-1.0, 0.01, 4.0),
+                                      (1.0, -0.01, 4.0), (np.inf, 0.01, 4.0)])
+def test_non_physical_inputs_rejected(L, W, Er):
+    with pytest.raises(ValueError):
+        compute_propagation_times_batch(L, W, Er)
+    with pytest.raises(ValueError):
+        compute_propagation_times(L, W, Er)
+
+def test_batch_error_names_record():
+    with pytest.raises(ValueError, match=r"record 2"):
+        compute_propagation_times_batch([1.0, 2.0, 3.0], 0.01, [4.0, 4.0, 0.0])
+
+def test_cli_error_names_record_across_chunks(monkeypatch, capsys):
+    lines = ["L,W,Er,unit"] + ["1,0.01,4,inches"] * 5 + ["1,0.01,0,inches"]
+    monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(lines) + "\n"))
+    assert main(["--chunk-size", "2"]) == 1
+    assert "record 5" in capsys.readouterr().err
+
+def test_service_rejects_non_physical_er():
+    service = DelayService(workers=1)
+    status, payload, _ = asyncio.run(
+        service._dispatch("POST", "/delays", b'{"L": 1, "W": 0.01, "Er": 0, "unit": "inches"}'))
+    assert status == 400
+    assert "Er" in payload["error"]
+    status, _, _ = asyncio.run(
+        service._dispatch("POST", "/delays", b'{"L": [1, 2], "W": [0.01, 0.01], "Er": [4, -1]}'))
+    assert status == 400
@@ -0,0 +1,32 @@
+import pickle
+
+import pytest
+
+from results_cache import ResultsCache, make_key
+
+def test_save_and_load(tmp_path):
+    path = tmp_path / "cache.pkl"
+    cache = ResultsCache(path=str(path))
+    cache.put(make_key("report", 10, 0.005, 3.3), "report")
+    cache.save()
+    assert ResultsCache(path=str(path)).get(make_key("report", 10, 0.005, 3.3)) == "report"
+
+@pytest.mark.parametrize("content", [
+    b"",
+    b"not a pickle at all",
+    b"\x80\x05\x95\xff\xff\xff\xff\xff\xff\xff\x7f",
+    pickle.dumps(list(range(100)))[:-7],
+    pickle.dumps(42),
+    pickle.dumps({"key": "value"}),
+    pickle.dumps([("a", 1), ("b", 2, 3)]),
+    pickle.dumps([("a", 1), "b"]),
+    pickle.dumps([([], 1)]),
+])
+def test_garbage_file_is_ignored(tmp_path, content):
+    path = tmp_path / "cache.pkl"
+    path.write_bytes(content)
+    cache = ResultsCache(path=str(path))
+    assert len(cache) == 0
+    cache.put("key", "value")
+    cache.save()
+    assert ResultsCache(path=str(path)).get("key") == "value"
@@ -0,0 +1,38 @@
+import matplotlib
+import pytest
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from serpentine_routing import build_trace_figure
+
+def _drag(render_mode, values):
+    """
+    Build the figure, drag the length slider through 'values' and return
+    (full redraws, blits) caused by the drag.
+    """
+    fig, (length, width), timer = build_trace_figure(render_mode=render_mode, frame_budget=0)
+    fig.canvas.draw()
+    counts = {"draws": 0, "blits": 0}
+    fig.canvas.mpl_connect("draw_event", lambda event: counts.__setitem__("draws",
+                                                                          counts["draws"] + 1))
+    blit = fig.canvas.blit
+
+    def counting_blit(*args, **kwargs):
+        counts["blits"] += 1
+        return blit(*args, **kwargs)
+
+    fig.canvas.blit = counting_blit
+    try:
+        for value in values:
+            length.set_val(value)
+    finally:
+        plt.close(fig)
+    assert timer.count == len(values)
+    return counts["draws"], counts["blits"]
+
+@pytest.mark.parametrize("values", [range(51, 71), range(49, 29, -1)])
+def test_monotonic_drag_mostly_blits(values):
+    draws, blits = _drag("blit", list(values))
+    assert draws + blits == len(values)
+    assert draws <= 2
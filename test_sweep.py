@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from sweep import POOL_MIN_POINTS, SWEEP_FIELDS, _grid_boxes, run_sweep
+
+@pytest.mark.parametrize("shape", [(1, 1, 1), (1, 5, 3), (4, 3, 2), (2, 1, 7)])
+def test_grid_boxes_cover_range_once(shape):
+    n = int(np.prod(shape))
+    for start in range(n + 1):
+        for stop in range(start, n + 1):
+            hits = np.zeros(shape, dtype=int)
+            for box in _grid_boxes(start, stop, shape):
+                hits[box] += 1
+            expected = np.zeros(n, dtype=int)
+            expected[start:stop] = 1
+            assert np.array_equal(hits.ravel(), expected)
+
+@pytest.mark.parametrize("n_L", [1, 2])
+def test_short_L_axis_matches_serial(n_L):
+    L, W, Er = np.linspace(10, 100, n_L), np.linspace(1, 50, 37), np.linspace(3, 4.5, 5)
+    expected = run_sweep(L, W, Er, units="mils", workers=1)
+    with run_sweep(L, W, Er, units="mils", workers=3, tasks_per_worker=5) as results:
+        for name in SWEEP_FIELDS:
+            np.testing.assert_array_equal(results[name], expected[name])
+
+def test_shared_results_are_not_copied():
+    L, W, Er = np.linspace(10, 100, 3), np.linspace(1, 50, 4), [3.8]
+    expected = run_sweep(L, W, Er, units="mils", workers=1, fields=["t_circular_ps"])
+    with run_sweep(L, W, Er, units="mils", workers=2, fields=["t_circular_ps"]) as results:
+        arr = results["t_circular_ps"]
+        assert not arr.flags.owndata
+        np.testing.assert_array_equal(arr, expected["t_circular_ps"])
+        del arr
+    assert not results
+
+def test_small_grid_skips_pool(monkeypatch):
+    import sweep
+
+    def no_pool(*args):
+        raise AssertionError("process pool started for a small grid")
+
+    monkeypatch.setattr(sweep, "_run_pool", no_pool)
+    results = run_sweep(np.linspace(1, 100, 10), np.linspace(1, 50, 10), [3.8], units="mils")
+    assert results["t_circular_ps"].shape == (10, 10, 1)
+    assert 10 * 10 < POOL_MIN_POINTS
@@ -0,0 +1,27 @@
+import pytest
+
+from meander import Meander
+from trace_outline import measure_trace, validate_closed_forms
+
+@pytest.mark.parametrize("L, W", [(50.0, 10.0), (40.0, 4.0), (100.0, 1.0)])
+def test_closed_forms_match_outline(L, W):
+    rows = validate_closed_forms(L, W)
+    assert {row["trace"] for row in rows} >= {"meander_mitred_4", "meander_mitred_2"}
+    for row in rows:
+        assert row["rel_error"] < 1e-6, row
+
+@pytest.mark.parametrize("n_legs, lead", [(2, 0.0), (4, 10.0)])
+def test_default_mitre_matches_outline(n_legs, lead):
+    m = Meander(n_legs, 50.0, 10.0, 4.0, "mitred", lead=lead)
+    assert m.corner_size < m.pitch / 2
+    measured = measure_trace(m.vertices(), m.width)
+    for field in ("center_length", "inner_length", "outer_length"):
+        assert getattr(m, field) == pytest.approx(float(measured[field]), rel=1e-12)
+
+def test_meeting_arcs_match_outline():
+    # Two fillets of half the pitch make a semicircle; their shared end
+    # point must not leave a zero-length segment in the outline.
+    m = Meander(4, 20.0, 20.0, 4.0, "arc", 10.0, lead=15.0)
+    measured = measure_trace(m.vertices(4097), m.width)
+    for field in ("center_length", "inner_length", "outer_length"):
+        assert getattr(m, field) == pytest.approx(float(measured[field]), rel=1e-6)
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from transmission_line import compute_line_times_batch, iter_line_results
+
+def _records(n):
+    rng = np.random.default_rng(0)
+    for i in range(n):
+        yield {"L": rng.uniform(500, 2000), "W": rng.uniform(3, 8), "H": rng.uniform(3, 6),
+               "Er": rng.uniform(3.5, 4.5), "T": "" if i % 3 else 1.4}
+
+def test_chunks_match_batch():
+    records = list(_records(10))
+    chunks = list(iter_line_results(iter(records), "stripline", "mils", chunk_size=4))
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    columns = [np.array([float(rec[key] or 0.0) for rec in records]) * scale
+               for key, scale in (("L", 1e-3), ("W", 1e-3), ("H", 1e-3), ("Er", 1), ("T", 1e-3))]
+    expected = compute_line_times_batch(*columns, "stripline")
+    assert np.concatenate(chunks).tolist() == expected.tolist()
+
+def test_records_are_streamed():
+    def records():
+        yield from _records(5)
+        raise AssertionError("read past the first chunk")
+
+    results = iter_line_results(records(), chunk_size=5)
+    assert len(next(results)) == 5
+    with pytest.raises(AssertionError):
+        next(results)
+
+def test_missing_field_names_record():
+    records = list(_records(6))
+    del records[4]["H"]
+    with pytest.raises(ValueError, match="Record 4 is missing field 'H'"):
+        list(iter_line_results(records, chunk_size=3))
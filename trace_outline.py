@@ -0,0 +1,214 @@
+import sys
+
+import numpy as np
+
+from bend_geometry import CircularBend, RightAngleBend
+from meander import CORNER_STYLES, default_corner_size, meander_lengths, meander_vertices
+
+# Lengths and copper area of one trace outline, in the units of its vertices.
+OUTLINE_DTYPE = np.dtype([
+    ("center_length", "f8"),
+    ("inner_length", "f8"),
+    ("outer_length", "f8"),
+    ("area", "f8"),
+])
+
+def _clean(vertices):
+    """
+    Float (M, 2) copy of 'vertices' without repeated points, which have no
+    direction to offset along. Points within rounding error of the one
+    before (e.g. where two generated corners meet) count as repeats.
+    """
+    v = np.asarray(vertices, dtype=np.float64)
+    if len(v) < 2:
+        raise ValueError("A trace needs at least two vertices")
+    d = np.diff(v, axis=0)
+    scale = np.abs(v).max()
+    keep = np.ones(len(v), dtype=bool)
+    keep[1:] = np.hypot(d[:, 0], d[:, 1]) > 1e-12 * scale
+    v = v[keep]
+    if len(v) < 2:
+        raise ValueError("A trace needs at least two distinct vertices")
+    return v
+
+def _segment_normals(v):
+    """
+    Unit left normals and lengths of the segments of a cleaned polyline.
+    """
+    d = np.diff(v, axis=0)
+    lengths = np.hypot(d[:, 0], d[:, 1])
+    normals = np.empty_like(d)
+    normals[:, 0] = -d[:, 1] / lengths
+    normals[:, 1] = d[:, 0] / lengths
+    return normals, lengths
+
+def _offset(v, normals, distance):
+    out = np.empty_like(v)
+    out[0] = v[0] + distance * normals[0]
+    out[-1] = v[-1] + distance * normals[-1]
+    n1, n2 = normals[:-1], normals[1:]
+    denom = 1.0 + np.einsum("ij,ij->i", n1, n2)
+    # A full reversal has no finite mitre; fall back to the incoming normal.
+    reversal = denom < 1e-12
+    if reversal.any():
+        denom[reversal] = 1.0
+        n2 = n2.copy()
+        n2[reversal] = 0.0
+    out[1:-1] = v[1:-1] + (n1 + n2) * (distance / denom)[:, None]
+    return out
+
+def offset_polyline(vertices, distance):
+    """
+    Offset an open (M, 2) polyline sideways by 'distance' (positive to the
+    left of the direction of travel) with mitred joins and square ends, as
+    a constant-width trace edge. Returns an (M, 2) array.
+
+    Each interior vertex moves along the bisector of the two segment
+    normals n1, n2 by distance / cos(half the turn), i.e. it lands on
+    v + distance·(n1 + n2) / (1 + n1·n2), which is exact for straight
+    segments. Inner offsets larger than a local radius of curvature fold
+    over themselves; such outlines are not clipped.
+    """
+    v = _clean(vertices)
+    return _offset(v, _segment_normals(v)[0], distance)
+
+def trace_outline(vertices, width):
+    """
+    (left, right) edges of a trace of 'width' along the centerline
+    'vertices', each an (M, 2) array.
+    """
+    v = _clean(vertices)
+    normals = _segment_normals(v)[0]
+    return _offset(v, normals, width / 2.0), _offset(v, normals, -width / 2.0)
+
+def outline_polygon(vertices, width):
+    """
+    Closed outline of the trace: the left edge followed by the right edge
+    reversed, as an (2M, 2) array (the closing edge is implied).
+    """
+    left, right = trace_outline(vertices, width)
+    return np.vstack((left, right[::-1]))
+
+def polygon_area(polygon):
+    """
+    Area of a simple closed polygon given as (N, 2) vertices (shoelace
+    formula).
+    """
+    x, y = polygon[:, 0], polygon[:, 1]
+    return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+def _edge_length(edge):
+    d = np.diff(edge, axis=0)
+    return float(np.hypot(d[:, 0], d[:, 1]).sum())
+
+def measure_trace(vertices, width):
+    """
+    Centerline, inner-edge and outer-edge lengths and copper area of one
+    trace, as a 0-d array of OUTLINE_DTYPE. Inner/outer are the shorter
+    and longer of the two offset edges.
+    """
+    v = _clean(vertices)
+    normals, lengths = _segment_normals(v)
+    left = _offset(v, normals, width / 2.0)
+    right = _offset(v, normals, -width / 2.0)
+    out = np.empty((), dtype=OUTLINE_DTYPE)
+    out["center_length"] = lengths.sum()
+    out["inner_length"], out["outer_length"] = sorted((_edge_length(left), _edge_length(right)))
+    out["area"] = polygon_area(np.vstack((left, right[::-1])))
+    return out
+
+def measure_traces(traces, widths):
+    """
+    measure_trace() for every (vertices, width) pair of a routed board;
+    'widths' may be a single width. Returns an array of OUTLINE_DTYPE.
+    """
+    traces = list(traces)
+    widths = np.broadcast_to(np.asarray(widths, dtype=np.float64), (len(traces),))
+    out = np.empty(len(traces), dtype=OUTLINE_DTYPE)
+    for i, (vertices, width) in enumerate(zip(traces, widths)):
+        out[i] = measure_trace(vertices, width)
+    return out
+
+def _tangent_arc(radius, points):
+    """
+    Quarter-circle centerline whose first and last segments are tangent to
+    the arc at 0° and 90°, so its square ends (and hence the offset edge
+    lengths) match the true arc; plain chord sampling tilts the ends by
+    half a step and converges only as O(1/points).
+    """
+    step = (np.pi / 2) / (points - 2)
+    theta = (np.arange(points - 2) + 0.5) * step
+    r = radius / np.cos(step / 2)
+    return np.vstack(([[radius, 0.0]], np.column_stack((r * np.cos(theta), r * np.sin(theta))),
+                      [[0.0, radius]]))
+
+def _validation_cases(L, W, arc_points):
+    """
+    (name, centerline vertices, closed-form center/inner/outer lengths)
+    for the bends and meanders whose lengths are given in closed form.
+    """
+    right = RightAngleBend(L, W)
+    x, y = right.polyline("center")
+    yield ("right_angle_bend", np.column_stack((x, y)),
+           (right.center_length, right.inner_length, right.outer_length))
+    arc = CircularBend.from_center_length(L, W)
+    yield ("circular_bend", _tangent_arc(arc.radius, arc_points),
+           (arc.center_length, arc.inner_length, arc.outer_length))
+    # Meanders get the default corner size of each style.
+    pitch = max(2.0 * W, L / 5.0)
+    # Four legs with leads turn right as often as left; two bare legs only
+    # turn right, so their edges differ.
+    for corner in CORNER_STYLES:
+        for n_legs, lead in ((4, pitch), (2, 0.0)):
+            size = float(default_corner_size(corner, pitch, L, lead, W))
+            lengths = meander_lengths(n_legs, L, pitch, W, corner, size, lead)
+            yield (f"meander_{corner}_{n_legs}",
+                   meander_vertices(n_legs, L, pitch, corner, size, lead, arc_points),
+                   (float(lengths["center_length"]), float(lengths["inner_length"]),
+                    float(lengths["outer_length"])))
+
+def validate_closed_forms(L, W, arc_points=1025):
+    """
+    Compare the closed-form center/inner/outer lengths (and the copper
+    area W·L, which holds for any constant-width trace) of a right angle
+    bend, a circular bend and meanders of every corner style against the
+    offset-polygon measurement. Returns a list of dicts with the relative
+    error of each quantity; arcs converge as O(1/arc_points²).
+    """
+    rows = []
+    for name, vertices, (center, inner, outer) in _validation_cases(L, W, arc_points):
+        measured = measure_trace(vertices, W)
+        expected = {"center_length": center, "inner_length": inner, "outer_length": outer,
+                    "area": W * center}
+        for field, value in expected.items():
+            got = float(measured[field])
+            rows.append({"trace": name, "quantity": field, "closed_form": value,
+                         "polygon": got, "rel_error": abs(got - value) / abs(value)})
+    return rows
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Check the closed-form bend and meander lengths against exact offset outlines.")
+    parser.add_argument("--L", type=float, default=50.0, help="trace length / leg height")
+    parser.add_argument("--W", type=float, default=10.0, help="trace width")
+    parser.add_argument("--arc-points", type=int, default=1025)
+    parser.add_argument("--tolerance", type=float, default=1e-6,
+                        help="largest acceptable relative error")
+    args = parser.parse_args(argv)
+
+    rows = validate_closed_forms(args.L, args.W, args.arc_points)
+    worst = 0.0
+    for row in rows:
+        worst = max(worst, row["rel_error"])
+        print(f"{row['trace']:>20} {row['quantity']:>14} {row['closed_form']:>14.8g} "
+              f"{row['polygon']:>14.8g} {row['rel_error']:>10.2e}")
+    if worst > args.tolerance:
+        print(f"error: largest relative error {worst:.2e} exceeds {args.tolerance:g}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
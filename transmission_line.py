@@ -0,0 +1,203 @@
+import itertools
+import math
+import sys
+
+import numpy as np
+
+from propagation import (PROPAGATION_DTYPE, compute_propagation_times_batch, convert_to_inches,
+                         read_records)
+
+LINE_KINDS = ("microstrip", "stripline")
+
+# Impedance of free space (ohms).
+ETA_0 = 376.730313668
+
+# Per-geometry line parameters.
+LINE_DTYPE = np.dtype([
+    ("Er_eff", "f8"),
+    ("Z0_ohm", "f8"),
+])
+
+# Delay results with the line parameters appended.
+LINE_TIMES_DTYPE = np.dtype(PROPAGATION_DTYPE.descr + LINE_DTYPE.descr)
+
+# Geometry points evaluated per block in compute_line_times_batch.
+_BLOCK_POINTS = 1 << 14
+
+def _microstrip_z01(u):
+    """
+    Hammerstad-Jensen impedance of a microstrip in air for width ratio u.
+    """
+    f = 6.0 + (2 * math.pi - 6.0) * np.exp(-(30.666 / u) ** 0.7528)
+    return ETA_0 / (2 * math.pi) * np.log(f / u + np.sqrt(1.0 + 4.0 / (u * u)))
+
+def _microstrip_er_eff(u, Er):
+    """
+    Hammerstad-Jensen static effective permittivity for width ratio u.
+    """
+    u4 = u ** 4
+    a = (1.0 + np.log((u4 + (u / 52.0) ** 2) / (u4 + 0.432)) / 49.0
+         + np.log(1.0 + (u / 18.1) ** 3) / 18.7)
+    b = 0.564 * ((Er - 0.9) / (Er + 3.0)) ** 0.053
+    return (Er + 1.0) / 2.0 + (Er - 1.0) / 2.0 * (1.0 + 10.0 / u) ** (-a * b)
+
+def microstrip(W, H, Er, T=0.0):
+    """
+    Effective permittivity and characteristic impedance of a microstrip of
+    width W and thickness T on a substrate of height H (any one length
+    unit) and relative permittivity Er, from the Hammerstad-Jensen closed
+    forms including their strip-thickness correction. Accurate to about
+    1% for 0.01 <= W/H <= 100 and Er <= 128. Broadcasts; returns a
+    structured array of LINE_DTYPE.
+    """
+    W, H, Er, T = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (W, H, Er, T)))
+    u = W / H
+    # Thickness widens the strip: by du1 in air and by the smaller dur in
+    # the dielectric.
+    t = T / H
+    with np.errstate(divide="ignore", invalid="ignore"):
+        coth2 = 1.0 / np.tanh(np.sqrt(6.517 * u)) ** 2
+        du1 = np.where(t > 0, t / math.pi * np.log1p(4.0 * math.e / (t * coth2)), 0.0)
+    dur = 0.5 * (1.0 + 1.0 / np.cosh(np.sqrt(Er - 1.0))) * du1
+    u1 = u + du1
+    ur = u + dur
+
+    z_ur = _microstrip_z01(ur)
+    er_ur = _microstrip_er_eff(ur, Er)
+    out = np.empty(u.shape, dtype=LINE_DTYPE)
+    out["Z0_ohm"] = z_ur / np.sqrt(er_ur)
+    out["Er_eff"] = er_ur * (_microstrip_z01(u1) / z_ur) ** 2
+    return out
+
+def stripline(W, H, Er, T=0.0):
+    """
+    Symmetric stripline of width W and thickness T centred between ground
+    planes H apart (H is the total dielectric thickness), in a homogeneous
+    dielectric: Er_eff = Er, and Z0 from Wheeler's closed form with its
+    finite-thickness width correction (about 0.5% for W/(H - T) < 10).
+    Broadcasts; returns a structured array of LINE_DTYPE.
+    """
+    W, H, Er, T = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (W, H, Er, T)))
+    x = T / H
+    gap = H - T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        m = 2.0 / (1.0 + 2.0 / 3.0 * x / (1.0 - x))
+        dw = gap * x / (math.pi * (1.0 - x)) * (
+            1.0 - 0.5 * np.log((x / (2.0 - x)) ** 2 + (0.0796 * x / (W / H + 1.1 * x)) ** m))
+    w_eff = W + np.where(x > 0, dw, 0.0)
+    r = 4.0 * gap / (math.pi * w_eff)
+    out = np.empty(W.shape, dtype=LINE_DTYPE)
+    out["Er_eff"] = Er
+    out["Z0_ohm"] = ETA_0 / (4 * math.pi * np.sqrt(Er)) * np.log(
+        1.0 + r * (2.0 * r + np.sqrt((2.0 * r) ** 2 + 6.27)))
+    return out
+
+def line_parameters(kind, W, H, Er, T=0.0):
+    """
+    microstrip() or stripline() by name ('kind' in LINE_KINDS).
+    """
+    if kind == "microstrip":
+        return microstrip(W, H, Er, T)
+    if kind == "stripline":
+        return stripline(W, H, Er, T)
+    raise ValueError(f"Unknown line kind: {kind}")
+
+def compute_line_times_batch(L_inch, W_inch, H_inch, Er, T_inch=0.0, kind="microstrip"):
+    """
+    compute_propagation_times_batch with the velocity taken from the
+    line's effective permittivity instead of the bare substrate Er, so the
+    width now also sets the speed. The Er field holds Er_eff; Er_eff and
+    Z0_ohm are appended. Inputs broadcast (lengths in inches, H and T as
+    for line_parameters); returns a structured array of LINE_TIMES_DTYPE
+    with the broadcast shape.
+
+    Points are processed in blocks so that the many temporaries of the
+    closed forms stay in cache on stack-up sweeps of millions of points.
+    """
+    if kind not in LINE_KINDS:
+        raise ValueError(f"Unknown line kind: {kind}")
+    arrays = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.float64) for a in (L_inch, W_inch, H_inch, Er, T_inch)))
+    shape = arrays[0].shape
+    L_inch, W_inch, H_inch, Er, T_inch = (a.ravel() for a in arrays)
+    out = np.empty(L_inch.size, dtype=LINE_TIMES_DTYPE)
+    for start in range(0, L_inch.size, _BLOCK_POINTS):
+        block = slice(start, start + _BLOCK_POINTS)
+        line = line_parameters(kind, W_inch[block], H_inch[block], Er[block], T_inch[block])
+        times = compute_propagation_times_batch(L_inch[block], W_inch[block], line["Er_eff"])
+        rows = out[block]
+        for name in PROPAGATION_DTYPE.names:
+            rows[name] = times[name]
+        for name in LINE_DTYPE.names:
+            rows[name] = line[name]
+    return out.reshape(shape)
+
+def records_to_line_batch(records, start=0):
+    """
+    Convert a list of input records into (L, W, H, Er, T) arrays in the
+    records' own units (T defaults to 0). 'start' is the index of the
+    first record, used in error messages.
+    """
+    n = len(records)
+    columns = [np.empty(n) for _ in range(5)]
+    for i, rec in enumerate(records):
+        try:
+            for column, key in zip(columns, ("L", "W", "H", "Er")):
+                column[i] = float(rec[key])
+        except KeyError as exc:
+            raise ValueError(f"Record {start + i} is missing field {exc}") from None
+        columns[4][i] = float(rec.get("T") or 0.0)
+    return tuple(columns)
+
+def iter_line_results(records, kind="microstrip", units="mils", chunk_size=4096):
+    """
+    Compute compute_line_times_batch results for an iterable of input
+    records (L, W, H and optional T in 'units'), yielding one structured
+    array (LINE_TIMES_DTYPE) per chunk of at most chunk_size records, as
+    propagation.iter_results does. Only one chunk is held in memory.
+    """
+    to_inch = convert_to_inches(1.0, units)
+    records = iter(records)
+    start = 0
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            return
+        L, W, H, Er, T = records_to_line_batch(chunk, start)
+        yield compute_line_times_batch(L * to_inch, W * to_inch, H * to_inch, Er, T * to_inch,
+                                       kind)
+        start += len(chunk)
+
+def main(argv=None):
+    import argparse
+
+    from results_store import OUTPUT_FORMATS, open_sink
+
+    parser = argparse.ArgumentParser(
+        description="Delay calculator with microstrip/stripline effective permittivity: reads "
+                    "L, W, H, Er and optional T records (CSV or JSON Lines) from stdin and "
+                    "streams the results.")
+    parser.add_argument("--kind", choices=LINE_KINDS, default="microstrip")
+    parser.add_argument("--units", default="mils", choices=["inches", "meters", "mils"],
+                        help="units of L, W, H and T")
+    parser.add_argument("--input-format", choices=["auto", "csv", "jsonl"], default="auto")
+    parser.add_argument("-o", "--output", default="-",
+                        help="results store directory, or a .csv/.jsonl file (default: stdout)")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default=None,
+                        help="default: columns for a directory, else csv/jsonl by extension")
+    parser.add_argument("--chunk-size", type=int, default=4096,
+                        help="records computed per batch (default: 4096)")
+    args = parser.parse_args(argv)
+
+    try:
+        with open_sink(args.output, args.output_format) as sink:
+            for results in iter_line_results(read_records(sys.stdin, args.input_format),
+                                             args.kind, args.units, args.chunk_size):
+                sink.write(results)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())